@@ -1,12 +1,18 @@
 # ============================================================
 # app_stunting.py
 
+from __future__ import annotations   # anotasi tipe tidak memicu import pandas
+
 import streamlit as st
-import pandas as pd
-import numpy as np
-import math, joblib
+import os
+from contextlib import nullcontext
 from pathlib import Path
 
+# `stunting` mengekspor namanya secara lazy: diag tidak memuat pandas/numpy
+from stunting import Trace, TraceLog, SamplingProfiler, setup_perf_log
+
+FORMAT_LABELS = {"csv": "CSV", "parquet": "Parquet", "arrow": "Arrow IPC"}
+
 st.set_page_config(page_title="Deteksi Stunting Balita (WHO)", page_icon="🧒", layout="wide")
 
 # ---------- Styles: hijau muda polos ----------
@@ -43,293 +49,29 @@ hr { border-top:1px solid #d1fae5; }
 </style>
 """, unsafe_allow_html=True)
 
-# =========================================================
-# WHO Reference Data (lengkap dari user) + Util 
-# =========================================================
-
-# --- TB/U Boys (cm) : (-3SD, -2SD, Median, +2SD)
-who_tbu_boys = {
-    0:  (44.2, 46.1, 49.9, 53.7),
-    1:  (48.9, 50.8, 54.7, 58.6),
-    2:  (52.4, 54.4, 58.4, 62.4),
-    3:  (55.3, 57.3, 61.4, 65.5),
-    4:  (57.6, 59.7, 63.9, 68.0),
-    5:  (59.6, 61.7, 65.9, 70.1),
-    6:  (61.2, 63.3, 67.6, 71.9),
-    7:  (62.7, 64.8, 69.2, 73.5),
-    8:  (64.0, 66.2, 70.6, 75.0),
-    9:  (65.2, 67.5, 72.0, 76.5),
-    10: (66.4, 68.7, 73.3, 77.9),
-    11: (67.6, 69.9, 74.5, 79.2),
-    12: (68.6, 71.0, 75.7, 80.5),
-    13: (69.6, 72.1, 76.9, 81.8),
-    14: (70.6, 73.1, 78.0, 83.0),
-    15: (71.6, 74.1, 79.1, 84.2),
-    16: (72.5, 75.0, 80.2, 85.4),
-    17: (73.3, 75.8, 81.2, 86.5),
-    18: (74.2, 76.9, 82.3, 87.7),
-    19: (75.0, 77.7, 83.2, 88.8),
-    20: (75.8, 78.6, 84.2, 89.8),
-    21: (76.5, 79.4, 85.1, 90.9),
-    22: (77.2, 80.2, 86.0, 91.9),
-    23: (77.8, 80.9, 86.8, 92.9),
-    24: (78.7, 81.7, 87.8, 93.9),
-    25: (78.6, 81.7, 88.0, 94.2),
-    26: (79.3, 82.5, 88.8, 95.2),
-    27: (79.9, 83.1, 89.6, 96.1),
-    28: (80.5, 83.8, 90.4, 97.0),
-    29: (81.1, 84.5, 91.2, 97.9),
-    30: (81.7, 85.1, 91.9, 98.7),
-    31: (82.3, 85.7, 92.7, 99.6),
-    32: (82.8, 86.4, 93.4, 100.4),
-    33: (83.4, 86.9, 94.1, 101.2),
-    34: (83.9, 87.5, 94.8, 102.0),
-    35: (84.4, 88.1, 95.4, 102.7),
-    36: (85.0, 88.7, 96.1, 103.5),
-    37: (85.5, 89.2, 96.7, 104.2),
-    38: (86.0, 89.8, 97.4, 105.0),
-    39: (86.5, 90.3, 98.0, 105.7),
-    40: (87.0, 90.9, 98.6, 106.4),
-    41: (87.5, 91.4, 99.2, 107.1),
-    42: (88.0, 91.9, 99.9, 107.8),
-    43: (88.4, 92.4, 100.4, 108.5),
-    44: (88.9, 93.0, 101.0, 109.1),
-    45: (89.3, 93.5, 101.6, 109.8),
-    46: (89.8, 94.1, 102.1, 110.5),
-    47: (90.3, 94.4, 102.8, 111.2),
-    48: (90.7, 94.9, 103.3, 111.8),
-    49: (91.2, 95.4, 103.9, 112.4),
-    50: (91.6, 95.9, 104.4, 113.0),
-    51: (92.1, 96.4, 105.0, 113.6),
-    52: (92.5, 96.9, 105.6, 114.2),
-    53: (93.0, 97.4, 106.1, 114.9),
-    54: (93.4, 97.8, 106.7, 115.5),
-    55: (93.9, 98.3, 107.2, 116.1),
-    56: (94.3, 98.8, 107.8, 116.7),
-    57: (94.7, 99.3, 108.3, 117.4),
-    58: (95.2, 99.7, 108.9, 118.0),
-    59: (95.6, 100.2, 109.4, 118.6),
-    60: (96.1, 100.7, 110.0, 119.2),
-}
-
-# --- BB/U Boys (kg) : (-3SD, -2SD, -1SD, Median, +1SD, +2SD, +3SD)
-who_bbu_boys = {
-    0:(2.1,2.5,2.9,3.3,3.9,4.4,5.0), 1:(2.9,3.4,3.9,4.5,5.1,5.8,6.6),
-    2:(3.8,4.3,4.9,5.6,6.3,7.1,8.0), 3:(4.4,5.0,5.7,6.4,7.2,8.0,9.0),
-    4:(4.9,5.6,6.2,7.0,7.8,8.7,9.7), 5:(5.3,6.0,6.7,7.5,8.4,9.3,10.4),
-    6:(5.7,6.4,7.1,7.9,8.8,9.8,10.9), 7:(5.9,6.7,7.4,8.3,9.2,10.3,11.4),
-    8:(6.2,6.9,7.7,8.6,9.6,10.7,11.9), 9:(6.4,7.1,8.0,8.9,9.9,11.0,12.3),
-    10:(6.6,7.4,8.2,9.2,10.2,11.4,12.7), 11:(6.8,7.6,8.4,9.4,10.5,11.7,13.0),
-    12:(6.9,7.7,8.6,9.6,10.8,12.0,13.3), 13:(7.1,7.9,8.8,9.9,11.0,12.3,13.7),
-    14:(7.2,8.1,9.0,10.1,11.3,12.6,14.0), 15:(7.4,8.3,9.2,10.3,11.5,12.8,14.3),
-    16:(7.5,8.4,9.4,10.5,11.7,13.1,14.6), 17:(7.7,8.6,9.6,10.7,12.0,13.4,14.9),
-    18:(7.8,8.8,9.8,10.9,12.2,13.7,15.3), 19:(8.0,8.9,10.0,11.1,12.5,13.9,15.6),
-    20:(8.1,9.1,10.1,11.3,12.7,14.2,15.9), 21:(8.2,9.2,10.3,11.5,12.9,14.5,16.2),
-    22:(8.4,9.4,10.5,11.8,13.2,14.7,16.5), 23:(8.5,9.5,10.7,12.0,13.4,15.0,16.8),
-    24:(8.6,9.7,10.8,12.2,13.6,15.3,17.1), 25:(8.8,9.8,11.0,12.4,13.9,15.5,17.4),
-    26:(8.9,10.0,11.1,12.5,14.1,15.8,17.8), 27:(9.1,10.1,11.3,12.7,14.4,16.1,18.1),
-    28:(9.2,10.4,11.5,12.9,14.5,16.3,18.4), 29:(9.2,10.4,11.7,13.1,14.8,16.6,18.7),
-    30:(9.4,10.5,11.8,13.3,15.0,16.9,19.0), 31:(9.5,10.7,12.0,13.5,15.2,17.1,19.3),
-    32:(9.6,10.8,12.1,13.7,15.4,17.4,19.6), 33:(9.8,11.0,12.3,13.8,15.6,17.6,19.9),
-    34:(9.8,11.1,12.4,14.0,15.8,17.8,20.2), 35:(9.9,11.2,12.6,14.2,16.0,18.1,20.4),
-    36:(10.0,11.3,12.7,14.3,16.2,18.3,20.7), 37:(10.1,11.4,12.9,14.5,16.4,18.6,21.0),
-    38:(10.2,11.5,13.0,14.7,16.6,18.8,21.3), 39:(10.3,11.6,13.3,14.8,16.8,19.0,21.6),
-    40:(10.4,11.8,13.3,15.0,17.0,19.3,21.9), 41:(10.5,11.9,13.4,15.2,17.2,19.5,22.1),
-    42:(10.6,12.0,13.6,15.3,17.4,19.7,22.4), 43:(10.7,12.2,13.7,15.5,17.6,20.0,22.7),
-    44:(10.8,12.2,13.8,15.7,17.8,20.2,23.0), 45:(10.9,12.4,14.0,15.8,18.0,20.5,23.3),
-    46:(11.0,12.5,14.1,16.0,18.2,20.7,23.6), 47:(11.1,12.6,14.3,16.2,18.4,20.9,23.9),
-    48:(11.2,12.7,14.4,16.3,18.6,21.2,24.2), 49:(11.3,12.8,14.5,16.5,18.8,21.4,24.5),
-    50:(11.4,12.9,14.7,16.7,19.0,21.7,24.8), 51:(11.5,13.1,14.8,16.8,19.2,21.9,25.1),
-    52:(11.6,13.2,15.0,17.0,19.4,22.2,25.4), 53:(11.7,13.3,15.1,17.2,19.6,22.4,25.7),
-    54:(11.8,13.5,15.2,17.3,19.8,22.7,26.0), 55:(11.9,13.5,15.4,17.5,20.0,22.9,26.3),
-    56:(12.0,13.6,15.5,17.7,20.2,23.2,26.6), 57:(12.1,13.7,15.6,17.8,20.4,23.4,26.9),
-    58:(12.2,13.8,15.8,18.0,20.6,23.7,27.2), 59:(12.3,14.0,15.9,18.2,20.8,23.9,27.6),
-    60:(12.4,14.1,16.0,18.3,21.0,24.2,27.9),
-}
-
-# --- TB/U Girls (cm) : (-3SD, -2SD, Median, +2SD)
-who_tbu_girls = {
-    0:(43.6,45.4,49.1,52.9), 1:(47.8,49.8,53.7,57.6),
-    2:(51.0,53.0,57.1,61.1), 3:(53.5,55.6,59.8,64.0),
-    4:(55.6,57.9,62.1,66.4), 5:(57.4,59.6,64.0,68.3),
-    6:(58.9,61.2,65.7,70.2), 7:(60.3,62.7,67.3,71.9),
-    8:(61.7,64.0,68.7,73.5), 9:(62.9,65.3,70.1,75.0),
-    10:(64.1,66.5,71.5,76.4), 11:(65.2,67.7,72.8,77.8),
-    12:(66.3,68.9,74.0,79.2), 13:(67.3,69.9,75.2,80.5),
-    14:(68.3,71.0,76.4,81.7), 15:(69.3,72.0,77.5,83.0),
-    16:(70.2,73.0,78.6,84.2), 17:(71.1,74.0,79.7,85.4),
-    18:(72.0,74.9,80.7,86.5), 19:(72.8,75.8,81.7,87.6),
-    20:(73.7,76.7,82.7,88.7), 21:(74.5,77.5,83.7,89.7),
-    22:(75.2,78.4,84.6,90.8), 23:(76.0,79.2,85.5,91.9),
-    24:(76.7,80.0,86.4,92.9), 25:(76.8,80.0,86.6,93.1),
-    26:(77.5,80.8,87.4,94.1), 27:(78.1,81.5,88.3,95.0),
-    28:(78.8,82.2,89.1,96.0), 29:(79.5,82.9,89.9,96.9),
-    30:(80.1,83.6,90.7,97.7), 31:(80.7,84.3,91.4,98.6),
-    32:(81.3,84.9,92.2,99.4), 33:(81.9,85.6,92.9,100.3),
-    34:(82.5,86.2,93.6,101.1), 35:(83.1,86.8,94.4,101.9),
-    36:(83.6,87.4,95.1,102.7), 37:(84.2,88.0,95.7,103.4),
-    38:(84.7,88.6,96.4,104.2), 39:(85.3,89.2,97.1,105.0),
-    40:(85.8,89.8,97.7,105.7), 41:(86.3,90.4,98.4,106.4),
-    42:(86.8,90.9,99.0,107.1), 43:(87.4,91.5,99.7,107.9),
-    44:(87.9,92.0,100.3,108.6), 45:(88.4,92.5,100.9,109.3),
-    46:(88.9,93.1,101.5,110.0), 47:(89.3,93.6,102.1,110.7),
-    48:(89.8,94.1,102.7,111.3), 49:(90.3,94.6,103.3,112.0),
-    50:(90.7,95.1,103.9,112.7), 51:(91.2,95.6,104.5,113.3),
-    52:(91.7,96.1,105.0,114.0), 53:(92.1,96.6,105.6,114.6),
-    54:(92.6,97.1,106.2,115.2), 55:(93.0,97.6,106.7,115.9),
-    56:(93.4,98.1,107.3,116.5), 57:(93.9,98.5,107.8,117.1),
-    58:(94.3,99.0,108.4,117.7), 59:(94.7,99.5,108.9,118.3),
-    60:(95.2,99.9,109.4,118.9),
-}
-
-# --- BB/U Girls (kg) : (-3SD, -2SD, -1SD, Median, +1SD, +2SD, +3SD)
-who_bbu_girls = {
-    0:(2.0,2.4,2.8,3.2,3.7,4.2,4.8), 1:(2.7,3.1,3.6,4.2,4.8,5.5,6.2),
-    2:(3.2,3.9,4.5,5.1,5.8,6.7,7.5), 3:(4.0,4.5,5.2,5.8,6.6,7.5,8.5),
-    4:(4.4,5.0,5.7,6.4,7.3,8.2,9.3), 5:(4.8,5.4,6.1,6.9,7.8,8.8,10.0),
-    6:(5.1,5.7,6.5,7.3,8.2,9.3,10.6), 7:(5.3,6.0,6.8,7.6,8.6,9.8,11.1),
-    8:(5.6,6.3,7.0,7.9,9.0,10.2,11.6), 9:(5.8,6.5,7.3,8.2,9.3,10.5,12.0),
-    10:(5.9,6.7,7.5,8.5,9.6,10.9,12.4), 11:(6.1,6.9,7.7,8.7,9.9,11.2,12.8),
-    12:(6.3,7.0,7.9,8.9,10.1,11.5,13.1), 13:(6.4,7.2,8.1,9.2,10.4,11.8,13.5),
-    14:(6.6,7.4,8.3,9.4,10.6,12.1,13.8), 15:(6.7,7.6,8.5,9.6,10.9,12.4,14.1),
-    16:(6.9,7.7,8.7,9.8,11.1,12.6,14.5), 17:(7.0,7.9,8.9,10.0,11.4,12.9,14.8),
-    18:(7.2,8.1,9.1,10.2,11.6,13.2,15.1), 19:(7.3,8.2,9.2,10.4,11.8,13.5,15.4),
-    20:(7.5,8.4,9.4,10.6,12.1,13.7,15.7), 21:(7.6,8.6,9.6,10.9,12.3,14.0,16.0),
-    22:(7.8,8.7,9.8,11.1,12.5,14.3,16.4), 23:(7.9,8.9,10.0,11.3,12.8,14.5,16.7),
-    24:(8.1,9.0,10.2,11.5,13.0,14.8,17.0), 25:(8.2,9.2,10.3,11.7,13.3,15.0,17.3),
-    26:(8.4,9.4,10.5,11.9,13.5,15.3,17.7), 27:(8.5,9.5,10.7,12.1,13.7,15.5,18.0),
-    28:(8.6,9.7,10.9,12.3,14.0,15.7,18.3), 29:(8.8,9.8,11.1,12.5,14.2,16.0,18.7),
-    30:(8.9,10.0,11.2,12.7,14.4,16.5,19.0), 31:(9.0,10.1,11.4,12.9,14.7,16.8,19.3),
-    32:(9.3,10.3,11.6,13.1,14.9,17.0,19.6), 33:(9.3,10.4,11.7,13.3,15.1,17.3,19.9),
-    34:(9.4,10.5,11.9,13.5,15.4,17.6,20.3), 35:(9.6,10.7,12.0,13.7,15.6,17.9,20.6),
-    36:(9.6,10.8,12.2,13.9,15.8,18.1,20.9), 37:(9.7,10.9,12.4,14.0,16.0,18.4,21.3),
-    38:(9.8,11.1,12.5,14.2,16.3,18.7,21.6), 39:(9.9,11.2,12.7,14.4,16.5,19.0,22.0),
-    40:(10.1,11.3,12.8,14.6,16.7,19.2,22.3), 41:(10.2,11.5,13.0,14.8,16.9,19.5,22.7),
-    42:(10.3,11.6,13.1,15.0,17.2,19.8,23.0), 43:(10.4,11.7,13.3,15.2,17.4,20.1,23.4),
-    44:(10.5,11.8,13.4,15.3,17.6,20.4,23.7), 45:(10.6,12.0,13.6,15.5,17.8,20.7,24.1),
-    46:(10.7,12.1,13.7,15.7,18.1,20.9,24.5), 47:(10.8,12.2,13.9,15.9,18.3,21.2,24.8),
-    48:(10.9,12.3,14.0,16.1,18.5,21.5,25.2), 49:(11.0,12.4,14.2,16.3,18.8,21.8,25.5),
-    50:(11.1,12.6,14.3,16.4,19.0,22.1,25.9), 51:(11.2,12.7,14.5,16.6,19.2,22.4,26.3),
-    52:(11.3,12.8,14.6,16.8,19.4,22.6,26.6), 53:(11.4,12.9,14.8,17.0,19.7,22.9,27.0),
-    54:(11.5,13.0,14.9,17.2,19.9,23.2,27.4), 55:(11.6,13.3,15.1,17.3,20.1,23.5,27.7),
-    56:(11.7,13.3,15.2,17.5,20.3,23.8,28.1), 57:(11.8,13.4,15.3,17.7,20.5,24.1,28.5),
-    58:(11.9,13.5,15.5,17.9,20.8,24.4,28.9), 59:(12.0,13.6,15.6,18.0,21.0,24.6,29.2),
-    60:(12.1,13.7,15.8,18.2,21.2,24.9,29.5),
-}
-
-
-import math
-import numpy as np
-
-# ----------------- Util mengambil batas WHO per usia -----------------
-def _round_age(age_month: int) -> int:
-    return int(np.clip(round(age_month), 0, 60))
-
-def who_tbu_thresholds(gender: str, age_month: int):
-    a = _round_age(age_month)
-    if gender == "Laki-laki":
-        m3, m2, med, p2 = who_tbu_boys[a]
-    else:
-        m3, m2, med, p2 = who_tbu_girls[a]
-    return m3, m2, med, p2
-
-def who_bbu_row(gender: str, age_month: int):
-    a = _round_age(age_month)
-    return who_bbu_boys[a] if gender == "Laki-laki" else who_bbu_girls[a]
-
-# ----------------- Kategorisasi WHO -----------------
-def categorize_tbu(gender: str, age_m: int, height_cm: float):
-    m3, m2, med, p2 = who_tbu_thresholds(gender, age_m)
-    if height_cm < m3:
-        cat = "Sangat Pendek (Severe Stunting)"
-    elif height_cm < m2:
-        cat = "Pendek (Stunting)"
-    elif height_cm <= p2:
-        cat = "Normal"
-    else:
-        cat = "Tinggi"
-    return cat, (round(m3,1), round(m2,1), round(med,1), round(p2,1))
-
-def categorize_bbu(gender: str, age_m: int, weight_kg: float):
-    m3, m2, m1, med, p1, p2, p3 = who_bbu_row(gender, age_m)
-    if weight_kg < m3:
-        cat = "Gizi Buruk"
-    elif weight_kg < m2:
-        cat = "Gizi Kurang"
-    elif weight_kg <= p2:
-        cat = "Gizi Baik"
-    else:
-        cat = "Gizi Lebih"
-    return cat, (round(m3,1), round(m2,1), round(med,1), round(p2,1))
-
-# ----------------- Z-score & Probabilitas WHO-like -----------------
-def _z_from_points(value: float, bands: dict):
-    sds = sorted(bands.keys())
-    xs = [bands[s] for s in sds]
-    if value <= xs[0]:
-        s1, s2, x1, x2 = sds[0], sds[1], xs[0], xs[1]
-    elif value >= xs[-1]:
-        s1, s2, x1, x2 = sds[-2], sds[-1], xs[-2], xs[-1]
-    else:
-        for i in range(len(xs)-1):
-            if xs[i] <= value <= xs[i+1]:
-                s1, s2, x1, x2 = sds[i], sds[i+1], xs[i], xs[i+1]
-                break
-    if x2 == x1:
-        return float(s1)
-    frac = (value - x1) / (x2 - x1)
-    return s1 + frac * (s2 - s1)
-
-def _sigmoid_prob(z: float, k: float = 2.0, threshold: float = -2.0) -> float:
-    return 1.0 / (1.0 + math.exp(k * (z - threshold)))
-
-def who_probability(gender: str, age_m: int, height_cm: float, weight_kg: float):
-    m3, m2, med, p2 = who_tbu_thresholds(gender, age_m)
-    z_tbu = _z_from_points(height_cm, {-3: m3, -2: m2, 0: med, +2: p2})
-    p_tbu = _sigmoid_prob(z_tbu, k=2.0, threshold=-2.0)
-
-    m3w, m2w, m1w, medw, p1w, p2w, p3w = who_bbu_row(gender, age_m)
-    z_bbu = _z_from_points(weight_kg, {-3: m3w, -2: m2w, 0: medw, +2: p2w})
-    p_bbu = _sigmoid_prob(z_bbu, k=1.5, threshold=-2.0)
-
-    p_final = float(np.clip(0.8 * p_tbu + 0.2 * p_bbu, 0.0, 1.0))
-    return p_final, z_tbu, z_bbu
-
-# -------------------- Saran --------------------
-def saran(tbu: str, bbu: str) -> str:
-    if "Pendek" in tbu:
-        title = "Rekomendasi Terkait Pertumbuhan Anak:"
-        lines = [
-            "- Konsultasikan dengan tenaga kesehatan, seperti dokter atau bidan.",
-            "- Pantau tinggi badan secara berkala.",
-            "- Utamakan protein hewani (ikan, telur, ayam) serta zat besi dan zink.",
-            "- Perhatikan imunisasi dan riwayat infeksi."
-            
-        ]
-    elif bbu in ["Gizi Buruk", "Gizi Kurang"]:
-        title = "Rekomendasi Terkait Status Gizi:"
-        lines = [
-            "- Konsultasi dengan ahli gizi bila kenaikan tidak sesuai.",
-            "- Evaluasi kembali asupan energi dan protein anak.",
-            "- MP-ASI padat gizi 3x/hari dan selingan 1–2x.",
-            "- Pantau berat badan tiap 2–4 minggu."
-            
-        ]
-    else:
-        title = "Rekomendasi untuk Menjaga Pertumbuhan yang Baik:"
-        lines = [
-            "- Pertahankan pola makan seimbang (karbohidrat, protein, sayur, buah).",
-            "- Pastikan istirahat cukup dan aktivitas fisik rutin.",
-            "- Lakukan pemantauan tinggi dan berat badan secara berkala."
-        ]
-    return f"**{title}**\n" + "\n".join(lines)
-
-
 # ============================================================
 # 🔹 STATE & NAVIGATION
 # ============================================================
 if "view" not in st.session_state:
     st.session_state.view = "home"
+view = st.session_state.view
+
+# Dependensi berat hanya untuk halaman yang memakainya: home tampil tanpa
+# pandas/numpy/pyarrow; modul yang sudah di-import dipakai ulang oleh rerun
+# berikutnya (sys.modules), jadi biayanya sekali per proses.
+if view != "home":
+    import io, tempfile
+    import numpy as np
+    import pandas as pd
+    from stunting import (
+        artifact_paths, ModelRegistry, ResultCache, RowMemo, content_key,
+        INPUT_COLUMNS, FILE_FORMATS, FILE_SUFFIX, MIME_TYPES,
+        score_batch, ml_score, saran, prepare_input, file_format, read_table,
+        stream_score, encode_result, read_head, display_frame,
+        FILTER_COLUMNS, PAGE_SIZES, filter_mask, page_count, page_rows, sort_order, summarize,
+        GrowthStore, VISIT_COLUMNS, prepare_visits, read_visits,
+        GridManager, GroupReport, chart_data,
+    )
 
 def go(view_name: str):
     st.session_state.view = view_name
@@ -395,11 +137,13 @@ def render_home():
     """, unsafe_allow_html=True)
 
     st.markdown("<div class='button-container'>", unsafe_allow_html=True)
-    col1, col2 = st.columns(2, gap="medium")
+    col1, col2, col3 = st.columns(3, gap="medium")
     with col1:
         st.button("🧍‍♀️ PREDIKSI INDIVIDU", use_container_width=True, on_click=lambda: go("individu"))
     with col2:
         st.button("🗂️ PREDIKSI KELOMPOK (CSV)", use_container_width=True, on_click=lambda: go("kelompok"))
+    with col3:
+        st.button("📈 PEMANTAUAN TUMBUH", use_container_width=True, on_click=lambda: go("tumbuh"))
     st.markdown("</div>", unsafe_allow_html=True)
 
     # ======== Disclaimer ========
@@ -446,24 +190,80 @@ def render_individu():
         tb = st.number_input("Tinggi badan sekarang (cm)", 40.0, 130.0, 50.0)
         bb_l = st.number_input("Berat lahir (kg)", 1.0, 6.0, 3.0)
         tb_l = st.number_input("Tinggi lahir (cm)", 30.0, 60.0, 40.0)
+    metode = "lms" if st.checkbox("Gunakan metode LMS WHO (z-score eksak)") else "sd"
 
     if st.button("🔍 Prediksi Sekarang"):
-        tbu_cat, _ = categorize_tbu(jk, usia, tb)
-        bbu_cat, _ = categorize_bbu(jk, usia, bb)
-        p_who, z_tb, z_bb = who_probability(jk, usia, tb, bb)
-        final_label = "Stunting" if "Pendek" in tbu_cat else "Tidak Stunting"
-
-        st.markdown("<hr/>", unsafe_allow_html=True)
-        c1, c2, c3 = st.columns(3)
-        with c1: st.metric("Probabilitas Risiko", f"{p_who:.3f}")
-        with c2: st.metric("TB/U", tbu_cat)
-        with c3: st.metric("BB/U", bbu_cat)
-
-        st.write(f"**Prediksi:** {final_label}")
-        st.caption(f"z-score TB/U = {z_tb:.2f}, BB/U = {z_bb:.2f}")
-        st.info(saran(tbu_cat, bbu_cat))
+        # Input disimpan agar hasil & slider what-if tetap tampil saat rerun
+        st.session_state.individu_input = {
+            "jenis_kelamin": jk, "usia_bulan": usia, "tinggi_badan_cm": tb,
+            "berat_badan_kg": bb, "berat_lahir_kg": bb_l, "tinggi_lahir_cm": tb_l,
+        }
+        st.session_state.individu_metode = metode
+    inp = st.session_state.get("individu_input")
+    if inp is not None:
+        metode = st.session_state.individu_metode
+        res = predict_individu(inp, metode)
+        trace.attrs.update(metode=metode, baris=1, grid=res["grid"])
+
+        with trace.span("render"):
+            st.markdown("<hr/>", unsafe_allow_html=True)
+            c1, c2, c3, c4 = st.columns(4)
+            with c1: st.metric("Probabilitas Risiko", f"{res['Prob_Risiko']:.3f}")
+            with c2: st.metric("Probabilitas ML", "-" if np.isnan(res["ML_Prob"]) else f"{res['ML_Prob']:.3f}")
+            with c3: st.metric("TB/U", res["TB/U"])
+            with c4: st.metric("BB/U", res["BB/U"])
+
+            st.write(f"**Prediksi:** {res['Prediksi']}")
+            st.caption(f"z-score TB/U = {res['z_TBU']:.2f}, BB/U = {res['z_BBU']:.2f}")
+            st.info(saran(res["TB/U"], res["BB/U"]))
+
+        # Simulasi: geser tinggi/berat, hasil dihitung ulang tiap geser slider
+        with st.expander("🎚️ Simulasi what-if (tinggi & berat)"):
+            c1, c2 = st.columns(2)
+            with c1:
+                tb_sim = st.slider("Tinggi badan (cm)", 40.0, 130.0, float(inp["tinggi_badan_cm"]), 0.1)
+            with c2:
+                bb_sim = st.slider("Berat badan (kg)", 1.0, 30.0, float(inp["berat_badan_kg"]), 0.1)
+            sim = predict_individu({**inp, "tinggi_badan_cm": tb_sim, "berat_badan_kg": bb_sim},
+                                   metode, approx_ml=True)
+            c1, c2, c3, c4 = st.columns(4)
+            with c1: st.metric("Probabilitas Risiko", f"{sim['Prob_Risiko']:.3f}",
+                               f"{sim['Prob_Risiko'] - res['Prob_Risiko']:+.3f}", delta_color="inverse")
+            with c2: st.metric("Probabilitas ML", "-" if np.isnan(sim["ML_Prob"]) else f"{sim['ML_Prob']:.3f}",
+                               None if np.isnan(sim["ML_Prob"]) else f"{sim['ML_Prob'] - res['ML_Prob']:+.3f}",
+                               delta_color="inverse")
+            with c3: st.metric("TB/U", sim["TB/U"])
+            with c4: st.metric("BB/U", sim["BB/U"])
+            st.caption(f"Prediksi: {sim['Prediksi']} · z TB/U = {sim['z_TBU']:.2f}, BB/U = {sim['z_BBU']:.2f}")
+            if sim["ml_grid"]:
+                st.caption("Probabilitas ML simulasi adalah perkiraan dari grid (bisa selisih "
+                           "hingga ~0.2); klik Prediksi untuk nilai eksak clf_final.")
     st.markdown("</div>", unsafe_allow_html=True)
 
+def predict_individu(inp: dict, metode: str, approx_ml: bool = False) -> dict:
+    # Hasil WHO dari grid risiko (mikrodetik, eksak hingga ~1e-6) bila sudah
+    # dibangun untuk model saat ini; selain itu dihitung langsung. ML_Prob
+    # selalu dari clf_final, kecuali approx_ml=True (pratinjau what-if) yang
+    # boleh memakai nilai interpolasi grid.
+    grid = grid_manager.get(model, scaler, *model_version)
+    df = pd.DataFrame({k: [v] for k, v in inp.items()})
+    res = None
+    if grid is not None:
+        with trace.span("skoring_grid", rows=1):
+            res = grid.predict(**inp, method=metode)
+    if res is None:
+        with trace.span("skoring_who", rows=1):
+            res = score_batch(df["jenis_kelamin"], df["usia_bulan"], df["tinggi_badan_cm"],
+                              df["berat_badan_kg"], method=metode).iloc[0].to_dict()
+        res["ML_Prob"], res["grid"] = None, False
+    else:
+        res["grid"] = True
+    res["ml_grid"] = approx_ml and res["ML_Prob"] is not None
+    if not res["ml_grid"]:
+        with trace.span("skoring_ml", rows=1):
+            res["ML_Prob"] = float(ml_score(df, model, scaler)[0])
+    return res
+
 # ============================================================
 # 🔹 HALAMAN DETEKSI KELOMPOK (CSV)
 # ============================================================
@@ -482,14 +282,7 @@ def render_kelompok():
     )
 
     # Template CSV
-    required = [
-        "jenis_kelamin",
-        "usia_bulan",
-        "berat_lahir_kg",
-        "tinggi_lahir_cm",
-        "berat_badan_kg",
-        "tinggi_badan_cm",
-    ]
+    required = INPUT_COLUMNS
     template = pd.DataFrame(columns=required)
     st.download_button(
         "⬇️ Unduh Template CSV",
@@ -498,106 +291,464 @@ def render_kelompok():
         mime="text/csv",
     )
 
-    # Helper cast
-    def to_float(x):
-        try:
-            if isinstance(x, str):
-                x = x.replace(",", ".").strip()
-            return float(x)
-        except Exception:
-            return np.nan
-
-    def to_int(x):
-        try:
-            return int(float(str(x).replace(",", ".").strip()))
-        except Exception:
-            return np.nan
-
     # Upload & proses
-    file = st.file_uploader("Unggah file CSV", type=["csv"])
-    if file is not None:
-        try:
-            df = pd.read_csv(file)
-        except Exception:
-            file.seek(0)
-            df = pd.read_csv(file, encoding="utf-8")
-
-        # Normalisasi nama kolom
-        df.columns = [c.strip().lower() for c in df.columns]
-
-        if not all(c in df.columns for c in required):
-            st.error(
-                "Kolom tidak lengkap. Kolom yang dibutuhkan: "
-                + ", ".join(required)
-            )
-        else:
-            rows = []
-            for r in df.itertuples(index=False):
-                jk   = str(getattr(r, "jenis_kelamin"))
-                usia = to_int(getattr(r, "usia_bulan"))
-                bb   = to_float(getattr(r, "berat_badan_kg"))
-                tb   = to_float(getattr(r, "tinggi_badan_cm"))
-                bbl  = to_float(getattr(r, "berat_lahir_kg"))
-                tbl  = to_float(getattr(r, "tinggi_lahir_cm"))
-
-                # Skip baris yang tidak valid
-                if np.isnan(usia) or np.isnan(bb) or np.isnan(tb):
-                    continue
-
-                # Fungsi-fungsi di bawah diasumsikan sudah ada
-                tbu_cat, _ = categorize_tbu(jk, usia, tb)
-                bbu_cat, _ = categorize_bbu(jk, usia, bb)
-                p_who, z_tb, z_bb = who_probability(jk, usia, tb, bb)
-
-                label = "Stunting" if "Pendek" in tbu_cat else "Tidak Stunting"
-
-                rows.append(
-                    {
-                        "jenis_kelamin": jk,
-                        "usia_bulan": int(usia),
-                        "berat_lahir_kg": bbl,
-                        "tinggi_lahir_cm": tbl,
-                        "berat_badan_kg": bb,
-                        "tinggi_badan_cm": tb,
-                        "TB/U": tbu_cat,
-                        "BB/U": bbu_cat,
-                        "Prob_Risiko": round(float(p_who), 3),
-                        "z_TBU": round(float(z_tb), 2),
-                        "z_BBU": round(float(z_bb), 2),
-                        "Prediksi": label,
-                    }
+    metode = "lms" if st.checkbox("Gunakan metode LMS WHO (z-score eksak)") else "sd"
+    streaming = st.checkbox(
+        "Mode streaming (file besar)",
+        help="File dibaca per chunk dan hasil ditulis bertahap ke disk; tabel hanya menampilkan cuplikan.",
+    )
+    fmt_out = st.radio(
+        "Format hasil unduhan",
+        list(FORMAT_LABELS),
+        format_func=FORMAT_LABELS.get,
+        horizontal=True,
+        help="Parquet/Arrow jauh lebih kecil dan cepat dibaca ulang dibanding CSV.",
+    )
+    file = st.file_uploader(
+        "Unggah file (CSV, Parquet, atau Arrow IPC)",
+        type=[ext.lstrip(".") for ext in FILE_FORMATS],
+    )
+    if file is not None and streaming:
+        render_kelompok_streaming(file, metode, fmt_out)
+    elif file is not None:
+        # Hasil per isi file di-cache (LRU) sehingga rerun, klik unduh, atau
+        # unggah ulang file yang sama tidak menskor ulang
+        data = file.getvalue()
+        trace.attrs.update(metode=metode, file_mb=round(len(data) / 2**20, 2))
+        with trace.span("cache_lookup"):
+            key = content_key(data, metode, *model_version)
+            cached = result_cache.get(key)
+        if cached is None:
+            fmt_in = file_format(file.name)
+            with trace.span("baca_file") as sp:
+                # Hanya kolom template (+ wilayah) yang dibaca, CSV sebagai
+                # teks; reader sama dengan mode streaming dan CLI
+                try:
+                    df = read_table(io.BytesIO(data), fmt_in)
+                except ValueError:
+                    df = pd.DataFrame()
+                sp["rows"] = len(df)
+
+            # Normalisasi nama kolom
+            df.columns = [c.strip().lower() for c in df.columns]
+
+            if not all(c in df.columns for c in required):
+                st.error(
+                    "Kolom tidak lengkap. Kolom yang dibutuhkan: "
+                    + ", ".join(required)
                 )
+                st.markdown("</div>", unsafe_allow_html=True)
+                return
+            with trace.span("validasi", rows=len(df)):
+                inp, rejected = prepare_input(df, metode)
+            out, n_memo = None, 0
+            if len(inp):
+                # Baris yang sudah pernah diskor (mis. file sama dengan sedikit
+                # perbaikan) diambil dari memo per baris
+                with trace.span("skoring", rows=len(inp)):
+                    out, n_memo = row_memo.score(inp, metode, model, scaler, model_version)
+            laporan = None
+            if out is not None:
+                # Kolom wilayah (opsional) hanya ada di df mentah, jadi laporan
+                # dihitung sekarang; file tanpa wilayah memakai nama file
+                with trace.span("laporan", rows=len(out)):
+                    report = GroupReport()
+                    report.add(df, out, rejected)
+                    laporan = report.fill_region(Path(file.name).stem).to_frame()
+            cached = {"out": out, "rejected": rejected, "files": {}, "memo_hit": n_memo,
+                      "laporan": laporan}
+            result_cache.put(key, cached)
+            from_cache = False
+        else:
+            from_cache = True
+        trace.attrs.update(cache_hit=from_cache, memo_hit=cached["memo_hit"])
 
-            if len(rows) == 0:
-                st.warning("Tidak ada baris valid untuk diproses.")
+        render_rejected(cached["rejected"])
+        out = cached["out"]
+        if out is None:
+            st.warning("Tidak ada baris valid untuk diproses.")
+        else:
+            st.success("Prediksi selesai.")
+            if from_cache:
+                st.caption("♻️ Hasil diambil dari cache (file sama, tanpa skoring ulang).")
             else:
-                out = pd.DataFrame(rows)
-                st.success("Prediksi selesai.")
-                st.dataframe(out, use_container_width=True)
-                st.download_button(
-                    "⬇️ Unduh Hasil (CSV)",
-                    data=out.to_csv(index=False).encode("utf-8"),
-                    file_name="hasil_prediksi_stunting.csv",
-                    mime="text/csv",
+                st.caption(
+                    f"♻️ {cached['memo_hit']:,} dari {len(out):,} baris diambil dari memo, "
+                    f"{len(out) - cached['memo_hit']:,} baris diskor."
                 )
+            trace.attrs["baris"] = len(out)
+            render_hasil(out, cached, key)
+            render_laporan(cached["laporan"], cached)
+            if fmt_out not in cached["files"]:
+                # Encode sekali per format; put ulang agar budget byte cache ikut
+                with trace.span("encode_" + fmt_out, rows=len(out)):
+                    cached["files"][fmt_out] = encode_result(out, fmt_out)
+                result_cache.put(key, cached)
+            st.download_button(
+                f"⬇️ Unduh Hasil ({FORMAT_LABELS[fmt_out]})",
+                data=cached["files"][fmt_out],
+                file_name="hasil_prediksi_stunting" + FILE_SUFFIX[fmt_out],
+                mime=MIME_TYPES[fmt_out],
+            )
 
     st.markdown("</div>", unsafe_allow_html=True)
 
 
+def render_hasil(out: pd.DataFrame, cached: dict, key: str):
+    # Hanya ringkasan + satu halaman yang dikirim ke browser; ringkasan dan
+    # urutan per kolom disimpan di entri cache file yang sama
+    if "summary" not in cached:
+        with trace.span("ringkasan", rows=len(out)):
+            cached["summary"] = summarize(out)
+            cached["orders"] = {}
+    summary = cached["summary"]
+
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Baris valid", f"{summary['baris']:,}")
+    c2.metric("Terprediksi stunting", f"{summary['stunting']:,}")
+    c3.metric("Prevalensi", f"{summary['prevalensi_%']}%")
+    with st.expander("📊 Ringkasan per kategori, usia & jenis kelamin"):
+        cols = st.columns(len(summary["kategori"]))
+        for col, (name, table) in zip(cols, summary["kategori"].items()):
+            col.markdown(f"**{name}**")
+            col.dataframe(table, hide_index=True)
+        st.markdown("**Prevalensi stunting per kelompok usia & jenis kelamin**")
+        st.dataframe(summary["usia_jk"], hide_index=True)
+
+    f1, f2, f3 = st.columns(3)
+    filters = {
+        name: box.multiselect(name, labels, key=f"filter_{name}")
+        for box, (name, labels) in zip((f1, f2, f3), FILTER_COLUMNS.items())
+    }
+    s1, s2, s3 = st.columns([2, 1, 1])
+    sort_by = s1.selectbox("Urutkan", ["(urutan file)"] + list(out.columns), key="sort_by")
+    ascending = s2.radio("Arah", ["Naik", "Turun"], horizontal=True, key="sort_dir") == "Naik"
+    page_size = s3.selectbox("Baris/halaman", PAGE_SIZES, index=1, key="page_size")
+
+    sort_col = None if sort_by == "(urutan file)" else sort_by
+    order_key = (sort_col, ascending)
+    if order_key not in cached["orders"]:
+        with trace.span("urut", rows=len(out)):
+            cached["orders"][order_key] = sort_order(out, sort_col, ascending)
+        result_cache.put(key, cached)
+    mask = filter_mask(out, filters)
+    total = int(mask.sum())
+    n_pages = page_count(total, page_size)
+    # Key halaman ikut filter/urutan sehingga kembali ke halaman 1 saat berubah
+    page_key = f"page_{hash((key, order_key, page_size, tuple(map(tuple, filters.values()))))}"
+    page = st.number_input(f"Halaman (dari {n_pages:,})", 1, n_pages, 1, key=page_key)
+    # Catatan: span render mengukur serialisasi tabel di server, bukan
+    # waktu gambar di browser
+    with trace.span("render_tabel", rows=min(page_size, total)):
+        rows, total = page_rows(out, cached["orders"][order_key], mask, page, page_size)
+        st.dataframe(display_frame(rows), use_container_width=True)
+    st.caption(f"{total:,} baris sesuai filter; menampilkan {len(rows):,} baris.")
+
+
+def render_laporan(table: pd.DataFrame, cached: dict):
+    # Tabel wilayah x kelompok usia x jenis kelamin; data grafik disimpan di
+    # entri cache yang sama sehingga rerun tidak menghitung ulang pivot
+    with st.expander("📊 Laporan per wilayah, kelompok usia & jenis kelamin"):
+        by = st.radio("Grafik prevalensi per", ["wilayah", "kelompok_usia"], horizontal=True,
+                      format_func=lambda c: c.replace("_", " ").capitalize(), key="laporan_by")
+        grafik = cached.setdefault("grafik", {})
+        if by not in grafik:
+            grafik[by] = chart_data(table, by)
+        st.bar_chart(grafik[by], stack=False, sort=False, y_label="Prevalensi stunting (%)")
+        st.dataframe(table, hide_index=True, use_container_width=True)
+        st.download_button(
+            "⬇️ Unduh Laporan (CSV)",
+            data=table.to_csv(index=False).encode("utf-8"),
+            file_name="laporan_stunting_per_wilayah.csv",
+            mime="text/csv",
+        )
+
+def render_rejected(rejected: pd.DataFrame):
+    if len(rejected) == 0:
+        return
+    with st.expander(f"⚠️ {len(rejected):,} baris ditolak"):
+        st.dataframe(rejected, hide_index=True, use_container_width=True)
+        st.download_button(
+            "⬇️ Unduh Baris Ditolak (CSV)",
+            data=rejected.to_csv(index=False).encode("utf-8"),
+            file_name="baris_ditolak.csv",
+            mime="text/csv",
+        )
+
 # ============================================================
-# 🔹 ROUTING
+# 🔹 HALAMAN PEMANTAUAN TUMBUH (LONGITUDINAL)
 # ============================================================
-if st.session_state.view == "home":
-    render_home()
-elif st.session_state.view == "individu":
-    render_individu()
-elif st.session_state.view == "kelompok":
-    render_kelompok()
+def render_tumbuh():
+    st.markdown('<div class="card" style="max-width:900px; margin:auto;">', unsafe_allow_html=True)
+    st.button("↩️ Kembali", on_click=lambda: go("home"))
+    st.markdown(
+        "<h2>Pemantauan Pertumbuhan (Longitudinal)</h2><p class='subtle'>Unggah hasil "
+        "penimbangan bulanan; riwayat tiap anak disimpan dan anak yang z-score-nya turun "
+        "cepat ditandai <b>Faltering</b> sebelum di bawah -2 SD.</p>",
+        unsafe_allow_html=True,
+    )
+    template = pd.DataFrame(columns=VISIT_COLUMNS + INPUT_COLUMNS)
+    st.download_button(
+        "⬇️ Unduh Template CSV",
+        data=template.to_csv(index=False).encode("utf-8"),
+        file_name="template_kunjungan_posyandu.csv",
+        mime="text/csv",
+    )
+    file = st.file_uploader(
+        "Unggah kunjungan satu bulan (CSV, Parquet, atau Arrow IPC)",
+        type=[ext.lstrip(".") for ext in FILE_FORMATS], key="tumbuh_file",
+    )
+    if file is not None:
+        # Satu file hanya dimasukkan ke riwayat sekali per sesi (rerun tidak
+        # menulis ulang); unggahan ulang di sesi lain ditolak per baris
+        data = file.getvalue()
+        key = content_key(data, "tumbuh")
+        done = st.session_state.setdefault("tumbuh_done", {})
+        if key not in done:
+            with trace.span("validasi") as sp:
+                try:
+                    visits, rejected = prepare_visits(read_visits(io.BytesIO(data), file_format(file.name)))
+                except ValueError as e:
+                    st.error(f"{e}. Kolom yang dibutuhkan: " + ", ".join(VISIT_COLUMNS + INPUT_COLUMNS))
+                    st.markdown("</div>", unsafe_allow_html=True)
+                    return
+                sp["rows"] = len(visits) + len(rejected)
+            with trace.span("riwayat_update", rows=len(visits)):
+                out, late = growth_store.update(visits)
+            done[key] = (out, pd.concat([rejected, late], ignore_index=True))
+        out, rejected = done[key]
+        trace.attrs["baris"] = len(out)
+
+        render_rejected(rejected)
+        counts = out["Status_Tumbuh"].value_counts()
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Kunjungan", f"{len(out):,}")
+        c2.metric("Faltering", f"{counts.get('Faltering', 0):,}")
+        c3.metric("Stunting", f"{counts.get('Stunting', 0):,}")
+        c4.metric("Anak baru", f"{counts.get('Baru', 0):,}")
+        flagged = out[out["Status_Tumbuh"] == "Faltering"]
+        if len(flagged):
+            st.markdown("**Anak dengan pertumbuhan melambat (Faltering)**")
+            st.dataframe(flagged.sort_values("dz_TBU_per_bulan"), hide_index=True,
+                         use_container_width=True)
+        st.download_button(
+            "⬇️ Unduh Hasil (CSV)",
+            data=out.to_csv(index=False).encode("utf-8"),
+            file_name="hasil_pemantauan_tumbuh.csv",
+            mime="text/csv",
+        )
+
+    st.markdown("<hr/>", unsafe_allow_html=True)
+    id_anak = st.text_input("Lihat riwayat anak (id_anak)", key="tumbuh_id").strip()
+    if id_anak:
+        with trace.span("riwayat_baca") as sp:
+            hist = growth_store.history(id_anak)
+            sp["rows"] = len(hist)
+        if len(hist) == 0:
+            st.warning(f"Tidak ada riwayat untuk {id_anak}.")
+        else:
+            chart = hist.set_index("tanggal_kunjungan")[["z_TBU", "z_BBU"]].assign(**{"-2 SD": -2.0})
+            st.line_chart(chart)
+            st.dataframe(hist, hide_index=True, use_container_width=True)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+def render_kelompok_streaming(file, metode: str, fmt_out: str = "csv"):
+    # Hasil disimpan di file sementara per sesi supaya rerun (mis. klik unduh)
+    # tidak memproses ulang seluruh file.
+    key = (file.file_id, metode, fmt_out)
+    done = st.session_state.get("stream_result")
+    if done is None or done["key"] != key or not Path(done["path"]).exists():
+        if done is not None:
+            Path(done["path"]).unlink(missing_ok=True)
+        total = max(file.size, 1)
+        bar = st.progress(0.0, text="Memproses...")
+
+        def on_progress(stats):
+            frac = min(file.tell() / total, 1.0)
+            bar.progress(frac, text=f"Memproses... {stats['baris_masuk']:,} baris")
+
+        tmp = tempfile.NamedTemporaryFile(
+            prefix="hasil_stunting_", suffix=FILE_SUFFIX[fmt_out], delete=False
+        )
+        tmp.close()
+        try:
+            with trace.span("stream_score") as sp:
+                stats = stream_score(
+                    file, file_format(file.name), tmp.name, fmt_out, metode, model, scaler,
+                    on_progress=on_progress, report=True,
+                )
+                sp["rows"] = stats["baris_masuk"]
+        except ValueError as e:
+            Path(tmp.name).unlink(missing_ok=True)
+            bar.empty()
+            st.error(f"{e}. Kolom yang dibutuhkan: " + ", ".join(INPUT_COLUMNS))
+            return
+        bar.progress(1.0, text="Selesai.")
+        laporan = stats.pop("laporan").fill_region(Path(file.name).stem).to_frame()
+        done = {"key": key, "path": tmp.name, "stats": stats, "laporan": laporan}
+        st.session_state.stream_result = done
+
+    stats = done["stats"]
+    trace.attrs.update(metode=metode, streaming=True, baris=stats["baris_valid"])
+    if stats["ditolak"]:
+        n_tolak = sum(stats["ditolak"].values())
+        with st.expander(f"⚠️ {n_tolak:,} baris ditolak"):
+            st.dataframe(
+                pd.DataFrame(sorted(stats["ditolak"].items(), key=lambda kv: -kv[1]),
+                             columns=["alasan_tolak", "jumlah"]),
+                hide_index=True,
+            )
+    if stats["baris_valid"] == 0:
+        st.warning("Tidak ada baris valid untuk diproses.")
+        return
+    st.success(
+        f"Prediksi selesai: {stats['baris_valid']:,} dari {stats['baris_masuk']:,} baris valid, "
+        f"{stats['stunting']:,} terprediksi stunting."
+    )
+    with trace.span("render_cuplikan"):
+        st.dataframe(display_frame(read_head(done["path"], fmt_out, 1000)), use_container_width=True)
+    st.caption("Cuplikan 1.000 baris pertama. Hasil lengkap tersedia pada file unduhan.")
+    render_laporan(done["laporan"], done)
+    with open(done["path"], "rb") as f:
+        st.download_button(
+            f"⬇️ Unduh Hasil ({FORMAT_LABELS[fmt_out]})",
+            data=f,
+            file_name="hasil_prediksi_stunting" + FILE_SUFFIX[fmt_out],
+            mime=MIME_TYPES[fmt_out],
+        )
 
 
-# -------------------- Muat Model Backend (tidak tampil) --------------------
-MODEL_PATH, SCALER_PATH = Path("clf_final.joblib"), Path("scaler.joblib")
-model, scaler = None, None
-if MODEL_PATH.exists(): model = joblib.load(MODEL_PATH)
-if SCALER_PATH.exists(): scaler = joblib.load(SCALER_PATH)
+# ============================================================
+# 🔹 MODEL BACKEND (dimuat sekali per proses server)
+# ============================================================
+
+@st.cache_resource
+def get_registry() -> ModelRegistry:
+    return ModelRegistry()
+
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    return ResultCache()
+
+@st.cache_resource
+def get_row_memo() -> RowMemo:
+    return RowMemo()
+
+@st.cache_resource
+def get_growth_store() -> GrowthStore:
+    # Riwayat longitudinal: STUNTING_GROWTH_DB (default di direktori temp)
+    return GrowthStore()
+
+@st.cache_resource
+def get_grid_manager() -> GridManager:
+    # Grid risiko opsional: dibangun lewat `python -m stunting grid` atau
+    # tombol admin. Build memakan ~4 menit CPU, jadi tidak otomatis di proses
+    # server kecuali STUNTING_RISK_GRID=1.
+    return GridManager(auto=os.environ.get("STUNTING_RISK_GRID", "0") == "1")
+
+@st.cache_resource
+def prewarm_backend():
+    # Sekali per proses, setelah home terkirim: modul berat di-import di thread
+    # latar supaya klik pertama ke halaman lain tidak menunggu pandas/pyarrow
+    import importlib, threading
+
+    modules = ("stunting.pipeline", "stunting.cache", "stunting.view", "stunting.growth",
+               "stunting.grid")
+    thread = threading.Thread(target=lambda: [importlib.import_module(m) for m in modules],
+                              name="prewarm", daemon=True)
+    thread.start()
+    return thread
+
+@st.cache_resource
+def get_trace_log() -> TraceLog:
+    # Log JSON per baris ke stderr, atau ke file bila STUNTING_PERF_LOG diisi
+    setup_perf_log(os.environ.get("STUNTING_PERF_LOG"))
+    return TraceLog()
+
+def is_admin() -> bool:
+    # Panel diagnostik hanya untuk URL ?admin=<STUNTING_ADMIN_TOKEN>
+    token = os.environ.get("STUNTING_ADMIN_TOKEN")
+    return bool(token) and st.query_params.get("admin") == token
+
+def load_model() -> tuple:
+    # (model, scaler, versi); clf_final.npz (hasil ekspor) bila masih sesuai
+    # joblib, selain itu joblib. Dicek terhadap feature_schema.json (fitur/skala
+    # saat training); cek & load hanya diulang bila file artefak berubah.
+    registry = get_registry()
+    model_path, scaler_path = artifact_paths()
+    try:
+        model, scaler = registry.load(model_path, scaler_path)
+    except ValueError as e:
+        st.error(f"Model tidak dapat dipakai: {e}")
+        st.stop()
+    with st.sidebar.expander("ℹ️ Info model"):
+        st.dataframe(pd.DataFrame(registry.info()), hide_index=True)
+    return model, scaler, (registry.version(model_path), registry.version(scaler_path))
+
+# Model hanya dimuat oleh halaman yang memakainya (home & tumbuh tidak)
+if view in ("individu", "kelompok"):
+    model, scaler, model_version = load_model()
+if view == "individu":
+    grid_manager = get_grid_manager()
+    with st.sidebar.expander("ℹ️ Grid risiko"):
+        grid = grid_manager.get(model, scaler, *model_version)
+        st.caption(", ".join(f"{k}={v}" for k, v in grid_manager.info().items()))
+        if grid is None and is_admin() and st.button("Bangun grid (~4 menit CPU)"):
+            grid_manager.build(model, scaler, *model_version)
+            st.caption("Grid dibangun di latar; dipakai otomatis setelah selesai.")
+if view == "kelompok":
+    result_cache, row_memo = get_result_cache(), get_row_memo()
+if view == "tumbuh":
+    growth_store = get_growth_store()
+trace_log = get_trace_log()
 
+# ============================================================
+# 🔹 ROUTING
+# ============================================================
+# Satu trace per rerun; profiler sampling hanya bila admin memintanya.
+# Toggle tetap aktif sampai ada request yang benar-benar bekerja (punya span),
+# lalu profilnya disimpan dan toggle dimatikan.
+admin = is_admin()
+trace = Trace(view)
+profiler = SamplingProfiler() if admin and st.session_state.get("diag_profile") else None
+try:
+    with profiler or nullcontext():
+        if view == "home":
+            render_home()
+        elif view == "individu":
+            render_individu()
+        elif view == "kelompok":
+            render_kelompok()
+        elif view == "tumbuh":
+            render_tumbuh()
+finally:
+    if profiler is not None and trace.spans:
+        trace.profile = str(profiler.dump(trace.id))
+        st.session_state.diag_profile = False
+        st.session_state.diag_last_profile = profiler
+    trace_log.add(trace.finish())
+
+if view == "home":
+    prewarm_backend()
+
+# Statistik cache ditampilkan setelah halaman dirender agar mencakup run ini
+if view == "kelompok":
+    with st.sidebar.expander("♻️ Cache hasil"):
+        st.markdown("**Per file** (LRU, batas byte)")
+        st.dataframe(pd.DataFrame([result_cache.info()]), hide_index=True)
+        st.markdown("**Per baris** (memo)")
+        st.dataframe(pd.DataFrame([row_memo.info()]), hide_index=True)
+
+if admin:
+    with st.sidebar.expander("🩺 Diagnostik (admin)", expanded=True):
+        st.checkbox("Profil request berikutnya (sampling)", key="diag_profile")
+        st.markdown("**Per tahap** (p50/p95, baris/s)")
+        st.dataframe(trace_log.stage_summary(), hide_index=True)
+        st.markdown("**Request terakhir**")
+        st.dataframe(trace_log.recent(20), hide_index=True)
+        prof = st.session_state.get("diag_last_profile")
+        if prof is not None:
+            st.markdown(f"**Profil terakhir** ({prof.samples} sampel, {prof.seconds:.2f} s)")
+            st.dataframe(prof.top(15), hide_index=True)
+            st.download_button("⬇️ Unduh profil (folded stacks)", data=prof.folded(),
+                               file_name="profil_stunting.folded", mime="text/plain")
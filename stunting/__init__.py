@@ -0,0 +1,56 @@
+# ============================================================
+# Paket inti skoring stunting (tanpa Streamlit).
+# Dipakai oleh app_stunting.py, batch job, dan CLI: python -m stunting
+#
+# Nama di bawah di-import saat pertama kali dipakai (PEP 562), jadi
+# `import stunting` tidak memuat pandas/numpy/pyarrow. Halaman home aplikasi
+# dan perintah CLI yang ringan tidak membayar import yang tidak dibutuhkan.
+
+import importlib
+
+_EXPORTS = {
+    "who": (
+        "WHO_MAX_AGE", "Z_METHODS", "SEX_LABELS", "TBU_LABELS", "BBU_LABELS", "PREDIKSI_LABELS",
+        "categorize_tbu", "categorize_bbu", "who_probability", "score_batch",
+        "lms_z_tbu", "lms_z_bbu", "saran",
+    ),
+    "ml": (
+        "ML_FEATURES", "MODEL_PATH", "SCALER_PATH", "COMPILED_MODEL_PATH", "COMPILED_SCALER_PATH",
+        "ModelRegistry", "artifact_paths", "feature_schema", "verify_artifacts",
+        "build_ml_features", "ml_predict_proba", "ml_score",
+    ),
+    "pipeline": (
+        "INPUT_COLUMNS", "STREAM_CHUNK_ROWS", "FILE_FORMATS", "FILE_SUFFIX", "MIME_TYPES",
+        "RESULT_DECIMALS", "parse_input", "method_age", "prepare_input", "compact_input",
+        "score_frame", "display_frame", "file_format",
+        "iter_csv_chunks", "iter_parquet_chunks", "iter_arrow_chunks", "iter_chunks", "read_table",
+        "open_sink", "encode_result", "read_head",
+        "score_chunks", "stream_score", "stream_score_csv", "score_file",
+    ),
+    "cache": ("ResultCache", "RowMemo", "content_key"),
+    "parallel": ("plan_shards", "score_files_parallel"),
+    "ingest": ("DirStore", "ingest", "ingest_files"),
+    "service": ("MicroBatcher", "make_server", "score_records"),
+    "diag": ("Trace", "TraceLog", "SamplingProfiler", "setup_perf_log"),
+    "view": (
+        "FILTER_COLUMNS", "PAGE_SIZES", "filter_mask", "page_count", "page_rows", "sort_order",
+        "summarize",
+    ),
+    "growth": ("GrowthStore", "VISIT_COLUMNS", "prepare_visits", "read_visits"),
+    "grid": ("GRID_DIR", "GridManager", "RiskGrid", "build_grid"),
+    "compiled": ("CompiledTrees", "CompiledScaler", "compile_artifacts", "load_compiled"),
+    "report": ("REGION_COLUMN", "GroupReport", "chart_data", "save_report", "load_report"),
+}
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+__all__ = list(_MODULE_OF)
+
+def __getattr__(name):
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value   # akses berikutnya tidak lewat __getattr__
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,322 @@
+# ============================================================
+# stunting/bench.py
+# Benchmark reproducible (seed tetap) untuk skoring WHO, inferensi ML,
+# round-trip file, RSS puncak, cold start model, dan cold start / rerun
+# aplikasi Streamlit (AppTest). Hasil ditulis ke JSON
+# agar bisa dibandingkan antar run:
+#
+#   python -m stunting bench --sizes 1k,100k,1M -o bench_results.json
+#   python -m stunting bench --sizes 10M --only e2e
+#   python -m stunting bench --compare bench_lama.json bench_results.json
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .pipeline import INPUT_COLUMNS
+from .who import (
+    WHO_TBU, _lms_interp, _lms_value, _z_from_bands, _z_from_points,
+    categorize_bbu, categorize_tbu, score_batch, who_probability,
+)
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1M": 1_000_000, "10M": 10_000_000}
+GROUPS = ("micro", "e2e", "cold", "app")
+SEED = 20240501
+COHORT_CHUNK = 1_000_000
+PACKAGE_ROOT = Path(__file__).resolve().parent.parent
+APP_PATH = PACKAGE_ROOT / "app_stunting.py"
+APP_RERUNS = 5
+APP_THINK_S = 2.0         # jeda pengguna membaca halaman sebelum klik berikutnya
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow", "joblib", "sklearn", "xgboost")
+SCALAR_ROWS = 2_000       # fungsi skalar lama: cukup sampel kecil, lalu per panggilan
+
+# ----------------- Kohort sintetis dari tabel WHO -----------------
+def synthetic_cohort(n: int, seed: int = SEED, dirty: float = 0.01) -> pd.DataFrame:
+    # Usia seragam 0-60 bln; tinggi & berat diambil dari z ~ N(-0.8, 1.2)
+    # lewat kurva LMS WHO (sebaran mirip data posyandu dengan prevalensi
+    # stunting tinggi). Sebagian kecil baris dibuat kotor untuk jalur tolak.
+    rng = np.random.default_rng(seed)
+    sex = rng.integers(0, 2, n)
+    age = rng.integers(0, 61, n)
+    z_h = np.clip(rng.normal(-0.8, 1.2, n), -4.5, 4.5)
+    z_w = np.clip(0.6 * z_h + rng.normal(-0.3, 0.9, n), -4.5, 4.5)
+    height = _lms_value(*_lms_interp("tbu", sex, age), z_h)
+    weight = _lms_value(*_lms_interp("bbu", sex, age), z_w)
+    df = pd.DataFrame({
+        "jenis_kelamin": np.where(sex == 0, "Laki-laki", "Perempuan").astype(object),
+        "usia_bulan": age,
+        "berat_lahir_kg": rng.normal(3.1, 0.45, n).round(2),
+        "tinggi_lahir_cm": rng.normal(49.0, 2.0, n).round(1),
+        "berat_badan_kg": weight.round(1),
+        "tinggi_badan_cm": height.round(1),
+    })
+    if dirty > 0:
+        bad = rng.random(n) < dirty
+        df.loc[bad, "usia_bulan"] = rng.integers(61, 80, int(bad.sum()))
+    return df
+
+def write_cohort(path: Path, n: int, seed: int = SEED):
+    # Tulis per chunk agar kohort 10M tidak perlu muat sekaligus di memori
+    fmt = path.suffix.lower()
+    writer = None
+    for i, start in enumerate(range(0, n, COHORT_CHUNK)):
+        part = synthetic_cohort(min(COHORT_CHUNK, n - start), seed + i)
+        if fmt == ".csv":
+            part.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(part, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    if writer is not None:
+        writer.close()
+
+# ----------------- Util pengukuran -----------------
+def _timeit(fn, repeat: int = 3, number: int = 1):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - t0) / number)
+    return times
+
+def _result(name: str, rows: int, times, **extra) -> dict:
+    med = statistics.median(times)
+    res = {"name": name, "rows": rows, "seconds": round(med, 6), "best": round(min(times), 6),
+           "repeat": len(times)}
+    if rows:
+        res["rows_per_s"] = round(rows / med) if med > 0 else None
+        res["us_per_row"] = round(med / rows * 1e6, 4)
+    res.update(extra)
+    return res
+
+def _run_child(args) -> dict:
+    # Jalankan proses anak, ukur waktu dinding + RSS puncak (ru_maxrss, KB)
+    # PYTHONPATH diarahkan ke folder induk paket agar `-m stunting` selalu ketemu
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PACKAGE_ROOT), env.get("PYTHONPATH")]))
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env)
+    _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - t0
+    out = proc.stdout.read().decode()
+    proc.stdout.close()
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise RuntimeError(f"Gagal: {' '.join(map(str, args))}")
+    return {"seconds": wall, "peak_rss_mb": round(usage.ru_maxrss / 1024, 1), "stdout": out}
+
+# ----------------- Kelompok benchmark -----------------
+def bench_micro(n: int, model, repeat: int = 3) -> list:
+    df = synthetic_cohort(n)
+    from .ml import ml_score
+    from .pipeline import parse_input, prepare_input, score_frame
+
+    inp, _ = prepare_input(df)
+    g, a = inp["jenis_kelamin"], inp["usia_bulan"]
+    h, w = inp["tinggi_badan_cm"], inp["berat_badan_kg"]
+    sex = (g == "Perempuan").to_numpy().astype(np.intp)
+    out = []
+
+    # Fungsi skalar (jalur individu / loop render_kelompok versi lama)
+    m = min(n, SCALAR_ROWS)
+    rows = list(zip(g[:m], a[:m], h[:m], w[:m]))
+    bands = [{-3: t[0], -2: t[1], 0: t[2], 2: t[3]} for t in WHO_TBU[sex[:m], a[:m].to_numpy()]]
+    out.append(_result("who_probability_skalar", m,
+                       _timeit(lambda: [who_probability(*r) for r in rows], repeat)))
+    out.append(_result("z_from_points_skalar", m,
+                       _timeit(lambda: [_z_from_points(r[2], b) for r, b in zip(rows, bands)], repeat)))
+    out.append(_result("kelompok_loop_per_baris", m, _timeit(lambda: [
+        (categorize_tbu(*r[:3]), categorize_bbu(r[0], r[1], r[3]), who_probability(*r))
+        for r in rows
+    ], repeat)))
+
+    # Jalur vektor
+    xs = WHO_TBU[sex, a.to_numpy()]
+    out.append(_result("z_from_bands", n, _timeit(lambda: _z_from_bands(h.to_numpy(), xs), repeat)))
+    out.append(_result("score_batch_sd", n, _timeit(lambda: score_batch(g, a, h, w, "sd"), repeat)))
+    out.append(_result("score_batch_lms", n, _timeit(lambda: score_batch(g, a, h, w, "lms"), repeat)))
+    out.append(_result("parse_input", n, _timeit(lambda: parse_input(df), repeat)))
+    if model is not None:
+        out.append(_result("ml_score", len(inp), _timeit(lambda: ml_score(inp, model), repeat)))
+    # hasil_mb: memori DataFrame hasil (deep) yang disimpan cache aplikasi
+    res = score_frame(inp, "sd", model)
+    out.append(_result("score_frame", len(inp),
+                       _timeit(lambda: score_frame(inp, "sd", model), repeat),
+                       hasil_mb=round(res.memory_usage(deep=True).sum() / 2**20, 1)))
+    return out
+
+def bench_e2e(n: int, label: str, workdir: Path, no_ml: bool, jobs: int = 1) -> list:
+    # File -> file lewat CLI di proses terpisah (RSS puncak per kasus)
+    out = []
+    for src_fmt, dst_fmt in (("csv", "csv"), ("parquet", "parquet")):
+        src = workdir / f"kohort_{label}.{src_fmt}"
+        if not src.exists():
+            write_cohort(src, n)
+        dst = workdir / f"hasil_{label}.{dst_fmt}"
+        args = [sys.executable, "-W", "ignore", "-m", "stunting", "score", str(src), "-o", str(dst),
+                "--jobs", str(jobs)]
+        if no_ml:
+            args.append("--no-ml")
+        child = _run_child(args)
+        out.append(_result(f"e2e_{src_fmt}_ke_{dst_fmt}", n, [child["seconds"]],
+                           peak_rss_mb=child["peak_rss_mb"], jobs=jobs,
+                           input_mb=round(src.stat().st_size / 2**20, 1),
+                           output_mb=round(dst.stat().st_size / 2**20, 1)))
+        dst.unlink()
+    return out
+
+COLD_START_CODE = """
+import time, json, warnings
+warnings.filterwarnings("ignore")
+t0 = time.perf_counter()
+import stunting
+t1 = time.perf_counter()
+model = stunting.ModelRegistry().get(__PATH__)
+t2 = time.perf_counter()
+import pandas as pd
+inp, _ = stunting.prepare_input(pd.DataFrame([{"jenis_kelamin": "Perempuan", "usia_bulan": 24,
+    "berat_lahir_kg": 3.0, "tinggi_lahir_cm": 49.0, "berat_badan_kg": 10.5, "tinggi_badan_cm": 82.0}]))
+stunting.score_frame(inp, "sd", model)
+t3 = time.perf_counter()
+print(json.dumps({"import_s": t1 - t0, "load_s": t2 - t1, "first_score_s": t3 - t2}))
+"""
+
+def bench_cold(repeat: int = 3) -> list:
+    # Proses Python baru: import paket, load clf_final (joblib dan .npz hasil
+    # ekspor bila ada), skor 1 baris
+    from .ml import COMPILED_MODEL_PATH, MODEL_PATH
+
+    out = []
+    for label, path in (("joblib", MODEL_PATH), ("npz", COMPILED_MODEL_PATH)):
+        if not path.exists():
+            continue
+        runs = []
+        for _ in range(repeat):
+            child = _run_child([sys.executable, "-c", COLD_START_CODE.replace("__PATH__", repr(str(path)))])
+            runs.append({**json.loads(child["stdout"]), "total_s": child["seconds"],
+                         "peak_rss_mb": child["peak_rss_mb"]})
+        for key in ("import_s", "load_s", "first_score_s", "total_s"):
+            out.append(_result(f"cold_start_{label}_{key[:-2]}", 0, [r[key] for r in runs],
+                               peak_rss_mb=max(r["peak_rss_mb"] for r in runs)))
+    return out
+
+APP_START_CODE = """
+import json, os, resource, statistics, sys, time, warnings
+warnings.filterwarnings("ignore")
+os.environ["STUNTING_RISK_GRID"] = "0"   # jangan bangun grid di tengah pengukuran
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+from streamlit.runtime.scriptrunner import script_cache
+res = {"import_s": time.perf_counter() - t0}
+# AppTest membuat ScriptCache baru tiap run (skrip dikompilasi ulang); server
+# Streamlit menyimpan bytecode sekali per proses, jadi disamakan di sini
+_bytecode, _compile = {}, script_cache.ScriptCache.get_bytecode
+script_cache.ScriptCache.get_bytecode = lambda self, path: (
+    _bytecode.get(path) or _bytecode.setdefault(path, _compile(self, path)))
+at = AppTest.from_file(__APP__, default_timeout=300)
+for view in ("home", "individu", "kelompok", "tumbuh"):
+    at.session_state.view = view
+    t = time.perf_counter()
+    at.run()
+    res[view + "_first_s"] = time.perf_counter() - t
+    assert not at.exception, at.exception
+    if view == "home":
+        res["modul_berat_home"] = [m for m in __HEAVY__ if m in sys.modules]
+        res["rss_home_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    time.sleep(__THINK__)
+    times = []
+    for _ in range(__RERUNS__):
+        t = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - t)
+    res[view + "_rerun_s"] = statistics.median(times)
+res["cold_home_s"] = res["import_s"] + res["home_first_s"]
+print(json.dumps(res))
+"""
+
+def bench_app(repeat: int = 3) -> list:
+    # Proses baru per ulangan: import Streamlit + run pertama tiap halaman
+    # (cold start / first paint), jeda APP_THINK_S, lalu median rerun halaman
+    # yang sama
+    code = (APP_START_CODE.replace("__APP__", repr(str(APP_PATH)))
+            .replace("__HEAVY__", repr(HEAVY_MODULES)).replace("__RERUNS__", str(APP_RERUNS))
+            .replace("__THINK__", str(APP_THINK_S)))
+    runs = []
+    for _ in range(repeat):
+        child = _run_child([sys.executable, "-c", code])
+        runs.append({**json.loads(child["stdout"]), "peak_rss_mb": child["peak_rss_mb"]})
+    out = []
+    for key in [k for k in runs[0] if k.endswith("_s")]:
+        out.append(_result(f"app_{key[:-2]}", 0, [r[key] for r in runs],
+                           peak_rss_mb=max(r["peak_rss_mb"] for r in runs),
+                           rss_home_mb=max(r["rss_home_mb"] for r in runs),
+                           modul_berat_home=runs[0]["modul_berat_home"]))
+    return out
+
+# ----------------- Metadata & perbandingan -----------------
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=PACKAGE_ROOT, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def run_meta() -> dict:
+    import pyarrow
+    import sklearn
+    import xgboost
+
+    return {
+        "waktu": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu": os.cpu_count(),
+        "seed": SEED,
+        "versi": {"numpy": np.__version__, "pandas": pd.__version__, "pyarrow": pyarrow.__version__,
+                  "scikit-learn": sklearn.__version__, "xgboost": xgboost.__version__},
+    }
+
+def run(sizes, groups=GROUPS, model=None, no_ml: bool = False, repeat: int = 3, jobs: int = 1,
+        workdir=None, log=print) -> dict:
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench_stunting_", dir=workdir) as tmp:
+        for label in sizes:
+            n = SIZES[label]
+            if "micro" in groups:
+                log(f"[micro] {label}")
+                for r in bench_micro(n, model, repeat if n <= 1_000_000 else 1):
+                    results.append({**r, "kelompok": "micro", "ukuran": label})
+            if "e2e" in groups:
+                log(f"[e2e] {label}")
+                for r in bench_e2e(n, label, Path(tmp), no_ml, jobs):
+                    results.append({**r, "kelompok": "e2e", "ukuran": label})
+    if "cold" in groups:
+        log("[cold] start")
+        results.extend({**r, "kelompok": "cold"} for r in bench_cold(repeat))
+    if "app" in groups:
+        log("[app] start")
+        results.extend({**r, "kelompok": "app"} for r in bench_app(repeat))
+    return {"meta": run_meta(), "kolom_input": INPUT_COLUMNS, "results": results}
+
+def compare(old: dict, new: dict) -> pd.DataFrame:
+    # Rasio waktu baru / lama per (nama, ukuran); < 1 = lebih cepat
+    def frame(d):
+        return pd.DataFrame(d["results"]).set_index(["name", "rows"])["seconds"]
+
+    both = pd.concat({"lama_s": frame(old), "baru_s": frame(new)}, axis=1).dropna()
+    both["rasio"] = (both["baru_s"] / both["lama_s"]).round(3)
+    return both.reset_index()
@@ -0,0 +1,154 @@
+# ============================================================
+# stunting/cache.py
+# Cache hasil skoring:
+# - ResultCache: hasil per file (key = sha256 isi file + metode + versi model),
+#   LRU dengan batas byte. Rerun Streamlit / unggah ulang file sama = hit.
+# - RowMemo: hasil per baris (key = hash kolom input), sehingga saat file
+#   diunggah ulang dengan beberapa baris diperbaiki hanya baris itu yang diskor.
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .pipeline import INPUT_COLUMNS, compact_input, score_frame
+
+RESULT_CACHE_BYTES = 256 * 2**20
+ROW_MEMO_ROWS = 2_000_000
+RESULT_COLUMNS = ["TB/U", "BB/U", "Prob_Risiko", "z_TBU", "z_BBU", "Prediksi", "ML_Prob"]
+
+def content_key(data: bytes, *parts) -> str:
+    # Key cache: sha256 isi file + komponen lain (metode, sha256 model/scaler)
+    h = hashlib.sha256(data)
+    for p in parts:
+        h.update(b"\0" + str(p).encode())
+    return h.hexdigest()
+
+def _frame_bytes(value) -> int:
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(_frame_bytes(v) for v in value)
+    return 0
+
+# ----------------- Cache hasil per file (LRU + batas byte) -----------------
+class ResultCache:
+    def __init__(self, max_bytes: int = RESULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._items = OrderedDict()   # key -> (value, nbytes)
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value):
+        nbytes = _frame_bytes(value)
+        with self._lock:
+            if key in self._items:
+                self.bytes -= self._items.pop(key)[1]
+            if nbytes > self.max_bytes:
+                return   # lebih besar dari seluruh budget: tidak disimpan
+            self._items[key] = (value, nbytes)
+            self.bytes += nbytes
+            while self.bytes > self.max_bytes:
+                _, (_, old) = self._items.popitem(last=False)
+                self.bytes -= old
+                self.evictions += 1
+
+    def info(self) -> dict:
+        with self._lock:
+            return {"entri": len(self._items), "memori_mb": round(self.bytes / 2**20, 1),
+                    "batas_mb": round(self.max_bytes / 2**20, 1), "hit": self.hits,
+                    "miss": self.misses, "evict": self.evictions}
+
+# ----------------- Memo hasil per baris -----------------
+def row_keys(inp: pd.DataFrame) -> np.ndarray:
+    # Hash 64-bit per baris atas semua kolom input (termasuk data lahir,
+    # karena ML_Prob juga memakainya)
+    return pd.util.hash_pandas_object(inp[INPUT_COLUMNS], index=False).to_numpy()
+
+class RowMemo:
+    # Hasil disimpan sebagai satu DataFrame ber-index hash baris; lookup
+    # memakai get_indexer (vektor). Memo dikosongkan bila metode atau versi
+    # model berubah. Bila melebihi max_rows, baris yang paling lama tidak
+    # dipakai dibuang.
+    def __init__(self, max_rows: int = ROW_MEMO_ROWS):
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._namespace = None
+        self._table = None
+        self._used = np.empty(0, dtype=np.int64)
+        self._tick = 0
+        self.hits = self.misses = 0
+
+    def score(self, inp: pd.DataFrame, method: str = "sd", model=None, scaler=None,
+              model_version=None):
+        # Sama dengan score_frame(inp, ...), tetapi baris yang sudah pernah
+        # diskor diambil dari memo. Return (hasil, jumlah baris dari memo).
+        keys = row_keys(inp)
+        namespace = (method, model_version if model is not None else None)
+        with self._lock:
+            if self._namespace != namespace:
+                self._namespace, self._table = namespace, None
+                self._used = np.empty(0, dtype=np.int64)
+            table, used = self._table, self._used
+            self._tick += 1
+            tick = self._tick
+
+        pos = np.full(len(keys), -1) if table is None else table.index.get_indexer(keys)
+        hit = pos >= 0
+        miss_idx = np.flatnonzero(~hit)
+
+        new = score_frame(inp.iloc[miss_idx].reset_index(drop=True), method, model, scaler)
+        new_res = new[RESULT_COLUMNS].set_axis(miss_idx)
+        if hit.any():
+            old_res = table.iloc[pos[hit]][RESULT_COLUMNS].set_axis(np.flatnonzero(hit))
+            res = pd.concat([old_res, new_res]).sort_index()
+        else:
+            res = new_res
+        out = pd.concat([compact_input(inp.reset_index(drop=True)), res.reset_index(drop=True)],
+                        axis=1)
+
+        with self._lock:
+            self.hits += int(hit.sum())
+            self.misses += len(miss_idx)
+            if self._namespace != namespace or self._table is not table:
+                return out, int(hit.sum())   # memo diganti sesi lain; lewati update
+            if hit.any():
+                used[pos[hit]] = tick
+            if len(miss_idx):
+                add = new_res.set_axis(keys[miss_idx])
+                add = add[~add.index.duplicated()]
+                if table is not None:
+                    add = add[table.index.get_indexer(add.index) < 0]
+                    table = pd.concat([table, add])
+                    used = np.concatenate([used, np.full(len(add), tick)])
+                else:
+                    table, used = add, np.full(len(add), tick)
+                if len(table) > self.max_rows:
+                    keep = np.sort(np.argsort(used, kind="stable")[-self.max_rows:])
+                    table, used = table.iloc[keep], used[keep]
+            self._table, self._used = table, used
+        return out, int(hit.sum())
+
+    def info(self) -> dict:
+        with self._lock:
+            return {"baris": 0 if self._table is None else len(self._table),
+                    "batas_baris": self.max_rows, "hit": self.hits, "miss": self.misses}
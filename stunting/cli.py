@@ -0,0 +1,522 @@
+# ============================================================
+# stunting/cli.py
+# Skoring batch tanpa UI:
+#   python -m stunting score data.csv -o hasil.csv
+#   python -m stunting score folder_posyandu/ -o hasil/ --jobs 4 --format parquet
+#   python -m stunting score folder_posyandu/ -o hasil/ --report laporan.csv
+#   python -m stunting report laporan_a.state.json laporan_b.state.json -o laporan.csv
+#   python -m stunting bench --sizes 1k,100k,1M
+#   python -m stunting export
+#   python -m stunting train Stunting_Dataset.csv --jobs 4 --promote
+#   python -m stunting growth kunjungan_2024-05.csv -o hasil_2024-05.csv
+#   python -m stunting grid --jobs 4
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from . import parallel
+from .ml import BASE_DIR, MODEL_PATH, SCALER_PATH, artifact_paths
+from .grid import GRID_CHECK_ROWS, GRID_DIR, ML_STEPS, WHO_STEPS
+from .growth import FALTER_RATE_Z, FALTER_TREND_Z, GROWTH_DB_PATH
+from .pipeline import FILE_FORMATS, FILE_SUFFIX, STREAM_CHUNK_ROWS, file_format, score_file
+from .who import Z_METHODS
+
+MODEL_HELP = "Artefak model (.joblib atau .npz; default clf_final.npz bila sesuai joblib)"
+
+# ----------------- Skoring satu proses -----------------
+def _score_one(src: Path, dst: Path, method: str, chunk_rows: int, report: bool = False) -> dict:
+    t0 = time.perf_counter()
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        stats = score_file(src, dst, method, parallel._MODEL, parallel._SCALER, chunk_rows,
+                           report=report)
+    except Exception:
+        dst.unlink(missing_ok=True)   # jangan tinggalkan hasil setengah jadi
+        raise
+    stats["detik"] = round(time.perf_counter() - t0, 3)
+    return stats
+
+# ----------------- Daftar file input/output -----------------
+def collect_inputs(paths):
+    # File langsung dipakai; folder discan rekursif untuk .csv/.parquet/.arrow.
+    # Hasil: list (file, folder_asal) agar struktur folder bisa dipertahankan.
+    found = []
+    for p in paths:
+        p = Path(p)
+        if p.is_dir():
+            files = sorted(
+                f for f in p.rglob("*") if f.is_file() and f.suffix.lower() in FILE_FORMATS
+            )
+            found.extend((f, p) for f in files)
+        elif p.is_file():
+            found.append((p, p.parent))
+        else:
+            raise FileNotFoundError(f"Input tidak ditemukan: {p}")
+    return found
+
+def plan_outputs(inputs, output: Path, fmt=None):
+    # Satu file input + output berekstensi .csv/.parquet/.arrow -> tulis ke file itu.
+    # Selain itu output adalah folder: <output>/<path relatif>_hasil.<fmt>
+    if len(inputs) == 1 and not output.is_dir() and output.suffix.lower() in FILE_FORMATS:
+        return [(inputs[0][0], output)]
+    plan = []
+    for src, root in inputs:
+        ext = FILE_SUFFIX[fmt or file_format(src)]
+        rel = src.relative_to(root)
+        plan.append((src, output / rel.parent / f"{rel.stem}_hasil{ext}"))
+    dsts = [d for _, d in plan]
+    if len(set(dsts)) != len(dsts):
+        raise ValueError("Beberapa input menghasilkan nama output yang sama; pisahkan foldernya.")
+    return plan
+
+def _format_summary(src, dst, stats) -> str:
+    ditolak = sum(stats["ditolak"].values())
+    line = (
+        f"{src} -> {dst}: {stats['baris_masuk']} baris, {stats['baris_valid']} valid, "
+        f"{ditolak} ditolak, {stats['stunting']} stunting ({stats['detik']} s)"
+    )
+    for alasan, n in sorted(stats["ditolak"].items()):
+        line += f"\n    - {alasan}: {n}"
+    return line
+
+# ----------------- Perintah: score -----------------
+def cmd_score(args) -> int:
+    inputs = collect_inputs(args.inputs)
+    if not inputs:
+        print("Tidak ada file .csv/.parquet/.arrow pada input.", file=sys.stderr)
+        return 1
+    plan = plan_outputs(inputs, args.output, args.format)
+    initargs = (args.model, args.scaler, args.no_ml)
+    report = None
+    if args.report is not None:
+        from .report import GroupReport
+        report = GroupReport()
+
+    def collect(src, stats):
+        # Laporan per file digabung; file tanpa kolom wilayah -> nama file
+        if report is not None:
+            report.merge(stats.pop("laporan").fill_region(Path(src).stem))
+
+    failed = 0
+    if args.jobs <= 1:
+        parallel.load_worker_model(*initargs)
+        for src, dst in plan:
+            try:
+                stats = _score_one(src, dst, args.method, args.chunk_rows, report is not None)
+            except Exception as e:
+                failed += 1
+                print(f"{src}: GAGAL - {e}", file=sys.stderr)
+                continue
+            collect(src, stats)
+            print(_format_summary(src, dst, stats))
+    else:
+        # Tiap file dipecah per ~chunk_rows baris lalu diskor di process pool;
+        # detik per file diukur sejak shard pertamanya di-submit
+        def done(src, dst, stats):
+            nonlocal failed
+            if isinstance(stats, Exception):
+                failed += 1
+                print(f"{src}: GAGAL - {stats}", file=sys.stderr)
+            else:
+                collect(src, stats)
+                print(_format_summary(src, dst, stats))
+
+        parallel.score_files_parallel(
+            plan, args.method, args.jobs, args.chunk_rows, *initargs, on_file_done=done,
+            report=report is not None,
+        )
+    if report is not None:
+        _write_report(report, args.report)
+    return 1 if failed else 0
+
+# ----------------- Perintah: report -----------------
+def _write_report(report, path: Path):
+    from .report import save_report
+
+    state = save_report(report, path)
+    table = report.to_frame()
+    print(f"Laporan: {path} ({len(table)} kelompok, {table['jumlah_anak'].sum()} anak, "
+          f"{len(report.regions)} wilayah)\nState: {state}")
+
+def cmd_report(args) -> int:
+    # Gabungkan state parsial (.state.json) dari beberapa run/mesin tanpa
+    # membaca ulang data mentah
+    from .report import GroupReport, load_report, report_state_path
+
+    report = GroupReport()
+    for path in args.states:
+        if path.suffix.lower() != ".json":
+            path = report_state_path(path)
+        if not path.is_file():
+            raise FileNotFoundError(f"State laporan tidak ditemukan: {path}")
+        report.merge(load_report(path))
+    _write_report(report, args.output)
+    return 0
+
+# ----------------- Perintah: ingest -----------------
+def cmd_ingest(args) -> int:
+    import pandas as pd
+
+    from .ingest import ingest_files, summary_path
+
+    for root in args.roots:
+        if not root.is_dir():
+            raise FileNotFoundError(f"Folder tidak ditemukan: {root}")
+    file_format(args.output)
+    parallel.load_worker_model(args.model, args.scaler, args.no_ml)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+
+    t0 = time.perf_counter()
+    summary = ingest_files(
+        args.roots, args.output, method=args.method, model=parallel._MODEL,
+        scaler=parallel._SCALER, concurrency=args.concurrency, batch_rows=args.batch_rows,
+        pattern=args.pattern,
+    )
+    summary.to_csv(summary_path(args.output), index=False)
+
+    with pd.option_context("display.width", 200, "display.max_colwidth", 60):
+        print(summary.drop(columns=["alasan_tolak", "error"]).to_string(index=False))
+    failed = summary[summary["error"] != ""]
+    for row in failed.itertuples():
+        print(f"{row.file}: GAGAL - {row.error}", file=sys.stderr)
+    gagal = len(failed)
+    print(
+        f"\n{len(summary)} file, {summary['baris_valid'].sum()} baris valid, "
+        f"{summary['ditolak'].sum()} ditolak, {summary['stunting'].sum()} stunting, "
+        f"{gagal} file gagal ({time.perf_counter() - t0:.1f} s)\n"
+        f"Hasil: {args.output}\nRingkasan: {summary_path(args.output)}"
+    )
+    return 1 if gagal else 0
+
+# ----------------- Perintah: serve -----------------
+def cmd_serve(args) -> int:
+    from .ml import ModelRegistry
+    from .service import make_server
+
+    model = scaler = version = None
+    if not args.no_ml:
+        registry = ModelRegistry()
+        model, scaler = registry.load(args.model, args.scaler)
+        version = registry.version(args.model)
+    server = make_server(args.host, args.port, model, scaler, version,
+                         args.max_batch, args.max_wait_ms, args.verbose)
+    print(f"Melayani di http://{args.host}:{server.server_port} (Ctrl+C untuk berhenti)",
+          file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+# ----------------- Perintah: bench -----------------
+def cmd_bench(args) -> int:
+    import json
+
+    from . import bench
+
+    if args.compare:
+        old, new = (json.loads(Path(p).read_text()) for p in args.compare)
+        print(bench.compare(old, new).to_string(index=False))
+        return 0
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in bench.SIZES]
+    if unknown:
+        raise ValueError(f"Ukuran tidak dikenal: {unknown}; pilih dari {list(bench.SIZES)}")
+    groups = args.only.split(",") if args.only else bench.GROUPS
+
+    model = None
+    if not args.no_ml and "micro" in groups:
+        from .ml import ModelRegistry
+
+        model = ModelRegistry().get(args.model)
+    report = bench.run(sizes, groups, model, args.no_ml, args.repeat, args.jobs,
+                       log=lambda m: print(m, file=sys.stderr))
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    for r in report["results"]:
+        speed = f"{r['rows_per_s']:>12,} baris/s" if r.get("rows_per_s") else " " * 19
+        rss = f"  RSS {r['peak_rss_mb']} MB" if "peak_rss_mb" in r else ""
+        print(f"{r['kelompok']:<6} {r.get('ukuran', ''):<5} {r['name']:<32} "
+              f"{r['seconds']:>10.4f} s {speed}{rss}")
+    print(f"\nHasil: {args.output}")
+    return 0
+
+# ----------------- Perintah: export -----------------
+def cmd_export(args) -> int:
+    # joblib -> .npz tanpa pickle, lalu cek prediksi sama & ukur latensi 1 baris
+    import numpy as np
+
+    from .compiled import compile_artifacts, load_compiled
+    from .ml import ModelRegistry, build_ml_features
+    from .pipeline import prepare_input
+    from .bench import synthetic_cohort
+
+    written = compile_artifacts(args.model, args.scaler, args.output)
+    if not written:
+        raise FileNotFoundError(f"Artefak tidak ditemukan: {args.model}, {args.scaler}")
+    for path in written:
+        print(f"{path} ({path.stat().st_size / 1024:.1f} KB)")
+
+    original = ModelRegistry().get(args.model)
+    compiled = load_compiled(written[0])
+    X = build_ml_features(prepare_input(synthetic_cohort(args.check_rows))[0])
+    diff = np.abs(original.predict_proba(X)[:, 1] - compiled.predict_proba(X)[:, 1]).max()
+    x1 = X[:1]
+    timings = {}
+    for name, model in (("joblib", original), ("npz", compiled)):
+        model.predict_proba(x1)
+        t0 = time.perf_counter()
+        for _ in range(200):
+            model.predict_proba(x1)
+        timings[name] = (time.perf_counter() - t0) / 200 * 1e6
+    print(f"Cek {len(X):,} baris: selisih probabilitas maks. {diff:.2e}")
+    print(f"Latensi 1 baris: joblib {timings['joblib']:.0f} us, npz {timings['npz']:.0f} us")
+    if diff > args.tolerance:
+        print(f"GAGAL: selisih melebihi toleransi {args.tolerance}", file=sys.stderr)
+        for path in written:
+            path.unlink()
+        return 1
+    return 0
+
+# ----------------- Perintah: train -----------------
+def cmd_train(args) -> int:
+    import json
+
+    from . import train
+
+    config = json.loads(args.config.read_text()) if args.config else {}
+    unknown = sorted(set(config) - set(train.DEFAULT_CONFIG))
+    if unknown:
+        raise ValueError(f"Kunci config tidak dikenal: {unknown}")
+    for key in ("model", "n_iter", "cv_folds"):
+        if getattr(args, key) is not None:
+            config[key] = getattr(args, key)
+    if args.smote:
+        config["smote"] = True
+    if not args.dataset.is_file():
+        raise FileNotFoundError(f"Dataset tidak ditemukan: {args.dataset}")
+
+    t0 = time.perf_counter()
+    out_dir = train.train(args.dataset, config, args.jobs, args.out, args.cache_dir,
+                          log=lambda m: print(m, file=sys.stderr))
+    print(f"Artefak: {out_dir} ({time.perf_counter() - t0:.1f} s)")
+    if args.promote:
+        for path in train.promote(out_dir):
+            print(f"  -> {path}")
+    return 0
+
+# ----------------- Perintah: growth -----------------
+def cmd_growth(args) -> int:
+    import pandas as pd
+
+    from .growth import GrowthStore, prepare_visits, read_visits
+
+    store = GrowthStore(args.db)
+    try:
+        with pd.option_context("display.width", 200, "display.max_columns", 30):
+            if args.anak:
+                print(store.history(args.anak).to_string(index=False))
+                return 0
+            if not args.inputs:
+                raise ValueError("Berikan file kunjungan atau --anak <id_anak>")
+            for src in args.inputs:
+                t0 = time.perf_counter()
+                visits, rejected = prepare_visits(read_visits(src))
+                out, late = store.update(visits, args.rate, args.trend)
+                rejected = pd.concat([rejected, late], ignore_index=True)
+                dst = args.output if len(args.inputs) == 1 else args.output / f"{src.stem}_tumbuh.csv"
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                out.to_csv(dst, index=False)
+                counts = out["Status_Tumbuh"].value_counts()
+                print(f"{src} -> {dst}: {len(out)} kunjungan, {len(rejected)} ditolak, "
+                      + ", ".join(f"{counts.get(k, 0)} {k.lower()}" for k in ("Faltering", "Stunting"))
+                      + f" ({time.perf_counter() - t0:.2f} s)")
+                for alasan, n in rejected["alasan_tolak"].value_counts().items():
+                    print(f"    - {alasan}: {n}")
+            print(f"Riwayat: {store.path} {store.info()}")
+    finally:
+        store.close()
+    return 0
+
+# ----------------- Perintah: grid -----------------
+def cmd_grid(args) -> int:
+    # Bangun grid risiko untuk versi model saat ini, lalu laporkan galat
+    # terhadap perhitungan langsung dan latensi lookup satu anak
+    from .grid import RiskGrid, build_grid, prune_grids
+    from .ml import ModelRegistry
+
+    registry = ModelRegistry()
+    model = scaler = None
+    if not args.no_ml:
+        model, scaler = registry.load(args.model, args.scaler)
+        if model is None:
+            raise FileNotFoundError(f"Model tidak ditemukan: {args.model}")
+    t0 = time.perf_counter()
+    path = build_grid(args.dir, model, scaler, registry.version(args.model) if model else None,
+                      registry.version(args.scaler) if model else None,
+                      who_steps=tuple(args.who_step), ml_steps=tuple(args.ml_step),
+                      jobs=args.jobs, check_rows=args.check_rows)
+    grid = RiskGrid(path)
+    meta = grid.meta
+    print(f"{path} ({meta['bytes'] / 2**20:.1f} MB, {time.perf_counter() - t0:.1f} s)")
+    if grid.has_ml:
+        print(f"Kelompok data lahir dari threshold model: berat {meta['kelompok_berat_lahir_kg']}, "
+              f"tinggi {meta['kelompok_tinggi_lahir_cm']}")
+    for name, err in meta.get("galat", {}).items():
+        print(f"Galat {name}: " + ", ".join(f"{k} {v:.3g}" for k, v in err.items()))
+
+    grid.predict("Perempuan", 24, 82.0, 9.5, 3.0, 49.0)
+    t0 = time.perf_counter()
+    for _ in range(10_000):
+        grid.predict("Perempuan", 24, 82.0, 9.5, 3.0, 49.0)
+    print(f"Latensi lookup 1 anak: {(time.perf_counter() - t0) / 10_000 * 1e6:.1f} us")
+    if not args.keep:
+        for old in prune_grids(args.dir, keep=path.name):
+            print(f"Dihapus: {old}")
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m stunting",
+        description="Skoring risiko stunting (WHO TB/U, BB/U + clf_final) tanpa Streamlit.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("score", help="Skor file/folder CSV, Parquet, atau Arrow IPC")
+    p.add_argument("inputs", nargs="+", type=Path, help="File .csv/.parquet/.arrow atau folder")
+    p.add_argument("-o", "--output", type=Path, required=True,
+                   help="File hasil (satu input) atau folder hasil")
+    p.add_argument("--format", choices=sorted(set(FILE_FORMATS.values())),
+                   help="Format hasil untuk output folder (default: sama dengan input)")
+    p.add_argument("--method", choices=Z_METHODS, default="sd",
+                   help="sd = interpolasi tabel SD, lms = z-score LMS WHO")
+    p.add_argument("--jobs", type=int, default=1, help="Jumlah proses worker; > 1 = file dipecah per --chunk-rows baris dan diskor paralel")
+    p.add_argument("--chunk-rows", type=int, default=STREAM_CHUNK_ROWS,
+                   help="Baris per chunk (juga ukuran shard pada mode paralel)")
+    p.add_argument("--model", type=Path, help=MODEL_HELP)
+    p.add_argument("--scaler", type=Path)
+    p.add_argument("--no-ml", action="store_true", help="Lewati clf_final (ML_Prob = NaN)")
+    p.add_argument("--report", type=Path,
+                   help="Tulis laporan wilayah x usia x jenis kelamin (.csv/.parquet) + "
+                        "<nama>.state.json untuk digabung dengan run lain")
+    p.set_defaults(func=cmd_score)
+
+    p = sub.add_parser("report", help="Gabungkan state laporan dari beberapa run score --report")
+    p.add_argument("states", nargs="+", type=Path,
+                   help="File <nama>.state.json (atau tabel laporannya)")
+    p.add_argument("-o", "--output", type=Path, required=True,
+                   help="Tabel laporan gabungan (.csv/.parquet)")
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser("ingest", help="Gabungkan banyak file posyandu menjadi satu hasil")
+    p.add_argument("roots", nargs="+", type=Path, help="Folder sumber (discan rekursif)")
+    p.add_argument("-o", "--output", type=Path, required=True,
+                   help="File hasil gabungan (.csv/.parquet/.arrow); ringkasan per file "
+                        "ditulis ke <nama>_ringkasan.csv")
+    p.add_argument("--pattern", default="*", help="Pola nama file, mis. '*2024-05*'")
+    p.add_argument("--method", choices=Z_METHODS, default="sd")
+    p.add_argument("--concurrency", type=int, default=16,
+                   help="Maks. file yang dibaca/diparse bersamaan")
+    p.add_argument("--batch-rows", type=int, default=STREAM_CHUNK_ROWS,
+                   help="Baris valid yang dikumpulkan sebelum diskor sekaligus")
+    p.add_argument("--model", type=Path, help=MODEL_HELP)
+    p.add_argument("--scaler", type=Path)
+    p.add_argument("--no-ml", action="store_true", help="Lewati clf_final (ML_Prob = NaN)")
+    p.set_defaults(func=cmd_ingest)
+
+    p = sub.add_parser("serve", help="HTTP API skoring (JSON) dengan micro-batching")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8000)
+    p.add_argument("--max-batch", type=int, default=256,
+                   help="Maks. request satu anak yang digabung per micro-batch")
+    p.add_argument("--max-wait-ms", type=float, default=5.0,
+                   help="Tenggat pengumpulan micro-batch sejak request pertama")
+    p.add_argument("--model", type=Path, help=MODEL_HELP)
+    p.add_argument("--scaler", type=Path)
+    p.add_argument("--no-ml", action="store_true", help="Tanpa clf_final (ML_Prob = null)")
+    p.add_argument("--verbose", action="store_true", help="Log setiap request ke stderr")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("bench", help="Benchmark skoring pada kohort sintetis (hasil JSON)")
+    p.add_argument("--sizes", default="1k,100k,1M",
+                   help="Ukuran kohort, dipisah koma: 1k,10k,100k,1M,10M")
+    p.add_argument("--only", help="Subset kelompok: micro,e2e,cold,app (default semua)")
+    p.add_argument("--repeat", type=int, default=3, help="Ulangan per benchmark (median dilaporkan)")
+    p.add_argument("--jobs", type=int, default=1, help="--jobs untuk benchmark e2e")
+    p.add_argument("-o", "--output", type=Path, default=Path("bench_results.json"))
+    p.add_argument("--compare", nargs=2, type=Path, metavar=("LAMA", "BARU"),
+                   help="Bandingkan dua file hasil bench (tanpa menjalankan benchmark)")
+    p.add_argument("--model", type=Path, help=MODEL_HELP)
+    p.add_argument("--no-ml", action="store_true", help="Tanpa clf_final")
+    p.set_defaults(func=cmd_bench)
+
+    p = sub.add_parser("export", help="Ekspor clf_final + scaler ke .npz (tanpa pickle)")
+    p.add_argument("--model", type=Path, default=MODEL_PATH)
+    p.add_argument("--scaler", type=Path, default=SCALER_PATH)
+    p.add_argument("-o", "--output", type=Path, help="Folder tujuan (default: folder artefak)")
+    p.add_argument("--check-rows", type=int, default=100_000,
+                   help="Baris kohort sintetis untuk membandingkan prediksi")
+    p.add_argument("--tolerance", type=float, default=1e-5,
+                   help="Selisih probabilitas maks. yang diterima")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("train", help="Latih ulang clf_final (pencarian hyperparameter paralel)")
+    p.add_argument("dataset", type=Path, help="CSV dataset (kolom asli Kaggle atau nama aplikasi)")
+    p.add_argument("--config", type=Path, help="JSON yang menimpa train.DEFAULT_CONFIG")
+    p.add_argument("--model", choices=("xgboost", "rf", "lightgbm"), help="Jenis model (default xgboost)")
+    p.add_argument("--n-iter", type=int, help="Jumlah kandidat hyperparameter (default 24)")
+    p.add_argument("--cv-folds", type=int, help="Jumlah fold StratifiedKFold (default 5)")
+    p.add_argument("--smote", action="store_true", help="SMOTE pada data latih (butuh imbalanced-learn)")
+    p.add_argument("--jobs", type=int, default=1, help="Proses paralel untuk (kandidat, fold) CV")
+    p.add_argument("--out", type=Path, default=BASE_DIR / "models", help="Folder artefak berversi")
+    p.add_argument("--cache-dir", type=Path, default=BASE_DIR / ".cache" / "train")
+    p.add_argument("--promote", action="store_true",
+                   help="Salin artefak hasil ke clf_final.joblib/scaler.joblib/.npz aplikasi")
+    p.set_defaults(func=cmd_train)
+
+    p = sub.add_parser("growth", help="Mode longitudinal: riwayat per anak + deteksi faltering")
+    p.add_argument("inputs", nargs="*", type=Path,
+                   help="File kunjungan (kolom template + id_anak, tanggal_kunjungan), urut per bulan")
+    p.add_argument("-o", "--output", type=Path, default=Path("hasil_tumbuh.csv"),
+                   help="File hasil (satu input) atau folder hasil")
+    p.add_argument("--db", type=Path, default=GROWTH_DB_PATH, help="File SQLite riwayat per anak")
+    p.add_argument("--rate", type=float, default=FALTER_RATE_Z,
+                   help="Ambang penurunan z per bulan antar dua kunjungan")
+    p.add_argument("--trend", type=float, default=FALTER_TREND_Z,
+                   help="Ambang tren penurunan z per bulan (rata-rata eksponensial)")
+    p.add_argument("--anak", help="Tampilkan riwayat satu id_anak (tanpa memproses input)")
+    p.set_defaults(func=cmd_growth)
+
+    p = sub.add_parser("grid", help="Bangun grid risiko (lookup instan untuk prediksi individu)")
+    p.add_argument("--dir", type=Path, default=GRID_DIR, help="Folder cache grid")
+    p.add_argument("--who-step", type=float, nargs=2, default=WHO_STEPS, metavar=("CM", "KG"),
+                   help="Resolusi tinggi & berat untuk z-score WHO")
+    p.add_argument("--ml-step", type=float, nargs=2, default=ML_STEPS, metavar=("CM", "KG"),
+                   help="Resolusi tinggi & berat untuk probabilitas ML (lebih halus = lebih akurat, lebih besar)")
+    p.add_argument("--jobs", type=int, default=1, help="Proses paralel untuk tabel ML")
+    p.add_argument("--check-rows", type=int, default=GRID_CHECK_ROWS,
+                   help="Input acak untuk cek galat grid vs perhitungan langsung (0 = lewati)")
+    p.add_argument("--keep", action="store_true", help="Jangan hapus grid versi model lama")
+    p.add_argument("--model", type=Path, help=MODEL_HELP)
+    p.add_argument("--scaler", type=Path)
+    p.add_argument("--no-ml", action="store_true", help="Grid WHO saja")
+    p.set_defaults(func=cmd_grid)
+    return parser
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command not in ("export", "train", "growth", "report"):
+        # Default artefak: clf_final.npz/scaler.npz bila sesuai joblib, selain itu joblib
+        model_path, scaler_path = artifact_paths()
+        if getattr(args, "model", False) is None:
+            args.model = model_path
+        if getattr(args, "scaler", False) is None:
+            args.scaler = scaler_path
+    try:
+        return args.func(args)
+    except (FileNotFoundError, ValueError) as e:
+        parser.exit(2, f"{parser.prog}: error: {e}\n")
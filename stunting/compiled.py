@@ -0,0 +1,249 @@
+# ============================================================
+# stunting/compiled.py
+# Ekspor clf_final (XGBoost) + StandardScaler ke .npz tanpa pickle, dan
+# evaluator NumPy murni sehingga inferensi tidak perlu import xgboost/sklearn.
+#
+#   python -m stunting export            -> clf_final.npz + scaler.npz
+#
+# Format model: array node datar semua pohon (anak kiri/kanan, fitur,
+# threshold float32, arah missing, nilai daun) + base margin. Saat dimuat,
+# node dikelompokkan per (fitur, threshold) menjadi tabel bitmask daun per
+# pohon (ala QuickScorer): untuk satu baris, daun keluar tiap pohon = bit
+# terendah dari AND tabel semua fitur, tanpa menelusuri pohon node per node.
+# Fitur dengan sedikit threshold unik digabung menjadi satu tabel (produk
+# kartesius) agar jumlah gather per baris lebih sedikit.
+
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+
+COMPILED_FORMAT = 1
+COMPILED_CHUNK_ROWS = 1024
+GROUP_MAX_ROWS = 4096      # batas baris tabel gabungan beberapa fitur
+SUPPORTED_OBJECTIVES = ("binary:logistic",)
+MASK_DTYPES = ((8, np.uint8), (16, np.uint16))
+
+def _sha256(path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+# ----------------- Ekspor (butuh xgboost/sklearn) -----------------
+def export_xgboost(model) -> tuple:
+    # Return (arrays, meta) dari XGBClassifier / Booster biner
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    raw = json.loads(booster.save_raw("json"))
+    learner = raw["learner"]
+    objective = learner["objective"]["name"]
+    if objective not in SUPPORTED_OBJECTIVES:
+        raise ValueError(f"Objective {objective} belum didukung (hanya {SUPPORTED_OBJECTIVES})")
+    gbm = learner["gradient_booster"]
+    if gbm["name"] != "gbtree":
+        raise ValueError(f"Booster {gbm['name']} belum didukung (hanya gbtree)")
+    trees = gbm["model"]["trees"]
+    if any(t["categories_nodes"] for t in trees):
+        raise ValueError("Split kategorikal belum didukung")
+
+    base_score = float(str(learner["learner_model_param"]["base_score"]).strip("[]"))
+    tree_ptr = np.cumsum([0] + [len(t["left_children"]) for t in trees]).astype(np.int64)
+    cat = lambda key, dtype: np.concatenate([np.asarray(t[key], dtype=dtype) for t in trees])
+    arrays = {
+        "tree_ptr": tree_ptr,
+        "left": cat("left_children", np.int32),
+        "right": cat("right_children", np.int32),
+        "feature": cat("split_indices", np.int32),
+        "threshold": cat("split_conditions", np.float32),  # daun: nilai daun
+        "default_left": cat("default_left", np.uint8).astype(bool),
+        "base_margin": np.float64(np.log(base_score / (1 - base_score))),
+    }
+    names = getattr(model, "feature_names_in_", None)
+    if names is None:
+        names = booster.feature_names or []
+    meta = {
+        "kind": "trees", "objective": objective, "n_trees": len(trees),
+        "n_features": int(learner["learner_model_param"]["num_feature"]),
+        "feature_names": [str(n) for n in names], "xgboost_version": raw.get("version"),
+    }
+    return arrays, meta
+
+def export_scaler(scaler) -> tuple:
+    arrays = {"mean": np.asarray(scaler.mean_, dtype=np.float64),
+              "scale": np.asarray(scaler.scale_, dtype=np.float64)}
+    names = getattr(scaler, "feature_names_in_", None)
+    meta = {"kind": "scaler", "feature_names": [] if names is None else [str(n) for n in names]}
+    return arrays, meta
+
+def save_compiled(path, arrays: dict, meta: dict, source=None) -> Path:
+    # meta disimpan sebagai string JSON (array unicode, tanpa pickle)
+    meta = {**meta, "format": COMPILED_FORMAT}
+    if source is not None:
+        meta["source"], meta["source_sha256"] = Path(source).name, _sha256(source)
+    path = Path(path)
+    with open(path, "wb") as f:
+        np.savez_compressed(f, meta=np.array(json.dumps(meta)), **arrays)
+    return path
+
+def compile_artifacts(model_path, scaler_path, out_dir=None) -> list:
+    # clf_final.joblib -> clf_final.npz, scaler.joblib -> scaler.npz
+    import joblib
+
+    written = []
+    for src, export in ((model_path, export_xgboost), (scaler_path, export_scaler)):
+        if src is None or not Path(src).exists():
+            continue
+        src = Path(src)
+        dst = Path(out_dir or src.parent) / (src.stem + ".npz")
+        arrays, meta = export(joblib.load(src))
+        written.append(save_compiled(dst, arrays, meta, source=src))
+    return written
+
+# ----------------- Evaluator (NumPy saja) -----------------
+class CompiledTrees:
+    def __init__(self, arrays: dict, meta: dict):
+        self.meta = meta
+        self.n_features = meta["n_features"]
+        self.feature_names_in_ = np.array(meta["feature_names"], dtype=object)
+        self.base_margin = float(arrays["base_margin"])
+        self._build(arrays)
+
+    def _build(self, a):
+        ptr, left, right = a["tree_ptr"], a["left"], a["right"]
+        n_trees = len(ptr) - 1
+        is_leaf = left == -1
+
+        # Daun tiap pohon diberi nomor kiri->kanan (DFS); bit i = daun ke-i
+        leaf_no = np.full(len(left), -1, dtype=np.int64)
+        first_leaf = np.zeros(len(left), dtype=np.int64)   # rentang daun subtree
+        n_leaf = np.zeros(len(left), dtype=np.int64)
+        max_leaves = 0
+        for t in range(n_trees):
+            base, count, stack = ptr[t], 0, [(0, False)]
+            while stack:
+                node, done = stack.pop()
+                g = base + node
+                if is_leaf[g]:
+                    leaf_no[g], first_leaf[g], n_leaf[g] = count, count, 1
+                    count += 1
+                elif done:
+                    first_leaf[g] = first_leaf[base + left[g]]
+                    n_leaf[g] = n_leaf[base + left[g]] + n_leaf[base + right[g]]
+                else:
+                    stack += [(node, True), (right[g], False), (left[g], False)]
+            max_leaves = max(max_leaves, count)
+        for bits, dtype in MASK_DTYPES:
+            if max_leaves <= bits:
+                break
+        else:
+            raise ValueError(f"Pohon dengan {max_leaves} daun belum didukung (maks. 16)")
+        self.mask_dtype = dtype
+        full = dtype(np.iinfo(dtype).max)
+
+        tree_of = np.repeat(np.arange(n_trees), np.diff(ptr))
+        self.leaf_values = np.zeros((n_trees, max_leaves), dtype=np.float32)
+        self.leaf_values[tree_of[is_leaf], leaf_no[is_leaf]] = a["threshold"][is_leaf]
+
+        # Node "salah" (x >= threshold -> ke kanan) mematikan daun subtree kiri
+        internal = np.flatnonzero(~is_leaf)
+        lchild = ptr[tree_of[internal]] + left[internal]
+        kill = np.zeros(len(internal), dtype=np.uint64)
+        for i, (f0, n) in enumerate(zip(first_leaf[lchild], n_leaf[lchild])):
+            kill[i] = ((1 << int(n)) - 1) << int(f0)
+        masks = (~kill & np.uint64(full)).astype(dtype)
+
+        # Per fitur: threshold unik terurut; tabel[k] = AND mask semua node
+        # dengan rank threshold < k (kumulatif), baris terakhir = nilai missing
+        feat = a["feature"][internal]
+        thr = a["threshold"][internal]
+        default_left = a["default_left"][internal]
+        self.thresholds, tables = [], []
+        for f in range(self.n_features):
+            sel = np.flatnonzero(feat == f)
+            uniq, rank = np.unique(thr[sel], return_inverse=True)
+            table = np.full((len(uniq) + 2, n_trees), full, dtype=dtype)
+            np.bitwise_and.at(table, (rank + 1, tree_of[internal[sel]]), masks[sel])
+            np.bitwise_and.accumulate(table[:-1], axis=0, out=table[:-1])
+            miss = sel[~default_left[sel]]
+            np.bitwise_and.at(table, (len(uniq) + 1, tree_of[internal[miss]]), masks[miss])
+            self.thresholds.append(uniq)
+            tables.append(table)
+        self._group_tables(tables)
+
+        # Nomor bit terendah (= daun keluar) lewat tabel lookup
+        low = np.arange(1 << bits)
+        self._ctz = np.zeros(1 << bits, dtype=np.uint8)
+        self._ctz[1:] = np.log2(low[1:] & -low[1:]).astype(np.uint8)
+        self._leaf_offset = (np.arange(n_trees, dtype=np.int32) * max_leaves)[None, :]
+
+    def _group_tables(self, tables):
+        # Gabungkan dua grup terkecil selama ukuran tabel hasil <= GROUP_MAX_ROWS.
+        # Grup = (daftar fitur, tabel); kode grup = kode fitur digabung mixed-radix.
+        groups = sorted((([f], t) for f, t in enumerate(tables)), key=lambda g: len(g[1]))
+        while len(groups) > 1 and len(groups[0][1]) * len(groups[1][1]) <= GROUP_MAX_ROWS:
+            (fa, ta), (fb, tb) = groups[0], groups[1]
+            joint = (ta[:, None, :] & tb[None, :, :]).reshape(-1, ta.shape[1])
+            groups = sorted(groups[2:] + [(fa + fb, joint)], key=lambda g: len(g[1]))
+        self.groups = groups
+
+    def _codes(self, part: np.ndarray, features) -> np.ndarray:
+        code = None
+        for f in features:
+            uniq, col = self.thresholds[f], part[:, f]
+            k = np.searchsorted(uniq, col, side="right")
+            k[np.isnan(col)] = len(uniq) + 1
+            code = k if code is None else code * (len(uniq) + 2) + k
+        return code
+
+    def decision_function(self, X) -> np.ndarray:
+        # Margin (log-odds) per baris; perbandingan float32 seperti XGBoost
+        X = np.asarray(X, dtype=np.float32)
+        out = np.empty(len(X), dtype=np.float64)
+        flat_leaves = self.leaf_values.ravel()
+        for start in range(0, len(X), COMPILED_CHUNK_ROWS):
+            part = X[start:start + COMPILED_CHUNK_ROWS]
+            state = None
+            for features, table in self.groups:
+                rows = np.take(table, self._codes(part, features), axis=0)
+                state = rows if state is None else np.bitwise_and(state, rows, out=state)
+            leaf = np.take(self._ctz, state) + self._leaf_offset
+            out[start:start + len(part)] = np.take(flat_leaves, leaf, mode="clip").sum(
+                axis=1, dtype=np.float64)
+        return out + self.base_margin
+
+    def predict_proba(self, X) -> np.ndarray:
+        p = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - p, p])
+
+class CompiledScaler:
+    def __init__(self, arrays: dict, meta: dict):
+        self.meta = meta
+        self.mean_, self.scale_ = arrays["mean"], arrays["scale"]
+        self.feature_names_in_ = np.array(meta["feature_names"], dtype=object)
+
+    def transform(self, X) -> np.ndarray:
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+COMPILED_KINDS = {"trees": CompiledTrees, "scaler": CompiledScaler}
+
+def load_compiled(path):
+    with np.load(path, allow_pickle=False) as npz:
+        meta = json.loads(str(npz["meta"]))
+        arrays = {k: npz[k] for k in npz.files if k != "meta"}
+    if meta.get("format") != COMPILED_FORMAT:
+        raise ValueError(f"{path}: format {meta.get('format')} tidak dikenal")
+    return COMPILED_KINDS[meta["kind"]](arrays, meta)
+
+def compiled_meta(path) -> dict:
+    with np.load(path, allow_pickle=False) as npz:
+        return json.loads(str(npz["meta"]))
+
+def is_fresh(compiled_path, source_path) -> bool:
+    # True bila .npz ada dan dibuat dari isi artefak joblib yang sekarang
+    compiled_path, source_path = Path(compiled_path), Path(source_path)
+    if not compiled_path.exists():
+        return False
+    if not source_path.exists():
+        return True
+    try:
+        return compiled_meta(compiled_path).get("source_sha256") == _sha256(source_path)
+    except (OSError, ValueError, KeyError):
+        return False
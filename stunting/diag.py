@@ -0,0 +1,211 @@
+# ============================================================
+# stunting/diag.py
+# Diagnostik jalur panas:
+# - Trace: span waktu per tahap satu request (baca, validasi, skoring, render,
+#   encode) + baris/detik, masing-masing juga ditulis sebagai satu baris log
+#   JSON di logger "stunting.perf" (mudah diagregasi).
+# - TraceLog: ring buffer trace terakhir + ringkasan p50/p95 per tahap.
+# - SamplingProfiler: profiler sampling (stdlib) untuk satu request; hasil
+#   berupa stack "folded" (flamegraph.pl / speedscope) dan tabel fungsi teratas.
+
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+# Trace dipakai di setiap rerun aplikasi (juga halaman home), jadi pandas/numpy
+# baru di-import saat tabel ringkasan diminta
+if TYPE_CHECKING:
+    import pandas as pd
+
+PERF_LOGGER = "stunting.perf"
+TRACE_HISTORY = 500
+PROFILE_INTERVAL_S = 0.005
+PROFILE_DIR = Path(os.environ.get("STUNTING_PROFILE_DIR", Path(tempfile.gettempdir()) / "stunting_profiles"))
+
+log = logging.getLogger(PERF_LOGGER)
+
+# ----------------- Log terstruktur -----------------
+def emit(event: str, **fields):
+    if log.isEnabledFor(logging.INFO):
+        log.info(json.dumps({"event": event, "ts": round(time.time(), 3), **fields},
+                            ensure_ascii=False, default=str))
+
+def setup_perf_log(path=None, level=logging.INFO) -> logging.Logger:
+    # Satu handler saja walau dipanggil berulang (mis. tiap rerun Streamlit).
+    # path=None -> stderr; selain itu file JSON-lines (append).
+    if not any(getattr(h, "_stunting_perf", False) for h in log.handlers):
+        handler = logging.FileHandler(path, encoding="utf-8") if path else logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        handler._stunting_perf = True
+        log.addHandler(handler)
+        log.propagate = False
+    log.setLevel(level)
+    return log
+
+# ----------------- Trace per request -----------------
+class Trace:
+    def __init__(self, page: str, **attrs):
+        self.id = uuid.uuid4().hex[:12]
+        self.page = page
+        self.attrs = attrs
+        self.started = time.time()
+        self.spans = []
+        self.seconds = None
+        self.profile = None
+        self._t0 = time.perf_counter()
+
+    @contextmanager
+    def span(self, stage: str, rows=None):
+        # rec["rows"] boleh diisi di dalam blok bila jumlah baris baru diketahui
+        rec = {"stage": stage, "rows": rows}
+        t0 = time.perf_counter()
+        try:
+            yield rec
+        except Exception as e:
+            rec["error"] = type(e).__name__
+            raise
+        finally:
+            rec["ms"] = round((time.perf_counter() - t0) * 1000, 3)
+            if rec["rows"] and rec["ms"] > 0:
+                rec["rows_per_s"] = round(rec["rows"] / rec["ms"] * 1000)
+            self.spans.append(rec)
+            emit("span", trace=self.id, page=self.page, **rec)
+
+    def finish(self, **attrs):
+        self.attrs.update(attrs)
+        self.seconds = time.perf_counter() - self._t0
+        emit("request", trace=self.id, page=self.page, ms=round(self.seconds * 1000, 3),
+             stages={s["stage"]: s["ms"] for s in self.spans}, profile=self.profile,
+             **self.attrs)
+        return self
+
+class TraceLog:
+    # Dibagi antar sesi (st.cache_resource), jadi akses dikunci
+    def __init__(self, maxlen: int = TRACE_HISTORY):
+        self._lock = threading.Lock()
+        self._traces = deque(maxlen=maxlen)
+
+    def add(self, trace: Trace):
+        with self._lock:
+            self._traces.append(trace)
+
+    def recent(self, n: int = 20) -> "pd.DataFrame":
+        import pandas as pd
+
+        with self._lock:
+            traces = list(self._traces)[-n:]
+        rows = [{
+            "waktu": time.strftime("%H:%M:%S", time.localtime(t.started)),
+            "trace": t.id, "halaman": t.page,
+            "total_ms": round((t.seconds or 0) * 1000, 1),
+            **{s["stage"]: s["ms"] for s in t.spans},
+            **t.attrs,
+        } for t in reversed(traces)]
+        return pd.DataFrame(rows)
+
+    def stage_summary(self) -> "pd.DataFrame":
+        # Per (halaman, tahap): jumlah, p50/p95/maks ms, baris/s agregat
+        import numpy as np
+        import pandas as pd
+
+        with self._lock:
+            spans = [(t.page, s) for t in self._traces for s in t.spans]
+        cols = ["halaman", "tahap", "jumlah", "p50_ms", "p95_ms", "maks_ms", "baris", "baris_per_s"]
+        if not spans:
+            return pd.DataFrame(columns=cols)
+        df = pd.DataFrame({
+            "halaman": [p for p, _ in spans],
+            "tahap": [s["stage"] for _, s in spans],
+            "ms": [s["ms"] for _, s in spans],
+            "baris": [s["rows"] or 0 for _, s in spans],
+        })
+        g = df.groupby(["halaman", "tahap"], sort=False)
+        out = g["ms"].agg(jumlah="size", p50_ms="median",
+                          p95_ms=lambda v: np.percentile(v, 95), maks_ms="max")
+        out["baris"] = g["baris"].sum()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rps = out["baris"] / g["ms"].sum() * 1000
+        out["baris_per_s"] = rps.where(out["baris"] > 0).round()
+        return out.round(3).reset_index()[cols]
+
+# ----------------- Profiler sampling -----------------
+class SamplingProfiler:
+    # Thread pengambil sampel membaca stack thread target tiap interval
+    # (sys._current_frames). Overhead kecil dan tidak mengubah waktu tiap
+    # fungsi seperti cProfile; kode C panjang (mis. XGBoost) tercatat pada
+    # frame Python yang memanggilnya.
+    def __init__(self, interval: float = PROFILE_INTERVAL_S, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.stacks = Counter()
+        self.samples = 0
+        self.seconds = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        self.thread_id = self.thread_id or threading.get_ident()
+        self._t0 = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.seconds = time.perf_counter() - self._t0
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{Path(code.co_filename).name}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        # Format "a;b;c jumlah" per baris
+        return "".join(f"{s} {n}\n" for s, n in self.stacks.most_common())
+
+    def top(self, n: int = 25) -> "pd.DataFrame":
+        # self = sampel saat fungsi berada di puncak stack; kumulatif = di mana saja
+        import pandas as pd
+
+        own, cum = Counter(), Counter()
+        for stack, k in self.stacks.items():
+            funcs = [f.rsplit(":", 1)[0] for f in stack.split(";")]
+            own[funcs[-1]] += k
+            for f in set(funcs):
+                cum[f] += k
+        total = max(self.samples, 1)
+        rows = [{"fungsi": f, "self_%": round(100 * own[f] / total, 1),
+                 "kumulatif_%": round(100 * c / total, 1)} for f, c in cum.items()]
+        df = pd.DataFrame(rows, columns=["fungsi", "self_%", "kumulatif_%"])
+        return df.sort_values(["self_%", "kumulatif_%"], ascending=False).head(n).reset_index(drop=True)
+
+    def dump(self, name: str, directory=PROFILE_DIR) -> Path:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{name}.folded"
+        path.write_text(self.folded(), encoding="utf-8")
+        return path
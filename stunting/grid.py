@@ -0,0 +1,371 @@
+# ============================================================
+# stunting/grid.py
+# Grid risiko siap pakai untuk prediksi individu (dan simulasi what-if):
+#
+#   python -m stunting grid          -> .cache/grid/<key>/ (file .npy + meta.json)
+#
+# Domain input individu terbatas (rentang number_input di render_individu),
+# jadi hasilnya bisa dihitung sekali lalu dibaca lewat memory map:
+# - WHO: z TB/U per (jk, usia, tinggi) dan z BB/U per (jk, usia, berat) untuk
+#   metode sd & lms, diinterpolasi linear; probabilitas dihitung dari kedua z.
+#   Kategori memakai batas per (jk, usia) sehingga tetap eksak.
+# - ML: probabilitas clf_final per (jk, usia, kelompok berat lahir, kelompok
+#   tinggi lahir, tinggi, berat), diinterpolasi bilinear pada tinggi x berat.
+#   Model pohon konstan di antara threshold, jadi data lahir cukup
+#   dikelompokkan per interval threshold model (eksak, bukan resolusi grid).
+#   Tinggi x berat TIDAK eksak (fungsi tangga diinterpolasi; galat maks ~0.2),
+#   jadi nilai ini hanya untuk pratinjau what-if, bukan hasil prediksi.
+# Key folder = hash versi model/scaler + resolusi; grid versi model baru
+# dibangun lewat `python -m stunting grid` (atau aksi admin di aplikasi).
+
+import hashlib
+import json
+import math
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .ml import BASE_DIR, ML_FEATURES, ML_MODEL_SCALED, build_ml_features, ml_predict_proba
+from .who import (BBU_LABELS, PREDIKSI_LABELS, TBU_LABELS, WHO_BBU, WHO_MAX_AGE, WHO_TBU,
+                  Z_METHODS, _lms_interp, _lms_value, score_batch)
+
+GRID_DIR = BASE_DIR / ".cache" / "grid"
+GRID_FORMAT = 1
+# Sama dengan batas number_input di render_individu
+GRID_RANGES = {
+    "usia_bulan": (0, WHO_MAX_AGE),
+    "tinggi_badan_cm": (40.0, 130.0),
+    "berat_badan_kg": (1.0, 30.0),
+    "tinggi_lahir_cm": (30.0, 60.0),
+    "berat_lahir_kg": (1.0, 6.0),
+}
+WHO_STEPS = (0.1, 0.01)    # (cm, kg) untuk z WHO
+ML_STEPS = (1.0, 0.25)     # (cm, kg) untuk probabilitas ML
+ML_SCALE = 65535           # probabilitas ML disimpan uint16
+GRID_CHECK_ROWS = 20_000
+BIRTH_FEATURES = ("berat_lahir_kg", "tinggi_lahir_cm")
+
+def grid_key(model_version=None, scaler_version=None, who_steps=WHO_STEPS,
+             ml_steps=ML_STEPS) -> str:
+    spec = [GRID_FORMAT, model_version, scaler_version, ML_MODEL_SCALED,
+            list(who_steps), list(ml_steps), GRID_RANGES]
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:16]
+
+def _axis(name: str, step: float) -> np.ndarray:
+    lo, hi = GRID_RANGES[name]
+    return np.round(lo + step * np.arange(int(round((hi - lo) / step)) + 1), 6)
+
+# ----------------- Threshold data lahir dari model pohon -----------------
+def _compiled(model):
+    from .compiled import CompiledTrees, export_xgboost
+
+    if isinstance(model, CompiledTrees):
+        return model
+    if hasattr(model, "get_booster"):
+        return CompiledTrees(*export_xgboost(model))
+    return None
+
+def birth_buckets(model, scaler=None) -> dict:
+    # {fitur: (threshold, nilai wakil tiap interval di dalam domain)}; None bila
+    # model bukan pohon XGBoost (ML tidak masuk grid)
+    trees = _compiled(model)
+    if trees is None:
+        return None
+    out = {}
+    for name in BIRTH_FEATURES:
+        j = ML_FEATURES.index(name)
+        thr = trees.thresholds[j].astype(np.float64)
+        if ML_MODEL_SCALED and scaler is not None:
+            thr = thr * scaler.scale_[j - 1] + scaler.mean_[j - 1]
+        lo, hi = GRID_RANGES[name]
+        inside = thr[(thr > lo) & (thr <= hi)]
+        edges = np.concatenate([[lo], inside, [hi + 1e-6]])
+        out[name] = (thr, (edges[:-1] + edges[1:]) / 2)
+    return out
+
+# ----------------- Membangun grid -----------------
+def _who_arrays(who_steps) -> dict:
+    tb, bb = _axis("tinggi_badan_cm", who_steps[0]), _axis("berat_badan_kg", who_steps[1])
+    ages = np.arange(WHO_MAX_AGE + 1)
+    arrays = {}
+    for method in Z_METHODS:
+        for name, axis, col in (("tbu", tb, "z_TBU"), ("bbu", bb, "z_BBU")):
+            sex, age, value = (g.ravel() for g in np.meshgrid([0, 1], ages, axis, indexing="ij"))
+            gender = np.where(sex == 0, "Laki-laki", "Perempuan")
+            other = np.full(len(value), np.nan if name == "tbu" else 80.0)
+            height, weight = (value, np.full(len(value), 10.0)) if name == "tbu" else (other, value)
+            z = score_batch(gender, age, height, weight, method=method)[col].to_numpy()
+            arrays[f"z_{name}_{method}"] = z.reshape(2, len(ages), len(axis)).astype(np.float32)
+    # Batas kategori (-3 SD, -2 SD, +2 SD) dalam satuan ukur per (jk, usia)
+    arrays["cut_tbu_sd"] = WHO_TBU[:, :, [0, 1, 3]]
+    arrays["cut_bbu_sd"] = WHO_BBU[:, :, [0, 1, 5]]
+    sex, age = (g.ravel() for g in np.meshgrid([0, 1], ages, indexing="ij"))
+    for name in ("tbu", "bbu"):
+        L, M, S = _lms_interp(name, sex, age.astype(float))
+        cuts = np.stack([_lms_value(L, M, S, z) for z in (-3.0, -2.0, 2.0)], axis=-1)
+        arrays[f"cut_{name}_lms"] = cuts.reshape(2, len(ages), 3)
+    return arrays
+
+_GRID = {}
+
+def _init_ml(model, scaler, base):
+    # Model & kombinasi (data lahir, tinggi, berat) dikirim sekali per proses
+    _GRID.update(model=model, scaler=scaler, base=base)
+
+def _ml_slice(sex: int, age: int) -> np.ndarray:
+    df = _GRID["base"].assign(jenis_kelamin=("Laki-laki", "Perempuan")[sex], usia_bulan=age)
+    X = build_ml_features(df, _GRID["scaler"] if ML_MODEL_SCALED else None)
+    return np.round(ml_predict_proba(_GRID["model"], X) * ML_SCALE).astype(np.uint16)
+
+def _ml_array(out, model, scaler, buckets, ml_steps, jobs: int = 1, log=print):
+    # out: array (2, usia, kel. berat lahir, kel. tinggi lahir, tinggi, berat)
+    tb, bb = _axis("tinggi_badan_cm", ml_steps[0]), _axis("berat_badan_kg", ml_steps[1])
+    bw, bl = buckets["berat_lahir_kg"][1], buckets["tinggi_lahir_cm"][1]
+    g_bw, g_bl, g_tb, g_bb = (g.ravel() for g in np.meshgrid(bw, bl, tb, bb, indexing="ij"))
+    base = pd.DataFrame({"berat_lahir_kg": g_bw, "tinggi_lahir_cm": g_bl,
+                         "berat_badan_kg": g_bb, "tinggi_badan_cm": g_tb})
+    slices = [(s, a) for s in (0, 1) for a in range(WHO_MAX_AGE + 1)]
+    log(f"[grid] ML: {len(slices)} irisan x {len(base):,} sel ({jobs} proses)")
+    if jobs <= 1:
+        _init_ml(model, scaler, base)
+        for s, a in slices:
+            out[s, a] = _ml_slice(s, a).reshape(out.shape[2:])
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_ml,
+                                 initargs=(model, scaler, base)) as pool:
+            futures = [(s, a, pool.submit(_ml_slice, s, a)) for s, a in slices]
+            for s, a, fut in futures:
+                out[s, a] = fut.result().reshape(out.shape[2:])
+
+def build_grid(root=GRID_DIR, model=None, scaler=None, model_version=None, scaler_version=None,
+               who_steps=WHO_STEPS, ml_steps=ML_STEPS, jobs: int = 1,
+               check_rows=GRID_CHECK_ROWS, log=print) -> Path:
+    # Ditulis ke folder sementara lalu di-rename, jadi pembaca tidak pernah
+    # melihat grid setengah jadi
+    key = grid_key(model_version, scaler_version, who_steps, ml_steps)
+    dst = Path(root) / key
+    tmp = Path(root) / f".{key}.{os.getpid()}.{threading.get_ident()}"
+    tmp.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    arrays = _who_arrays(who_steps)
+    buckets = birth_buckets(model, scaler) if model is not None else None
+    meta = {
+        "format": GRID_FORMAT, "key": key, "model_sha256": model_version,
+        "scaler_sha256": scaler_version, "who_steps": list(who_steps),
+        "ml_steps": list(ml_steps), "ranges": GRID_RANGES, "ml": buckets is not None,
+    }
+    if buckets is not None:
+        # Tabel ML (puluhan MB) ditulis langsung ke file .npy
+        shape = (2, WHO_MAX_AGE + 1, len(buckets["berat_lahir_kg"][1]),
+                 len(buckets["tinggi_lahir_cm"][1]), len(_axis("tinggi_badan_cm", ml_steps[0])),
+                 len(_axis("berat_badan_kg", ml_steps[1])))
+        out = np.lib.format.open_memmap(tmp / "ml.npy", mode="w+", dtype=np.uint16, shape=shape)
+        _ml_array(out, model, scaler, buckets, ml_steps, jobs, log)
+        out.flush()
+        del out
+        for name, (thr, rep) in buckets.items():
+            arrays[f"thr_{name}"] = thr
+            meta[f"kelompok_{name}"] = len(rep)
+    for name, arr in arrays.items():
+        np.save(tmp / f"{name}.npy", np.ascontiguousarray(arr))
+    meta["build_s"] = round(time.perf_counter() - t0, 2)
+    meta["bytes"] = sum(p.stat().st_size for p in tmp.glob("*.npy"))
+    (tmp / "meta.json").write_text(json.dumps(meta, indent=2))
+
+    if check_rows:
+        meta["galat"] = check_grid(RiskGrid(tmp), model, scaler, check_rows)
+        (tmp / "meta.json").write_text(json.dumps(meta, indent=2))
+    if dst.exists():
+        shutil.rmtree(dst)
+    os.replace(tmp, dst)
+    return dst
+
+def check_grid(grid, model=None, scaler=None, n: int = GRID_CHECK_ROWS, seed: int = 0) -> dict:
+    # Bandingkan grid dengan perhitungan langsung pada input acak di domain
+    rng = np.random.default_rng(seed)
+    cols = {name: rng.uniform(lo, hi, n) for name, (lo, hi) in GRID_RANGES.items()}
+    df = pd.DataFrame({
+        "jenis_kelamin": rng.choice(["Laki-laki", "Perempuan"], n),
+        "usia_bulan": rng.integers(0, WHO_MAX_AGE + 1, n),
+        **{k: np.round(v, 2) for k, v in cols.items() if k != "usia_bulan"},
+    })
+    report = {}
+    for method in Z_METHODS:
+        exact = score_batch(df["jenis_kelamin"], df["usia_bulan"], df["tinggi_badan_cm"],
+                            df["berat_badan_kg"], method=method)
+        got = pd.DataFrame([grid.predict(*row, method=method) for row in df[
+            ["jenis_kelamin", "usia_bulan", "tinggi_badan_cm", "berat_badan_kg",
+             "berat_lahir_kg", "tinggi_lahir_cm"]].itertuples(index=False)])
+        report[method] = {
+            "z_maks": float(max(np.abs(got["z_TBU"] - exact["z_TBU"]).max(),
+                                np.abs(got["z_BBU"] - exact["z_BBU"]).max())),
+            "prob_maks": float(np.abs(got["Prob_Risiko"] - exact["Prob_Risiko"]).max()),
+            "kategori_beda": int((got["TB/U"] != exact["TB/U"]).sum()
+                                 + (got["BB/U"] != exact["BB/U"]).sum()),
+        }
+    if grid.has_ml and model is not None:
+        p = ml_predict_proba(model, build_ml_features(df, scaler if ML_MODEL_SCALED else None))
+        err = np.abs(got["ML_Prob"].to_numpy() - p)
+        report["ml"] = {"maks": float(err.max()), "p99": float(np.percentile(err, 99)),
+                        "median": float(np.median(err))}
+    return report
+
+# ----------------- Lookup -----------------
+class RiskGrid:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.meta = json.loads((self.path / "meta.json").read_text())
+        load = lambda name: np.load(self.path / f"{name}.npy", mmap_mode="r")
+        self._z = {key: load("z_" + key) for key in
+                   (f"{ind}_{m}" for ind in ("tbu", "bbu") for m in Z_METHODS)}
+        # Batas kategori kecil: dibaca penuh sebagai list Python (cepat diakses)
+        self._cut = {key: np.load(self.path / f"cut_{key}.npy").tolist() for key in self._z}
+        self._who_lo = (GRID_RANGES["tinggi_badan_cm"][0], GRID_RANGES["berat_badan_kg"][0])
+        self._who_steps = self.meta["who_steps"]
+        self.has_ml = self.meta["ml"]
+        if self.has_ml:
+            self._ml = load("ml")
+            self._ml_steps = self.meta["ml_steps"]
+            self._thr = {name: np.load(self.path / f"thr_{name}.npy").tolist()
+                         for name in BIRTH_FEATURES}
+            self._first = {name: _bucket(self._thr[name], GRID_RANGES[name][0])
+                           for name in BIRTH_FEATURES}
+
+    def predict(self, jenis_kelamin: str, usia_bulan: int, tinggi_badan_cm: float,
+                berat_badan_kg: float, berat_lahir_kg=None, tinggi_lahir_cm=None,
+                method: str = "sd"):
+        # Satu anak -> dict kolom seperti score_batch + ML_Prob; None bila
+        # input di luar domain grid (pemanggil menghitung langsung)
+        age = int(usia_bulan)
+        if age != usia_bulan or not _inside(age, "usia_bulan") \
+                or not _inside(tinggi_badan_cm, "tinggi_badan_cm") \
+                or not _inside(berat_badan_kg, "berat_badan_kg"):
+            return None
+        s = 0 if jenis_kelamin == "Laki-laki" else 1
+        z_tbu = _lerp(self._z[f"tbu_{method}"][s, age], tinggi_badan_cm, self._who_lo[0],
+                      self._who_steps[0])
+        z_bbu = _lerp(self._z[f"bbu_{method}"][s, age], berat_badan_kg, self._who_lo[1],
+                      self._who_steps[1])
+        m3, m2, p2 = self._cut[f"tbu_{method}"][s][age]
+        tbu = (tinggi_badan_cm >= m3) + (tinggi_badan_cm >= m2) + (tinggi_badan_cm > p2)
+        m3, m2, p2 = self._cut[f"bbu_{method}"][s][age]
+        bbu = (berat_badan_kg >= m3) + (berat_badan_kg >= m2) + (berat_badan_kg > p2)
+        p_tbu = 1.0 / (1.0 + math.exp(min(2.0 * (z_tbu + 2.0), 700.0)))
+        p_bbu = 1.0 / (1.0 + math.exp(min(1.5 * (z_bbu + 2.0), 700.0)))
+        return {
+            "TB/U": TBU_LABELS[tbu], "BB/U": BBU_LABELS[bbu],
+            "Prob_Risiko": min(max(0.8 * p_tbu + 0.2 * p_bbu, 0.0), 1.0),
+            "z_TBU": z_tbu, "z_BBU": z_bbu, "Prediksi": PREDIKSI_LABELS[int(tbu <= 1)],
+            "ML_Prob": self._ml_prob(s, age, tinggi_badan_cm, berat_badan_kg,
+                                     berat_lahir_kg, tinggi_lahir_cm),
+        }
+
+    def _ml_prob(self, s, age, tb, bb, bw, bl):
+        if not self.has_ml or bw is None or bl is None \
+                or not _inside(bw, "berat_lahir_kg") or not _inside(bl, "tinggi_lahir_cm"):
+            return None
+        i = _bucket(self._thr["berat_lahir_kg"], bw) - self._first["berat_lahir_kg"]
+        j = _bucket(self._thr["tinggi_lahir_cm"], bl) - self._first["tinggi_lahir_cm"]
+        table = self._ml[s, age, i, j]
+        x = (tb - GRID_RANGES["tinggi_badan_cm"][0]) / self._ml_steps[0]
+        y = (bb - GRID_RANGES["berat_badan_kg"][0]) / self._ml_steps[1]
+        h = min(int(x), table.shape[0] - 2)
+        w = min(int(y), table.shape[1] - 2)
+        fx, fy = x - h, y - w
+        p = ((1 - fx) * ((1 - fy) * int(table[h, w]) + fy * int(table[h, w + 1]))
+             + fx * ((1 - fy) * int(table[h + 1, w]) + fy * int(table[h + 1, w + 1])))
+        return p / ML_SCALE
+
+def _inside(value, name) -> bool:
+    lo, hi = GRID_RANGES[name]
+    return lo <= value <= hi
+
+def _bucket(thresholds: list, value: float) -> int:
+    # Jumlah threshold <= nilai (float32, sama dengan perbandingan XGBoost)
+    import bisect
+
+    return bisect.bisect_right(thresholds, float(np.float32(value)))
+
+def _lerp(row, value: float, lo: float, step: float) -> float:
+    x = (value - lo) / step
+    i = min(int(x), len(row) - 2)
+    a, b = float(row[i]), float(row[i + 1])
+    return a + (x - i) * (b - a)
+
+# ----------------- Pengelola grid (satu per proses) -----------------
+class GridManager:
+    # get() mengembalikan grid yang cocok dengan versi model saat ini, atau
+    # None (pemanggil menghitung langsung). build() membangun grid di thread
+    # latar; auto=True melakukannya otomatis saat get() tidak menemukan grid.
+    def __init__(self, root=GRID_DIR, auto: bool = False, who_steps=WHO_STEPS,
+                 ml_steps=ML_STEPS):
+        self.root = Path(root)
+        self.auto = auto
+        self.steps = (tuple(who_steps), tuple(ml_steps))
+        self._lock = threading.Lock()
+        self._grids = {}
+        self._building = set()
+
+    def get(self, model=None, scaler=None, model_version=None, scaler_version=None):
+        key = grid_key(model_version, scaler_version, *self.steps)
+        with self._lock:
+            if key in self._grids:
+                return self._grids[key]
+            path = self.root / key
+            if (path / "meta.json").exists():
+                self._grids = {key: RiskGrid(path)}   # grid versi lama dilepas
+                return self._grids[key]
+            if self.auto:
+                self._start(key, model, scaler, model_version, scaler_version)
+        return None
+
+    def build(self, model=None, scaler=None, model_version=None, scaler_version=None) -> bool:
+        # False bila grid versi ini sedang dibangun
+        key = grid_key(model_version, scaler_version, *self.steps)
+        with self._lock:
+            return self._start(key, model, scaler, model_version, scaler_version)
+
+    def _start(self, key, *args) -> bool:
+        if key in self._building:
+            return False
+        self._building.add(key)
+        threading.Thread(target=self._build, name="risk-grid", daemon=True,
+                         args=(key, *args)).start()
+        return True
+
+    def _build(self, key, model, scaler, model_version, scaler_version):
+        try:
+            build_grid(self.root, model, scaler, model_version, scaler_version, *self.steps,
+                       check_rows=0, log=lambda m: None)
+            prune_grids(self.root, keep=key)
+        finally:
+            with self._lock:
+                self._building.discard(key)
+
+    def info(self) -> dict:
+        with self._lock:
+            grids = list(self._grids.values())
+        if not grids:
+            return {"grid": None, "dibangun": bool(self._building)}
+        meta = grids[0].meta
+        return {"grid": meta["key"], "ml": meta["ml"], "ukuran_mb": round(meta["bytes"] / 2**20, 1),
+                "build_s": meta["build_s"]}
+
+def prune_grids(root=GRID_DIR, keep=None, stale_s: float = 3600) -> list:
+    # Hapus grid lain (versi model lama) dan sisa build yang terputus; folder
+    # build yang masih baru bisa jadi milik proses lain, jadi dibiarkan
+    removed = []
+    for path in Path(root).iterdir() if Path(root).exists() else ():
+        if not path.is_dir() or path.name == keep:
+            continue
+        if path.name.startswith(".") and time.time() - path.stat().st_mtime < stale_s:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        removed.append(path)
+    return removed
@@ -0,0 +1,340 @@
+# ============================================================
+# stunting/growth.py
+# Mode longitudinal: kunjungan bulanan per anak (id_anak + tanggal_kunjungan).
+#
+#   python -m stunting growth kunjungan_2024-05.csv -o hasil_2024-05.csv
+#   python -m stunting growth --anak A-0012          -> riwayat satu anak
+#
+# Riwayat disimpan di SQLite lokal. Tabel `anak` memuat state terakhir tiap
+# anak (tanggal, ukuran & z terakhir, tren velocity z), sehingga batch bulan
+# baru hanya membaca state anak yang ada di batch itu, tanpa memindai riwayat.
+# Untuk kunjungan pertama, data lahir (berat_lahir_kg, tinggi_lahir_cm)
+# menjadi titik awal di usia 0. Tanggal lahir diperkirakan sekali per anak
+# dari usia_bulan kunjungan pertamanya; z setiap kunjungan dihitung pada usia
+# (hari sejak perkiraan lahir) / 30.4375, bukan usia bulan bulat. Faltering =
+# z turun tajam antar dua kunjungan, atau tren penurunan (rata-rata
+# eksponensial velocity z) melewati ambang, selagi z masih >= -2 SD.
+
+import os
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .pipeline import INPUT_COLUMNS, file_format, method_age, parse_input
+from .who import _sex_codes, score_batch
+
+VISIT_COLUMNS = ["id_anak", "tanggal_kunjungan"]
+# Default di direktori temp (bukan folder repo); set STUNTING_GROWTH_DB ke path
+# permanen untuk pemakaian sungguhan
+GROWTH_DB_PATH = Path(os.environ.get(
+    "STUNTING_GROWTH_DB", Path(tempfile.gettempdir()) / "stunting" / "riwayat_tumbuh.sqlite"))
+GROWTH_METHOD = "lms"      # z kontinu (LMS) agar selisih antar bulan bermakna
+FALTER_RATE_Z = 0.3        # z turun >= 0.3 SD per bulan antar dua kunjungan
+FALTER_TREND_Z = 0.1       # tren turun >= 0.1 SD per bulan (~0.67 SD dalam 6 bulan)
+TREND_ALPHA = 0.5          # bobot kunjungan terbaru pada tren velocity
+MIN_INTERVAL_MONTHS = 0.5  # jarak kunjungan lebih pendek: velocity tidak dihitung
+DAYS_PER_MONTH = 30.4375
+# Kode status disimpan sebagai integer; label = indeks tuple ini
+GROWTH_LABELS = ("Normal", "Faltering", "Stunting", "Baru")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS anak (
+    id_anak TEXT PRIMARY KEY, jk INTEGER, hari INTEGER, tb REAL, bb REAL,
+    z_tbu REAL, z_bbu REAL, tren_tbu REAL, tren_bbu REAL,
+    n_kunjungan INTEGER, status INTEGER, lahir INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS kunjungan (
+    id_anak TEXT, hari INTEGER, usia_bulan INTEGER, tb REAL, bb REAL,
+    z_tbu REAL, z_bbu REAL, v_tbu REAL, v_bbu REAL, status INTEGER,
+    PRIMARY KEY (id_anak, hari)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS anak_status ON anak (status);
+"""
+STATE_COLUMNS = ["id_anak", "jk", "hari", "tb", "bb", "z_tbu", "z_bbu",
+                 "tren_tbu", "tren_bbu", "n_kunjungan", "status", "lahir"]
+
+# ----------------- Input kunjungan -----------------
+def read_visits(src, fmt=None) -> pd.DataFrame:
+    # Semua kolom sebagai teks (CSV); nama kolom dinormalisasi huruf kecil
+    fmt = fmt or file_format(getattr(src, "name", src))
+    if fmt == "csv":
+        df = pd.read_csv(src, dtype=str)
+    elif fmt == "parquet":
+        df = pd.read_parquet(src)
+    else:
+        import pyarrow.feather as feather
+
+        df = feather.read_table(src).to_pandas()
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    missing = [c for c in VISIT_COLUMNS + INPUT_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError("Kolom tidak lengkap: " + ", ".join(missing))
+    return df
+
+def _parse_dates(col: pd.Series) -> pd.Series:
+    # ISO (2024-05-03) dulu, sisanya format Indonesia (03/05/2024)
+    if pd.api.types.is_datetime64_any_dtype(col):
+        return col
+    txt = col.astype("string").str.strip()
+    dates = pd.to_datetime(txt, format="ISO8601", errors="coerce")
+    nat = dates.isna() & txt.notna()
+    if nat.any():
+        dates[nat] = pd.to_datetime(txt[nat], format="%d/%m/%Y", errors="coerce")
+    return dates
+
+def prepare_visits(df: pd.DataFrame):
+    # -> (kunjungan valid, baris ditolak + alasan_tolak); sama seperti prepare_input
+    parsed = parse_input(df)
+    ids = df["id_anak"].astype("string").str.strip()
+    dates = _parse_dates(df["tanggal_kunjungan"])
+    alasan = parsed["alasan_tolak"].to_numpy(dtype=object)
+    checks = [
+        ((ids.isna() | (ids == "")).to_numpy(dtype=bool, na_value=True), "id_anak kosong"),
+        (dates.isna().to_numpy(), "tanggal_kunjungan tidak dikenal"),
+    ]
+    ok0 = ~checks[0][0] & ~checks[1][0]
+    dup = np.zeros(len(df), dtype=bool)
+    dup[ok0] = pd.DataFrame({"i": ids[ok0].to_numpy(), "d": dates[ok0].to_numpy()}).duplicated().to_numpy()
+    checks.append((dup, "kunjungan ganda (id_anak + tanggal sama)"))
+    for mask, text in checks:
+        alasan[mask] = np.where(alasan[mask] == "", text, alasan[mask] + "; " + text)
+
+    ok = alasan == ""
+    visits = parsed.loc[ok, INPUT_COLUMNS].reset_index(drop=True)
+    visits["usia_bulan"] = method_age(visits["usia_bulan"], GROWTH_METHOD)
+    # baris = nomor baris asli di file (hasil diurutkan per anak & tanggal)
+    visits.insert(0, "baris", np.flatnonzero(ok) + 1)
+    visits.insert(1, "id_anak", ids[ok].to_numpy(dtype=object))
+    visits.insert(2, "tanggal_kunjungan", dates[ok].dt.normalize().to_numpy())
+    rejected = df.loc[~ok, VISIT_COLUMNS + INPUT_COLUMNS].copy()
+    rejected.insert(0, "baris", np.flatnonzero(~ok) + 1)
+    rejected["alasan_tolak"] = alasan[~ok]
+    return visits, rejected.reset_index(drop=True)
+
+def _birth_days(v: pd.DataFrame) -> np.ndarray:
+    # Perkiraan tanggal lahir (nomor hari) per baris untuk anak baru.
+    # usia_bulan bulat = bulan penuh yang sudah dilewati, jadi tiap kunjungan
+    # memberi rentang lahir selebar satu bulan; dipakai titik tengah irisan
+    # rentang semua kunjungan anak itu di batch (atau rentang kunjungan
+    # pertama bila tidak beririsan). Usia pecahan dianggap persis.
+    usia = v["usia_bulan"].to_numpy(dtype=float)
+    latest = v["hari"].to_numpy(dtype=float) - usia * DAYS_PER_MONTH
+    earliest = latest - (usia == np.floor(usia)) * DAYS_PER_MONTH
+    by_child = lambda x: pd.Series(x).groupby(v["id_anak"].to_numpy(), sort=False)
+    lo = by_child(earliest).transform("max").to_numpy()
+    hi = by_child(latest).transform("min").to_numpy()
+    first = by_child((earliest + latest) / 2).transform("first").to_numpy()
+    return np.round(np.where(lo <= hi, (lo + hi) / 2, first))
+
+# ----------------- Store riwayat -----------------
+class GrowthStore:
+    # Dibagi antar sesi (st.cache_resource): satu koneksi, akses dikunci
+    def __init__(self, path=GROWTH_DB_PATH, method: str = GROWTH_METHOD):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'method'").fetchone()
+        if row is None:
+            with self._db:
+                self._db.execute("INSERT INTO meta VALUES ('method', ?)", (method,))
+        elif row[0] != method:
+            # Mencampur z metode SD dan LMS akan memberi velocity palsu
+            raise ValueError(f"Riwayat {self.path.name} memakai metode {row[0]}, bukan {method}")
+        self.method = method
+
+    def close(self):
+        self._db.close()
+
+    def _state(self, ids: np.ndarray) -> dict:
+        # State terakhir hanya untuk anak di batch (join dengan tabel
+        # sementara), disejajarkan per baris: {kolom: array}, "ada" = anak lama
+        self._db.execute("CREATE TEMP TABLE IF NOT EXISTS batch_id (id TEXT PRIMARY KEY)")
+        self._db.execute("DELETE FROM batch_id")
+        self._db.executemany("INSERT INTO batch_id VALUES (?)", ((i,) for i in pd.unique(ids)))
+        cols = ", ".join("a." + c for c in STATE_COLUMNS)
+        rows = self._db.execute(f"SELECT {cols} FROM anak a JOIN batch_id b ON a.id_anak = b.id")
+        table = list(zip(*rows.fetchall())) or [()] * len(STATE_COLUMNS)
+        pos = pd.Index(table[0], dtype=object).get_indexer(ids)
+        state = {"ada": pos >= 0}
+        for name, values in zip(STATE_COLUMNS[1:], table[1:]):
+            values = np.append(np.asarray(values, dtype=float), np.nan)
+            state[name] = values[pos]   # pos -1 -> NaN
+        return state
+
+    def update(self, visits: pd.DataFrame, rate: float = FALTER_RATE_Z,
+               trend: float = FALTER_TREND_Z):
+        # visits dari prepare_visits. Return (hasil per kunjungan, baris ditolak).
+        # Kunjungan yang tidak lebih baru dari riwayat anak itu ditolak agar
+        # state tetap konsisten (riwayat hanya bertambah ke depan).
+        v = visits.sort_values(["id_anak", "tanggal_kunjungan"], kind="stable").reset_index(drop=True)
+        v["hari"] = v["tanggal_kunjungan"].to_numpy("datetime64[D]").astype(np.int64)
+        v["jk"] = _sex_codes(v["jenis_kelamin"])
+        ids = v["id_anak"].to_numpy(dtype=object)
+        with self._lock:
+            state = self._state(ids)
+            known = state["ada"]
+            reasons = np.full(len(v), "", dtype=object)
+            reasons[known & (v["hari"].to_numpy() <= state["hari"])] = "tanggal tidak lebih baru dari riwayat"
+            reasons[known & (v["jk"].to_numpy() != state["jk"])] = "jenis_kelamin berbeda dari riwayat"
+            bad = reasons != ""
+            rejected = v.loc[bad, ["baris"] + VISIT_COLUMNS + INPUT_COLUMNS].assign(
+                alasan_tolak=reasons[bad])
+            if bad.any():
+                v = v.loc[~bad].reset_index(drop=True)
+                state = {k: col[~bad] for k, col in state.items()}
+            out = self._score(v, state, rate, trend)
+            self._save(out, state)
+        internal = ["hari", "jk"] + [c for c in out.columns if c.startswith("_")]
+        return out.drop(columns=internal), rejected.reset_index(drop=True)
+
+    def _score(self, v: pd.DataFrame, state: dict, rate: float, trend: float) -> pd.DataFrame:
+        # Usia pada tanggal kunjungan dari satu perkiraan tanggal lahir per anak
+        lahir = np.where(state["ada"], state["lahir"], _birth_days(v))
+        hari_usia = np.maximum(v["hari"].to_numpy() - lahir, 0)
+        v.insert(v.columns.get_loc("usia_bulan") + 1, "usia_hari", hari_usia.astype(np.int64))
+        v["_lahir"] = lahir
+        res = score_batch(v["jenis_kelamin"], hari_usia / DAYS_PER_MONTH, v["tinggi_badan_cm"],
+                          v["berat_badan_kg"], method=self.method)
+        v["TB/U"], v["BB/U"] = res["TB/U"].to_numpy(), res["BB/U"].to_numpy()
+        z = {"tbu": res["z_TBU"].to_numpy(), "bbu": res["z_BBU"].to_numpy()}
+
+        # Titik awal tiap anak: state tersimpan, atau data lahir (usia 0)
+        # untuk anak baru, atau kosong bila data lahir tidak ada
+        ids = v["id_anak"].to_numpy(dtype=object)
+        first = np.ones(len(v), dtype=bool)
+        first[1:] = ids[1:] != ids[:-1]
+        known = state["ada"]
+        birth = score_batch(v["jenis_kelamin"], np.zeros(len(v)),
+                            v["tinggi_lahir_cm"].fillna(1.0), v["berat_lahir_kg"].fillna(1.0),
+                            method=self.method)
+        start = {
+            "hari": lahir,
+            "tb": v["tinggi_lahir_cm"].to_numpy(dtype=float),
+            "bb": v["berat_lahir_kg"].to_numpy(dtype=float),
+            "tbu": birth["z_TBU"].where(v["tinggi_lahir_cm"].notna()).to_numpy(dtype=float),
+            "bbu": birth["z_BBU"].where(v["berat_lahir_kg"].notna()).to_numpy(dtype=float),
+        }
+        current = {"hari": v["hari"].to_numpy(dtype=float),
+                   "tb": v["tinggi_badan_cm"].to_numpy(dtype=float),
+                   "bb": v["berat_badan_kg"].to_numpy(dtype=float), **z}
+        stored = {"hari": "hari", "tb": "tb", "bb": "bb", "tbu": "z_tbu", "bbu": "z_bbu"}
+        prev = {}
+        for key, cur in current.items():
+            p = np.empty(len(v))
+            p[1:] = cur[:-1]
+            p[first] = np.where(known, state[stored[key]], start[key])[first]
+            prev[key] = p
+
+        months = (current["hari"] - prev["hari"]) / DAYS_PER_MONTH
+        inv = np.full(len(v), np.nan)
+        ok = months >= MIN_INTERVAL_MONTHS
+        inv[ok] = 1.0 / months[ok]
+        per_month = lambda key: (current[key] - prev[key]) * inv
+        v["interval_bulan"] = np.round(months, 2)
+        v["cm_per_bulan"] = np.round(per_month("tb"), 2)
+        v["kg_per_bulan"] = np.round(per_month("bb"), 3)
+
+        flags = {}
+        # Urutan kunjungan dalam batch per anak (0 = pertama)
+        start_at = np.maximum.accumulate(np.where(first, np.arange(len(v)), 0))
+        rank = np.arange(len(v)) - start_at
+        for key, label in (("tbu", "TBU"), ("bbu", "BBU")):
+            vel = per_month(key)
+            # Tren = EWMA velocity; diteruskan dari state, lalu kunjungan demi
+            # kunjungan (biasanya hanya satu kunjungan per anak per batch)
+            tren = np.full(len(v), np.nan)
+            last = state[f"tren_{key}"]
+            for k in range(rank.max() + 1 if len(v) else 0):
+                at = np.flatnonzero(rank == k)
+                p = last[at] if k == 0 else tren[at - 1]
+                x = vel[at]
+                tren[at] = np.where(np.isnan(p), x, np.where(np.isnan(x), p,
+                                                             TREND_ALPHA * x + (1 - TREND_ALPHA) * p))
+            flags[key] = (z[key] >= -2) & ((vel <= -rate) | (tren <= -trend))
+            v[f"z_{label}"] = np.round(z[key], 2)
+            v[f"dz_{label}_per_bulan"] = np.round(vel, 3)
+            v[f"tren_dz_{label}"] = np.round(tren, 3)
+            v[f"Faltering_{label}"] = flags[key]
+            v[f"_v_{key}"], v[f"_tren_{key}"] = vel, tren
+        v["_z_tbu"], v["_z_bbu"] = z["tbu"], z["bbu"]
+
+        status = np.where(np.isnan(prev["tbu"]) & np.isnan(prev["bbu"]), 3, 0)
+        status = np.where(flags["tbu"] | flags["bbu"], 1, status)
+        status = np.where(z["tbu"] < -2, 2, status)
+        v["_status"] = status
+        v["Status_Tumbuh"] = np.asarray(GROWTH_LABELS, dtype=object)[status]
+        return v
+
+    def _save(self, v: pd.DataFrame, state: dict):
+        if not len(v):
+            return
+        visits = zip(v["id_anak"].tolist(), v["hari"].tolist(), v["usia_bulan"].tolist(),
+                     v["tinggi_badan_cm"].tolist(), v["berat_badan_kg"].tolist(),
+                     v["_z_tbu"].tolist(), v["_z_bbu"].tolist(), _nullable(v["_v_tbu"]),
+                     _nullable(v["_v_bbu"]), v["_status"].tolist())
+        # Baris terakhir tiap anak menjadi state baru
+        ids = v["id_anak"].to_numpy(dtype=object)
+        end = np.append(ids[1:] != ids[:-1], True)
+        begin = np.flatnonzero(np.append(True, ids[1:] != ids[:-1]))
+        n = np.diff(np.append(begin, len(v))) + np.nan_to_num(state["n_kunjungan"][begin])
+        last = v.loc[end]
+        children = zip(last["id_anak"].tolist(), last["jk"].tolist(), last["hari"].tolist(),
+                       last["tinggi_badan_cm"].tolist(), last["berat_badan_kg"].tolist(),
+                       last["_z_tbu"].tolist(), last["_z_bbu"].tolist(),
+                       _nullable(last["_tren_tbu"]), _nullable(last["_tren_bbu"]),
+                       n.astype(int).tolist(), last["_status"].tolist(),
+                       last["_lahir"].astype(np.int64).tolist())
+        with self._db:
+            self._db.executemany("INSERT INTO kunjungan VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", visits)
+            self._db.executemany(
+                "INSERT OR REPLACE INTO anak VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", children)
+
+    # ----------------- Baca riwayat -----------------
+    def history(self, id_anak: str) -> pd.DataFrame:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT hari, usia_bulan, tb, bb, z_tbu, z_bbu, v_tbu, v_bbu, status "
+                "FROM kunjungan WHERE id_anak = ? ORDER BY hari", (id_anak,)).fetchall()
+        df = pd.DataFrame(rows, columns=["hari", "usia_bulan", "tinggi_badan_cm", "berat_badan_kg",
+                                         "z_TBU", "z_BBU", "dz_TBU_per_bulan", "dz_BBU_per_bulan",
+                                         "status"])
+        df.insert(0, "tanggal_kunjungan", pd.to_datetime(df.pop("hari").astype(np.int64), unit="D"))
+        df[["z_TBU", "z_BBU"]] = df[["z_TBU", "z_BBU"]].round(2)
+        df[["dz_TBU_per_bulan", "dz_BBU_per_bulan"]] = df[["dz_TBU_per_bulan", "dz_BBU_per_bulan"]].round(3)
+        df["Status_Tumbuh"] = np.asarray(GROWTH_LABELS, dtype=object)[df.pop("status").astype(int)]
+        return df
+
+    def children(self, status=None) -> pd.DataFrame:
+        # State terakhir semua anak; status = label GROWTH_LABELS untuk filter
+        sql, params = f"SELECT {', '.join(STATE_COLUMNS)} FROM anak", ()
+        if status is not None:
+            sql, params = sql + " WHERE status = ?", (GROWTH_LABELS.index(status),)
+        with self._lock:
+            df = pd.DataFrame(self._db.execute(sql + " ORDER BY id_anak", params).fetchall(),
+                              columns=STATE_COLUMNS)
+        df["kunjungan_terakhir"] = pd.to_datetime(df.pop("hari").astype(np.int64), unit="D")
+        df["perkiraan_lahir"] = pd.to_datetime(df.pop("lahir").astype(np.int64), unit="D")
+        df["Status_Tumbuh"] = np.asarray(GROWTH_LABELS, dtype=object)[df.pop("status").astype(int)]
+        return df
+
+    def info(self) -> dict:
+        with self._lock:
+            n_anak = self._db.execute("SELECT COUNT(*) FROM anak").fetchone()[0]
+            n_kunjungan = self._db.execute("SELECT COUNT(*) FROM kunjungan").fetchone()[0]
+            by_status = dict(self._db.execute("SELECT status, COUNT(*) FROM anak GROUP BY status"))
+        size = sum(p.stat().st_size for p in self.path.parent.glob(self.path.name + "*"))
+        return {"anak": n_anak, "kunjungan": n_kunjungan, "metode": self.method,
+                **{label: by_status.get(i, 0) for i, label in enumerate(GROWTH_LABELS)},
+                "ukuran_mb": round(size / 2**20, 2)}
+
+def _nullable(values) -> list:
+    # NaN -> NULL di SQLite
+    return [None if x != x else x for x in np.asarray(values, dtype=float).tolist()]
@@ -0,0 +1,160 @@
+# ============================================================
+# stunting/ingest.py
+# Ingest bulanan: ratusan file kecil per posyandu dibaca secara konkuren
+# (asyncio, konkurensi dibatasi), digabung menjadi batch besar untuk parse +
+# skoring vektor, lalu ditulis ke SATU file hasil + ringkasan per file.
+#
+#   python -m stunting ingest data_bulanan/ -o rekap_2024_05.parquet --concurrency 16
+
+import asyncio
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .pipeline import (
+    FILE_FORMATS, INPUT_COLUMNS, STREAM_CHUNK_ROWS, empty_result, file_format, iter_chunks,
+    open_sink, prepare_input, score_frame,
+)
+
+SOURCE_COLUMN = "sumber_file"
+SUMMARY_COLUMNS = ["file", "baris_masuk", "baris_valid", "ditolak", "stunting", "alasan_tolak", "error"]
+
+# ----------------- Sumber file -----------------
+class DirStore:
+    # Pengganti object store lokal: root = "bucket", key = path relatif (pakai
+    # "/"). Store lain (mis. S3) cukup menyediakan list() dan open(key).
+    def __init__(self, root):
+        self.root = Path(root)
+        self.name = self.root.name
+
+    def list(self, pattern: str = "*"):
+        keys = [
+            p.relative_to(self.root).as_posix()
+            for p in self.root.rglob(pattern)
+            if p.is_file() and p.suffix.lower() in FILE_FORMATS
+        ]
+        return sorted(keys)
+
+    def open(self, key: str):
+        return open(self.root / key, "rb")
+
+def _read(store, key: str, chunk_rows: int) -> pd.DataFrame:
+    # Dijalankan di thread: baca satu file (hanya kolom template)
+    with store.open(key) as f:
+        chunks = list(iter_chunks(f, file_format(key), chunk_rows))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=INPUT_COLUMNS)
+
+def _summary(name: str, error=None) -> dict:
+    return {"file": name, "baris_masuk": 0, "baris_valid": 0, "ditolak": 0, "stunting": 0,
+            "alasan_tolak": "", "error": error or ""}
+
+# ----------------- Pipeline async -----------------
+async def ingest(stores, dst, method: str = "sd", model=None, scaler=None,
+                 concurrency: int = 16, batch_rows: int = STREAM_CHUNK_ROWS,
+                 pattern: str = "*") -> pd.DataFrame:
+    # stores: list DirStore (atau store lain). Output gabungan ditulis ke dst
+    # (format dari ekstensi) dengan kolom tambahan sumber_file; urutan baris
+    # mengikuti urutan file hasil discovery sehingga deterministik.
+    # Return: ringkasan per file (DataFrame, kolom SUMMARY_COLUMNS).
+    keys = []
+    for store in stores:
+        found = await asyncio.to_thread(store.list, pattern)
+        prefix = store.name + "/" if len(stores) > 1 else ""
+        keys.extend((store, key, prefix + key) for key in found)
+
+    sem = asyncio.Semaphore(concurrency)
+
+    async def load(store, key):
+        async with sem:
+            try:
+                return await asyncio.to_thread(_read, store, key, batch_rows)
+            except Exception as e:
+                return e
+
+    summaries = []
+    buf, buf_rows = [], 0      # (indeks ringkasan, nama file, baris mentah)
+    sink = open_sink(dst, file_format(dst))
+    first = True
+
+    def score_batch_files(parts):
+        # Parse + skor baris dari banyak file sekaligus (satu panggilan vektor,
+        # bukan ratusan panggilan kecil), lalu pecah ringkasan per file
+        sizes = [len(raw) for _, _, raw in parts]
+        owner = np.repeat(np.arange(len(parts)), sizes)
+        raw = pd.concat([raw for _, _, raw in parts], ignore_index=True)
+        inp, rejected = prepare_input(raw, method)
+        out = score_frame(inp, method, model, scaler)
+
+        rej_owner = owner[rejected["baris"].to_numpy() - 1]
+        ok = np.ones(len(raw), dtype=bool)
+        ok[rejected["baris"].to_numpy() - 1] = False
+        valid_owner = owner[ok]
+        names = np.array([name for _, name, _ in parts], dtype=object)
+        out.insert(0, SOURCE_COLUMN, names[valid_owner])
+
+        n = len(parts)
+        valid = np.bincount(valid_owner, minlength=n)
+        ditolak = np.bincount(rej_owner, minlength=n)
+        stunting = np.bincount(valid_owner[(out["Prediksi"] == "Stunting").to_numpy()], minlength=n)
+        reasons = pd.Series(rejected["alasan_tolak"].to_numpy()).groupby(rej_owner).value_counts()
+        for i, (idx, _, _) in enumerate(parts):
+            summaries[idx].update(baris_masuk=sizes[i], baris_valid=int(valid[i]),
+                                  ditolak=int(ditolak[i]), stunting=int(stunting[i]))
+            if ditolak[i]:
+                summaries[idx]["alasan_tolak"] = "; ".join(
+                    f"{k}: {v}" for k, v in reasons.loc[i].items()
+                )
+        return out
+
+    async def flush():
+        nonlocal buf, buf_rows, first
+        if not buf:
+            return
+        out = await asyncio.to_thread(score_batch_files, buf)
+        await asyncio.to_thread(sink, out, first)
+        first = False
+        buf, buf_rows = [], 0
+
+    # Jendela geser: paling banyak 2 x concurrency file dibaca/menunggu
+    # sekaligus, hasil diambil sesuai urutan discovery
+    window = deque()
+    todo = iter(keys)
+
+    def fill():
+        for store, key, name in todo:
+            window.append((name, asyncio.ensure_future(load(store, key))))
+            if len(window) >= 2 * concurrency:
+                break
+
+    try:
+        fill()
+        while window:
+            name, task = window.popleft()
+            res = await task
+            fill()
+            if isinstance(res, Exception):
+                summaries.append(_summary(name, error=str(res)))
+                continue
+            summaries.append(_summary(name))
+            buf.append((len(summaries) - 1, name, res))
+            buf_rows += len(res)
+            if buf_rows >= batch_rows:
+                await flush()
+        await flush()
+        if first:
+            out = empty_result(method)
+            out.insert(0, SOURCE_COLUMN, pd.Series(dtype=object))
+            sink(out, True)
+    finally:
+        sink.close()
+    return pd.DataFrame(summaries, columns=SUMMARY_COLUMNS)
+
+def ingest_files(roots, dst, **kwargs) -> pd.DataFrame:
+    # Versi sinkron untuk CLI / job terjadwal
+    return asyncio.run(ingest([DirStore(r) for r in roots], dst, **kwargs))
+
+def summary_path(dst) -> Path:
+    dst = Path(dst)
+    return dst.with_name(dst.stem + "_ringkasan.csv")
@@ -0,0 +1,225 @@
+# ============================================================
+# stunting/ml.py
+# Inferensi clf_final (XGBoost) + registry artefak joblib / .npz hasil ekspor.
+
+import hashlib, json, os, threading, time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .who import _sex_codes
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+MODEL_PATH, SCALER_PATH = BASE_DIR / "clf_final.joblib", BASE_DIR / "scaler.joblib"
+# Hasil `python -m stunting export`: tanpa pickle, dievaluasi dengan NumPy saja
+COMPILED_MODEL_PATH, COMPILED_SCALER_PATH = BASE_DIR / "clf_final.npz", BASE_DIR / "scaler.npz"
+
+def artifact_paths() -> tuple:
+    # (model, scaler) default: .npz bila dibuat dari isi joblib yang sekarang,
+    # selain itu joblib (mis. model dilatih ulang tapi belum diekspor)
+    from .compiled import is_fresh
+
+    return tuple(
+        npz if is_fresh(npz, src) else src
+        for npz, src in ((COMPILED_MODEL_PATH, MODEL_PATH), (COMPILED_SCALER_PATH, SCALER_PATH))
+    )
+
+# ----------------- Inferensi ML (clf_final) -----------------
+# Urutan fitur sama dengan X di notebook (model.feature_names_in_)
+ML_FEATURES = [
+    "jenis_kelamin", "usia_bulan", "berat_lahir_kg", "tinggi_lahir_cm",
+    "berat_badan_kg", "tinggi_badan_cm",
+    "rasio_berat_usia", "rasio_tinggi_usia", "rasio_berat_tinggi",
+]
+ML_SCALED = ML_FEATURES[1:]   # num_cols pada StandardScaler notebook
+ML_LOG1P = ()                 # cols_to_log di notebook (saat ini tidak dipakai)
+# clf_final dilatih dengan clf_final.fit(X_train, y_train), yaitu fitur mentah
+# tanpa log1p/scaler; set True bila model diganti dengan yang dilatih pada
+# X_train_scaled.
+ML_MODEL_SCALED = False
+ML_CHUNK_ROWS = 65536
+
+def build_ml_features(df: pd.DataFrame, scaler=None) -> np.ndarray:
+    # Matriks fitur (n, 9) untuk seluruh DataFrame sekaligus
+    X = np.empty((len(df), len(ML_FEATURES)), dtype=np.float64)
+    X[:, 0] = _sex_codes(df["jenis_kelamin"])
+    for j, col in enumerate(ML_FEATURES[1:6], start=1):
+        X[:, j] = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+    usia, bb, tb = X[:, 1], X[:, 4], X[:, 5]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        X[:, 6] = bb / usia
+        X[:, 7] = tb / usia
+        X[:, 8] = bb / tb
+    # Usia 0 bulan -> rasio tak hingga; dijadikan missing untuk XGBoost
+    X[~np.isfinite(X)] = np.nan
+
+    for col in ML_LOG1P:
+        j = ML_FEATURES.index(col)
+        X[:, j] = np.log1p(X[:, j])
+    if scaler is not None:
+        X[:, 1:] = (X[:, 1:] - scaler.mean_) / scaler.scale_
+    return X
+
+def ml_predict_proba(model, X: np.ndarray, chunk_rows: int = ML_CHUNK_ROWS) -> np.ndarray:
+    # Probabilitas kelas "Stunting"; satu panggilan predict_proba per chunk
+    out = np.empty(len(X), dtype=np.float64)
+    for start in range(0, len(X), chunk_rows):
+        stop = start + chunk_rows
+        out[start:stop] = model.predict_proba(X[start:stop])[:, 1]
+    return out
+
+def ml_score(df: pd.DataFrame, model, scaler=None) -> np.ndarray:
+    if model is None:
+        return np.full(len(df), np.nan)
+    X = build_ml_features(df, scaler if ML_MODEL_SCALED else None)
+    return ml_predict_proba(model, X)
+
+# ----------------- Skema fitur artefak -----------------
+# feature_schema.json ditulis oleh `python -m stunting train` di samping
+# clf_final.joblib; saat load dicek terhadap fitur yang dibangun kode ini.
+SCHEMA_FILE = "feature_schema.json"
+SEX_ENCODING = {"Laki-laki": 0, "Perempuan": 1}   # sama dengan who._sex_codes
+
+def feature_schema() -> dict:
+    return {
+        "features": list(ML_FEATURES),
+        "scaled_features": list(ML_SCALED),
+        "log1p": list(ML_LOG1P),
+        "model_scaled": ML_MODEL_SCALED,
+        "jenis_kelamin": dict(SEX_ENCODING),
+    }
+
+def schema_path(model_path) -> Path:
+    return Path(model_path).parent / SCHEMA_FILE
+
+def verify_artifacts(model_path, model, scaler=None, model_sha256=None) -> dict:
+    # Return isi feature_schema.json (None bila tidak ada, artefak lama).
+    # ValueError bila skema, nama fitur model, atau sha256 model tidak cocok.
+    path = schema_path(model_path)
+    if not path.exists():
+        return None
+    schema = json.loads(path.read_text(encoding="utf-8"))
+    problems = []
+    expected = feature_schema()
+    for key, value in expected.items():
+        got = schema.get("schema", {}).get(key)
+        if got != value:
+            problems.append(f"{key}: artefak {got!r}, kode {value!r}")
+    names = getattr(model, "feature_names_in_", None)
+    if names is not None and len(names) and list(names) != expected["features"]:
+        problems.append(f"fitur model {list(names)} != {expected['features']}")
+    if scaler is not None and len(scaler.mean_) != len(expected["scaled_features"]):
+        problems.append(f"scaler memuat {len(scaler.mean_)} kolom, skema {len(expected['scaled_features'])}")
+    want = schema.get("artefak", {}).get("model_sha256")
+    if want:
+        # .npz dicek lewat sha256 joblib sumbernya (dicatat saat ekspor)
+        if Path(model_path).suffix == ".npz":
+            got = getattr(model, "meta", {}).get("source_sha256")
+        else:
+            got = model_sha256 or _file_sha256(Path(model_path))
+        if got != want:
+            problems.append(f"sha256 model {str(got)[:12]} != skema {want[:12]}")
+    if problems:
+        raise ValueError(f"Artefak {Path(model_path).name} tidak sesuai {path.name}: "
+                         + "; ".join(problems))
+    return schema
+
+def _file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _rss_bytes():
+    # RSS proses saat ini (Linux); None jika /proc tidak tersedia
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _load_artifact(path: Path):
+    # .npz tidak butuh joblib/xgboost/sklearn sama sekali
+    if path.suffix == ".npz":
+        from .compiled import load_compiled
+
+        return load_compiled(path)
+    import joblib
+
+    return joblib.load(path)
+
+class ModelRegistry:
+    # Satu salinan artefak joblib untuk semua sesi. Setiap get() hanya memanggil
+    # stat(); file di-hash ulang bila mtime/ukuran berubah, dan dimuat ulang
+    # hanya bila isinya (sha256) benar-benar berbeda.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._verified = set()
+
+    def get(self, path: Path):
+        path = Path(path)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and (entry["mtime_ns"], entry["size"]) == (stat.st_mtime_ns, stat.st_size):
+                return entry["obj"]
+            digest = _file_sha256(path)
+            if entry and entry["sha256"] == digest:
+                entry["mtime_ns"], entry["size"] = stat.st_mtime_ns, stat.st_size
+                return entry["obj"]
+
+            rss0, t0 = _rss_bytes(), time.perf_counter()
+            obj = _load_artifact(path)
+            load_s, rss1 = time.perf_counter() - t0, _rss_bytes()
+            self._entries[path] = {
+                "obj": obj,
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": digest,
+                "load_s": load_s,
+                "mem_bytes": None if rss0 is None else max(rss1 - rss0, 0),
+                "loads": (entry["loads"] + 1) if entry else 1,
+            }
+            return obj
+
+    def load(self, model_path: Path, scaler_path: Path) -> tuple:
+        # (model, scaler) yang sudah dicek terhadap feature_schema.json; cek
+        # diulang hanya bila model atau file skema berubah
+        model, scaler = self.get(model_path), self.get(scaler_path)
+        if model is None:
+            return model, scaler
+        digest = self.version(model_path)
+        try:
+            schema_mtime = schema_path(model_path).stat().st_mtime_ns
+        except FileNotFoundError:
+            schema_mtime = None
+        key = (Path(model_path), digest, self.version(scaler_path), schema_mtime)
+        with self._lock:
+            verified = key in self._verified
+        if not verified:
+            verify_artifacts(model_path, model, scaler, digest)
+            with self._lock:
+                self._verified.add(key)
+        return model, scaler
+
+    def version(self, path: Path):
+        # sha256 artefak yang sedang dipakai (None bila belum/tidak ter-load)
+        with self._lock:
+            entry = self._entries.get(Path(path))
+            return entry["sha256"] if entry else None
+
+    def info(self) -> list:
+        with self._lock:
+            return [
+                {"file": p.name, "sha256": e["sha256"][:12], "ukuran_kb": round(e["size"] / 1024, 1),
+                 "load_s": round(e["load_s"], 3),
+                 "memori_mb": None if e["mem_bytes"] is None else round(e["mem_bytes"] / 2**20, 1),
+                 "jumlah_load": e["loads"]}
+                for p, e in self._entries.items()
+            ]
@@ -0,0 +1,264 @@
+# ============================================================
+# stunting/parallel.py
+# Skoring multi-core: file dipecah menjadi shard rentang baris, tiap shard
+# diskor di process pool, lalu hasil ditulis berurutan sesuai posisi shard.
+# Output sama persis (byte demi byte untuk CSV) dengan skoring satu proses.
+
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .pipeline import (
+    STREAM_CHUNK_ROWS, _normalize_columns, _read_csv, add_chunk_stats, empty_result,
+    file_format, iter_arrow_chunks, iter_parquet_chunks, merge_stats, new_stats,
+    open_arrow, open_sink, prepare_input, score_frame,
+)
+
+# ----------------- Model per proses worker -----------------
+# Di-load sekali per proses (initializer); tabel WHO ikut ter-load saat import
+_MODEL, _SCALER = None, None
+
+def load_worker_model(model_path, scaler_path, no_ml: bool = False):
+    global _MODEL, _SCALER
+    if no_ml:
+        _MODEL, _SCALER = None, None
+        return
+    from .ml import ModelRegistry
+
+    registry = ModelRegistry()
+    _MODEL, _SCALER = registry.load(model_path, scaler_path)
+
+# ----------------- Pembagian shard -----------------
+CSV_SAMPLE_BYTES = 1 << 16
+CSV_SCAN_BYTES = 1 << 20
+
+def _count_quotes(f, n: int) -> int:
+    # Baca n byte berikutnya per blok, hitung tanda kutip
+    count = 0
+    while n > 0 and (block := f.read(min(n, CSV_SCAN_BYTES))):
+        count += block.count(b'"')
+        n -= len(block)
+    return count
+
+def _read_row(f, quotes: int) -> int:
+    # Lanjut ke akhir baris CSV: selama jumlah kutip sejak awal file ganjil,
+    # newline masih di dalam field ber-quote, jadi baca baris berikutnya
+    while line := f.readline():
+        quotes += line.count(b'"')
+        if quotes % 2 == 0:
+            break
+    return quotes
+
+def _csv_shards(src, shard_rows: int):
+    # Shard = rentang byte [awal, akhir) yang selalu berhenti di akhir baris.
+    # Ukuran byte per shard ditaksir dari sampel awal file (~shard_rows baris).
+    # Field ber-quote bisa memuat newline: paritas tanda kutip dihitung dari
+    # awal file (kutip ganda "" di dalam field tetap genap), dan batas shard
+    # hanya dipasang pada newline dengan paritas genap (di luar quote).
+    names = list(pd.read_csv(src, nrows=0).columns)
+    size = os.path.getsize(src)
+    with open(src, "rb") as f:
+        quotes = _read_row(f, 0)
+        start = f.tell()
+        sample = f.read(CSV_SAMPLE_BYTES)
+        row_bytes = max(1, len(sample) // max(1, sample.count(b"\n")))
+        step = max(1, shard_rows * row_bytes)
+
+        shards = []
+        f.seek(start)
+        while start < size:
+            quotes += _count_quotes(f, min(start + step, size) - start)
+            quotes = _read_row(f, quotes)
+            end = min(f.tell(), size)
+            shards.append(("csv", str(src), names, start, end))
+            start = end
+    return shards
+
+def _parquet_shards(src, shard_rows: int):
+    # Shard = kumpulan row group berurutan dengan total ~shard_rows baris
+    import pyarrow.parquet as pq
+
+    meta = pq.ParquetFile(src).metadata
+    shards, groups, rows = [], [], 0
+    for i in range(meta.num_row_groups):
+        groups.append(i)
+        rows += meta.row_group(i).num_rows
+        if rows >= shard_rows:
+            shards.append(("parquet", str(src), groups))
+            groups, rows = [], 0
+    if groups:
+        shards.append(("parquet", str(src), groups))
+    return shards
+
+def _arrow_shards(src, shard_rows: int):
+    # Format file IPC: shard = kumpulan record batch berurutan. Format stream
+    # tidak bisa diakses acak, jadi satu shard untuk seluruh file.
+    reader = open_arrow(str(src))
+    if not hasattr(reader, "get_batch"):
+        return [("arrow", str(src), None)]
+    shards, batches, rows = [], [], 0
+    for i in range(reader.num_record_batches):
+        batches.append(i)
+        rows += reader.get_batch(i).num_rows
+        if rows >= shard_rows:
+            shards.append(("arrow", str(src), batches))
+            batches, rows = [], 0
+    if batches:
+        shards.append(("arrow", str(src), batches))
+    return shards
+
+SHARD_PLANNERS = {"csv": _csv_shards, "parquet": _parquet_shards, "arrow": _arrow_shards}
+
+def plan_shards(src, shard_rows: int = STREAM_CHUNK_ROWS):
+    return SHARD_PLANNERS[file_format(src)](src, shard_rows)
+
+def _read_shard(shard, chunk_rows: int):
+    if shard[0] == "parquet":
+        yield from iter_parquet_chunks(shard[1], chunk_rows, row_groups=shard[2])
+        return
+    if shard[0] == "arrow":
+        yield from iter_arrow_chunks(shard[1], chunk_rows, batches=shard[2])
+        return
+
+    import io
+
+    _, src, names, start, end = shard
+    with open(src, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    reader = _read_csv(io.BytesIO(data), header=None, names=names, chunksize=chunk_rows)
+    for chunk in reader:
+        yield _normalize_columns(chunk)
+
+def _score_shard(shard, method: str, chunk_rows: int, out_fmt: str, report: bool = False):
+    # Dijalankan di worker: kembalikan potongan hasil siap tulis + ringkasan
+    # (termasuk state laporan parsial shard ini bila report=True)
+    stats = new_stats(report)
+    parts = []
+    for chunk in _read_shard(shard, chunk_rows):
+        inp, rejected = prepare_input(chunk, method)
+        out = score_frame(inp, method, _MODEL, _SCALER)
+        add_chunk_stats(stats, chunk, out, rejected)
+        if out_fmt == "csv":
+            parts.append(out.to_csv(index=False, header=False))
+        else:
+            parts.append(out)
+    return parts, stats
+
+# ----------------- Penulis hasil (di proses utama) -----------------
+class _CsvSink:
+    def __init__(self, dst, method: str):
+        self.f = open(dst, "w", newline="", encoding="utf-8")
+        self.f.write(empty_result(method).to_csv(index=False))
+
+    def write_parts(self, parts):
+        for text in parts:
+            self.f.write(text)
+
+    def close(self):
+        self.f.close()
+
+class _TablePartsSink:
+    # Parquet/Arrow: tiap potongan hasil = satu row group / record batch
+    def __init__(self, dst, fmt: str, method: str):
+        self.sink = open_sink(dst, fmt)
+        self.method = method
+        self.empty = True
+
+    def write_parts(self, parts):
+        for out in parts:
+            self.sink(out, self.empty)
+            self.empty = False
+
+    def close(self):
+        if self.empty:
+            self.sink(empty_result(self.method), True)
+        self.sink.close()
+
+# ----------------- Skoring paralel -----------------
+def score_files_parallel(plan, method: str = "sd", workers=None,
+                         chunk_rows: int = STREAM_CHUNK_ROWS, model_path=None,
+                         scaler_path=None, no_ml: bool = False, on_file_done=None,
+                         report: bool = False):
+    # plan: list (src, dst). Semua shard dari semua file masuk satu pool;
+    # jumlah shard yang sedang berjalan dibatasi (2 x workers) agar memori
+    # proses utama tetap kecil. Hasil diambil sesuai urutan submit sehingga
+    # urutan baris output stabil. on_file_done(src, dst, stats|Exception) per file.
+    # stats["detik"]: dari submit shard pertama file itu sampai hasilnya selesai
+    # ditulis (file yang berurutan di pool bisa saling tumpang tindih).
+    workers = workers or os.cpu_count() or 1
+    window = 2 * workers
+    results = {}
+
+    def tasks():
+        for i, (src, dst) in enumerate(plan):
+            try:
+                shards = plan_shards(src, chunk_rows)
+            except Exception as e:
+                yield i, True, e
+                continue
+            for j, shard in enumerate(shards):
+                yield i, j == len(shards) - 1, shard
+            if not shards:
+                yield i, True, None
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=load_worker_model,
+        initargs=(model_path, scaler_path, no_ml),
+    ) as pool:
+        pending = deque()
+        sinks, stats, started = {}, {}, {}
+        todo = tasks()
+
+        def fill():
+            for i, last, shard in todo:
+                started.setdefault(i, time.perf_counter())
+                if isinstance(shard, tuple):
+                    fmt = file_format(plan[i][1])
+                    shard = pool.submit(_score_shard, shard, method, chunk_rows, fmt, report)
+                pending.append((i, last, shard))
+                if len(pending) >= window:
+                    break
+
+        fill()
+        while pending:
+            i, last, job = pending.popleft()
+            src, dst = plan[i]
+            if i not in results:
+                try:
+                    if isinstance(job, Exception):
+                        raise job
+                    if i not in sinks:
+                        os.makedirs(os.path.dirname(os.path.abspath(dst)), exist_ok=True)
+                        fmt = file_format(dst)
+                        if fmt == "csv":
+                            sinks[i] = _CsvSink(dst, method)
+                        else:
+                            sinks[i] = _TablePartsSink(dst, fmt, method)
+                        stats[i] = new_stats(report)
+                    if job is not None:
+                        parts, part_stats = job.result()
+                        sinks[i].write_parts(parts)
+                        merge_stats(stats[i], part_stats)
+                except Exception as e:
+                    # File gagal: shard sisanya diabaikan, file lain jalan terus
+                    if i in sinks:
+                        sinks.pop(i).close()
+                        os.remove(dst)   # jangan tinggalkan hasil setengah jadi
+                    stats.pop(i, None)
+                    results[i] = e
+                    if on_file_done is not None:
+                        on_file_done(src, dst, e)
+            if last and i not in results:
+                sinks.pop(i).close()
+                results[i] = stats.pop(i)
+                results[i]["detik"] = round(time.perf_counter() - started[i], 3)
+                if on_file_done is not None:
+                    on_file_done(src, dst, results[i])
+            fill()
+    # Per file: dict ringkasan, atau Exception bila file gagal
+    return [results[i] for i in range(len(plan))]
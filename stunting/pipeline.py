@@ -0,0 +1,423 @@
+# ============================================================
+# stunting/pipeline.py
+# Parsing input kelompok, skoring per chunk, baca/tulis CSV & Parquet.
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .ml import ml_score
+from .report import REGION_COLUMN, GroupReport
+from .who import SEX_LABELS, WHO_MAX_AGE, _check_method, _sex_codes, score_batch
+
+# -------------------- Pipeline kelompok (CSV) --------------------
+INPUT_COLUMNS = [
+    "jenis_kelamin",
+    "usia_bulan",
+    "berat_lahir_kg",
+    "tinggi_lahir_cm",
+    "berat_badan_kg",
+    "tinggi_badan_cm",
+]
+STREAM_CHUNK_ROWS = 100_000
+# Kolom opsional yang ikut dibaca bila ada (untuk laporan per wilayah)
+OPTIONAL_COLUMNS = [REGION_COLUMN]
+
+# Variasi penulisan jenis kelamin yang diterima (dibandingkan setelah casefold)
+SEX_ALIASES = {
+    "laki-laki": "Laki-laki", "laki laki": "Laki-laki", "l": "Laki-laki", "male": "Laki-laki",
+    "perempuan": "Perempuan", "p": "Perempuan", "female": "Perempuan",
+}
+MIN_AGE, MAX_AGE = 0, WHO_MAX_AGE
+
+def _parse_number(col: pd.Series) -> pd.Series:
+    # Koma desimal -> titik, lalu konversi numerik per kolom (bukan per sel)
+    if pd.api.types.is_numeric_dtype(col):
+        return col.astype(np.float64)
+    try:
+        # Sudah berupa angka / teks desimal-titik
+        return col.astype(np.float64)
+    except (ValueError, TypeError):
+        pass
+    txt = col.astype("string").str.strip().str.replace(",", ".", regex=False)
+    try:
+        # Jalur cepat bila seluruh kolom valid; to_numeric hanya untuk kolom kotor
+        return txt.astype(np.float64)
+    except (ValueError, TypeError):
+        return pd.to_numeric(txt, errors="coerce").astype(np.float64)
+
+def _unparsed(raw: pd.Series, parsed: pd.Series) -> pd.Series:
+    # Gagal dikonversi padahal sel tidak kosong (hanya sel NaN yang dicek ulang)
+    mask = parsed.isna()
+    if mask.any():
+        sub = raw[mask]
+        mask[mask] = sub.notna() & (sub.astype("string").str.strip() != "").fillna(False)
+    return mask
+
+def parse_input(df: pd.DataFrame) -> pd.DataFrame:
+    # Kolom sudah dinormalisasi (huruf kecil). Semua baris dikembalikan dengan
+    # tipe yang benar + kolom alasan_tolak ("" = valid).
+    raw_jk = df["jenis_kelamin"].astype("string").str.strip()
+    jk = raw_jk.str.casefold().map(SEX_ALIASES)
+    # Usia pecahan dipertahankan (metode lms); bulan penuh baru diambil di
+    # method_age untuk metode sd
+    usia = _parse_number(df["usia_bulan"])
+    bbl = _parse_number(df["berat_lahir_kg"])
+    tbl = _parse_number(df["tinggi_lahir_cm"])
+    bb = _parse_number(df["berat_badan_kg"])
+    tb = _parse_number(df["tinggi_badan_cm"])
+
+    checks = [
+        (jk.isna(), "jenis_kelamin tidak dikenal"),
+        (usia.isna(), "usia_bulan bukan angka"),
+        # Batas bawah pada nilai asli (-0.5 ditolak), atas pada bulan penuh (60.5 = 60)
+        (((usia < MIN_AGE) | (np.trunc(usia) > MAX_AGE)) & np.isfinite(usia),
+         f"usia_bulan di luar {MIN_AGE}-{MAX_AGE}"),
+        (bb.isna(), "berat_badan_kg bukan angka"),
+        (bb <= 0, "berat_badan_kg harus > 0"),
+        (tb.isna(), "tinggi_badan_cm bukan angka"),
+        (tb <= 0, "tinggi_badan_cm harus > 0"),
+        # Data lahir boleh kosong, tetapi bila diisi harus angka
+        (_unparsed(df["berat_lahir_kg"], bbl), "berat_lahir_kg bukan angka"),
+        (_unparsed(df["tinggi_lahir_cm"], tbl), "tinggi_lahir_cm bukan angka"),
+    ]
+    # "inf" / "1e999" lolos konversi angka, tetapi memberi z tak hingga
+    for name, col in (("usia_bulan", usia), ("berat_badan_kg", bb), ("tinggi_badan_cm", tb),
+                      ("berat_lahir_kg", bbl), ("tinggi_lahir_cm", tbl)):
+        checks.append((np.isinf(col), f"{name} tidak terhingga"))
+    alasan = np.full(len(df), "", dtype=object)
+    for mask, text in checks:
+        m = mask.to_numpy(dtype=bool, na_value=False)
+        alasan[m] = np.where(alasan[m] == "", text, alasan[m] + "; " + text)
+
+    return pd.DataFrame({
+        "jenis_kelamin": jk.astype(object).to_numpy(),
+        "usia_bulan": usia.to_numpy(),
+        "berat_lahir_kg": bbl.to_numpy(),
+        "tinggi_lahir_cm": tbl.to_numpy(),
+        "berat_badan_kg": bb.to_numpy(),
+        "tinggi_badan_cm": tb.to_numpy(),
+        "alasan_tolak": alasan,
+    })
+
+def method_age(usia: pd.Series, method: str = "sd") -> pd.Series:
+    # sd: tabel per bulan -> usia bulan penuh (dipotong, int); lms: koefisien
+    # diinterpolasi per hari -> usia pecahan apa adanya (float)
+    if _check_method(method) == "sd":
+        return np.trunc(usia.astype(np.float64)).astype(int)
+    return usia.astype(np.float64)
+
+def prepare_input(df: pd.DataFrame, method: str = "sd"):
+    # -> (input valid siap skor, baris mentah yang ditolak + alasan_tolak)
+    parsed = parse_input(df)
+    ok = (parsed["alasan_tolak"] == "").to_numpy()
+    inp = parsed.loc[ok, INPUT_COLUMNS].reset_index(drop=True)
+    inp["usia_bulan"] = method_age(inp["usia_bulan"], method)
+    rejected = df.loc[~ok, INPUT_COLUMNS].copy()
+    rejected.insert(0, "baris", np.flatnonzero(~ok) + 1)
+    rejected["alasan_tolak"] = parsed.loc[~ok, "alasan_tolak"].to_numpy()
+    return inp, rejected.reset_index(drop=True)
+
+# Hasil disimpan ringkas: TB/U, BB/U, Prediksi & jenis_kelamin = kategori
+# (kode int8), usia_bulan = uint8 (float64 bila pecahan, metode lms), skor = float32 yang sudah dibulatkan ke
+# desimal di bawah. Label teks dan float64 persis baru dibuat saat tampil /
+# ekspor (display_frame, to_csv, JSON).
+RESULT_DECIMALS = {"Prob_Risiko": 3, "z_TBU": 2, "z_BBU": 2, "ML_Prob": 3}
+
+def compact_input(inp: pd.DataFrame) -> pd.DataFrame:
+    # Kolom input valid (prepare_input) dalam tipe ringkas
+    usia = inp["usia_bulan"].to_numpy()
+    return inp.assign(
+        jenis_kelamin=pd.Categorical.from_codes(_sex_codes(inp["jenis_kelamin"]), SEX_LABELS),
+        usia_bulan=usia.astype(np.uint8) if np.issubdtype(usia.dtype, np.integer) else usia,
+    )
+
+def score_frame(inp: pd.DataFrame, method: str = "sd", model=None, scaler=None) -> pd.DataFrame:
+    # Hasil siap tampil/unduh untuk input dari prepare_input
+    res = score_batch(
+        inp["jenis_kelamin"], inp["usia_bulan"],
+        inp["tinggi_badan_cm"], inp["berat_badan_kg"], method=method,
+    )
+    out = pd.concat([compact_input(inp), res], axis=1)
+    # clf_final dilatih dengan usia bulan penuh, jadi fiturnya tetap usia
+    # terpotong walaupun z-score lms memakai usia pecahan
+    ml_inp = inp.assign(usia_bulan=method_age(inp["usia_bulan"])) if method == "lms" else inp
+    out["ML_Prob"] = ml_score(ml_inp, model, scaler)
+    for col, decimals in RESULT_DECIMALS.items():
+        out[col] = out[col].round(decimals).astype(np.float32)
+    return out
+
+def display_frame(out: pd.DataFrame) -> pd.DataFrame:
+    # Untuk potongan kecil yang ditampilkan / dikirim sebagai JSON: skor
+    # float32 -> float64 dengan desimal persis (0.653, bukan 0.6529999971)
+    exact = {col: out[col].astype(np.float64).round(decimals)
+             for col, decimals in RESULT_DECIMALS.items()
+             if col in out.columns and out[col].dtype == np.float32}
+    return out.assign(**exact) if exact else out
+
+# ----------------- Format file: CSV / Parquet / Arrow IPC -----------------
+FILE_FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet", ".pq": "parquet",
+    ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow",
+}
+MIME_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+FILE_SUFFIX = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+
+def file_format(path) -> str:
+    fmt = FILE_FORMATS.get(Path(str(path)).suffix.lower())
+    if fmt is None:
+        raise ValueError(f"Format file tidak dikenal: {path} (pakai .csv / .parquet / .arrow)")
+    return fmt
+
+def _normalize_columns(chunk: pd.DataFrame) -> pd.DataFrame:
+    chunk.columns = [str(c).strip().lower() for c in chunk.columns]
+    missing = [c for c in INPUT_COLUMNS if c not in chunk.columns]
+    if missing:
+        raise ValueError("Kolom tidak lengkap: " + ", ".join(missing))
+    return chunk
+
+def _project(names) -> list:
+    # Nama kolom asli di file untuk 6 kolom template + kolom opsional yang ada
+    # (column projection)
+    lookup = {str(n).strip().lower(): n for n in names}
+    missing = [c for c in INPUT_COLUMNS if c not in lookup]
+    if missing:
+        raise ValueError("Kolom tidak lengkap: " + ", ".join(missing))
+    return [lookup[c] for c in INPUT_COLUMNS + OPTIONAL_COLUMNS if c in lookup]
+
+def _wanted(name) -> bool:
+    # usecols CSV: kolom template + kolom opsional
+    name = str(name).strip().lower()
+    return name in INPUT_COLUMNS or name in OPTIONAL_COLUMNS
+
+def _read_csv(src, **kwargs):
+    # Semua kolom dibaca sebagai teks, hanya kolom template (+ opsional)
+    return pd.read_csv(src, dtype=str, usecols=_wanted, **kwargs)
+
+def iter_csv_chunks(src, chunk_rows: int = STREAM_CHUNK_ROWS):
+    reader = _read_csv(src, chunksize=chunk_rows)
+    for chunk in reader:
+        yield _normalize_columns(chunk)
+
+def iter_parquet_chunks(src, chunk_rows: int = STREAM_CHUNK_ROWS, row_groups=None):
+    # Hanya kolom template yang dibaca dari file
+    import pyarrow.parquet as pq
+
+    pf = pq.ParquetFile(src)
+    columns = _project(pf.schema_arrow.names)
+    for batch in pf.iter_batches(batch_size=chunk_rows, row_groups=row_groups, columns=columns):
+        yield _normalize_columns(batch.to_pandas())
+
+def open_arrow(src):
+    # Arrow IPC format file (termasuk Feather v2) atau format stream
+    import pyarrow as pa
+
+    try:
+        return pa.ipc.open_file(src)
+    except pa.ArrowInvalid:
+        if hasattr(src, "seek"):
+            src.seek(0)
+        return pa.ipc.open_stream(src)
+
+def _arrow_batches(reader, batches=None):
+    # Format file: akses acak per record batch; format stream: berurutan
+    if hasattr(reader, "get_batch"):
+        for i in range(reader.num_record_batches) if batches is None else batches:
+            yield reader.get_batch(i)
+    else:
+        yield from reader
+
+def iter_arrow_chunks(src, chunk_rows: int = STREAM_CHUNK_ROWS, batches=None):
+    reader = open_arrow(src)
+    columns = _project(reader.schema.names)
+    for batch in _arrow_batches(reader, batches):
+        batch = batch.select(columns)
+        for start in range(0, batch.num_rows, chunk_rows):
+            yield _normalize_columns(batch.slice(start, chunk_rows).to_pandas())
+
+def iter_chunks(src, fmt: str, chunk_rows: int = STREAM_CHUNK_ROWS):
+    if fmt == "parquet":
+        return iter_parquet_chunks(src, chunk_rows)
+    if fmt == "arrow":
+        return iter_arrow_chunks(src, chunk_rows)
+    return iter_csv_chunks(src, chunk_rows)
+
+def read_table(src, fmt: str) -> pd.DataFrame:
+    # Baca seluruh file, hanya kolom template (+ opsional)
+    if fmt == "csv":
+        return _normalize_columns(_read_csv(src))
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        columns = _project(pq.ParquetFile(src).schema_arrow.names)
+        if hasattr(src, "seek"):
+            src.seek(0)
+        table = pq.read_table(src, columns=columns)
+    else:
+        reader = open_arrow(src)
+        table = reader.read_all().select(_project(reader.schema.names))
+    return _normalize_columns(table.to_pandas())
+
+# ----------------- Penulis hasil per chunk -----------------
+class _CsvSink:
+    def __init__(self, dst):
+        self.own = not hasattr(dst, "write")
+        self.f = open(dst, "w", newline="", encoding="utf-8") if self.own else dst
+
+    def __call__(self, out: pd.DataFrame, first: bool):
+        out.to_csv(self.f, index=False, header=first)
+
+    def close(self):
+        if self.own:
+            self.f.close()
+
+class _ArrowSink(ABC):
+    # Tulis hasil per chunk sebagai row group (Parquet) / record batch (Arrow);
+    # skema mengikuti chunk pertama. Kolom numerik dikonversi tanpa salin.
+    def __init__(self, dst):
+        self.dst = dst
+        self.writer = None
+
+    @abstractmethod
+    def _open(self, schema):
+        # -> writer pyarrow (write_table, close) untuk skema chunk pertama
+        ...
+
+    def __call__(self, out: pd.DataFrame, first: bool):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(out, preserve_index=False)
+        if self.writer is None:
+            self.schema = table.schema
+            self.writer = self._open(self.schema)
+        else:
+            table = table.cast(self.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+class _ParquetSink(_ArrowSink):
+    def _open(self, schema):
+        import pyarrow.parquet as pq
+
+        return pq.ParquetWriter(self.dst, schema)
+
+class _ArrowFileSink(_ArrowSink):
+    def _open(self, schema):
+        import pyarrow as pa
+
+        # zstd: tanpa kompresi, kolom label teks membuat file lebih besar dari CSV
+        options = pa.ipc.IpcWriteOptions(compression="zstd")
+        return pa.ipc.new_file(self.dst, schema, options=options)
+
+SINKS = {"csv": _CsvSink, "parquet": _ParquetSink, "arrow": _ArrowFileSink}
+
+def open_sink(dst, fmt: str):
+    return SINKS[fmt](dst)
+
+def encode_result(out: pd.DataFrame, fmt: str = "csv") -> bytes:
+    # Hasil lengkap sebagai bytes untuk tombol unduh
+    if fmt == "csv":
+        return out.to_csv(index=False).encode("utf-8")
+    import pyarrow as pa
+
+    buf = pa.BufferOutputStream()
+    sink = open_sink(buf, fmt)
+    sink(out, True)
+    sink.close()
+    return buf.getvalue().to_pybytes()
+
+def read_head(path, fmt: str, n: int = 1000) -> pd.DataFrame:
+    # Cuplikan n baris pertama file hasil
+    if fmt == "csv":
+        return pd.read_csv(path, nrows=n)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        batch = next(pq.ParquetFile(path).iter_batches(batch_size=n), None)
+        return pd.DataFrame() if batch is None else batch.to_pandas()
+    import pyarrow as pa
+
+    with pa.memory_map(str(path)) as f:
+        return pa.ipc.open_file(f).read_all().slice(0, n).to_pandas()
+
+# ----------------- Ringkasan per chunk -----------------
+def new_stats(report: bool = False) -> dict:
+    # report=True: ikut kumpulkan laporan per wilayah x usia x jenis kelamin
+    stats = {"baris_masuk": 0, "baris_valid": 0, "stunting": 0, "ditolak": {}}
+    if report:
+        stats["laporan"] = GroupReport()
+    return stats
+
+def add_chunk_stats(stats: dict, chunk: pd.DataFrame, out: pd.DataFrame, rejected: pd.DataFrame):
+    stats["baris_masuk"] += len(chunk)
+    stats["baris_valid"] += len(out)
+    stats["stunting"] += int((out["Prediksi"] == "Stunting").sum())
+    for alasan, n in rejected["alasan_tolak"].value_counts().items():
+        stats["ditolak"][alasan] = stats["ditolak"].get(alasan, 0) + int(n)
+    if "laporan" in stats:
+        stats["laporan"].add(chunk, out, rejected)
+
+def merge_stats(stats: dict, part: dict):
+    for k in ("baris_masuk", "baris_valid", "stunting"):
+        stats[k] += part[k]
+    for alasan, n in part["ditolak"].items():
+        stats["ditolak"][alasan] = stats["ditolak"].get(alasan, 0) + n
+    if "laporan" in part:
+        stats.setdefault("laporan", GroupReport()).merge(part["laporan"])
+
+def empty_result(method: str = "sd") -> pd.DataFrame:
+    # Frame hasil 0 baris: dipakai untuk header CSV / skema Parquet input kosong
+    inp, _ = prepare_input(pd.DataFrame(columns=INPUT_COLUMNS), method)
+    return score_frame(inp, method)
+
+def score_chunks(chunks, write, method: str = "sd", model=None, scaler=None,
+                 on_progress=None, report: bool = False) -> dict:
+    # Skor tiap chunk secara vektor lalu serahkan ke write(out, first).
+    # Memori puncak ~ satu chunk, tidak tergantung ukuran file.
+    stats = new_stats(report)
+    first = True
+    for chunk in chunks:
+        inp, rejected = prepare_input(chunk, method)
+        out = score_frame(inp, method, model, scaler)
+        write(out, first)
+        first = False
+        add_chunk_stats(stats, chunk, out, rejected)
+        if on_progress is not None:
+            on_progress(stats)
+    if first:
+        # Input kosong: tetap tulis header/skema hasil
+        write(empty_result(method), True)
+    return stats
+
+def stream_score_csv(src, dst, method: str = "sd", model=None, scaler=None,
+                     chunk_rows: int = STREAM_CHUNK_ROWS, on_progress=None) -> dict:
+    # CSV -> CSV per chunk, hasil ditulis langsung ke dst (path atau file object)
+    return stream_score(src, "csv", dst, "csv", method, model, scaler, chunk_rows, on_progress)
+
+def stream_score(src, src_fmt: str, dst, dst_fmt: str, method: str = "sd", model=None,
+                 scaler=None, chunk_rows: int = STREAM_CHUNK_ROWS, on_progress=None,
+                 report: bool = False) -> dict:
+    # src/dst boleh path atau file object; format eksplisit
+    sink = open_sink(dst, dst_fmt)
+    try:
+        return score_chunks(iter_chunks(src, src_fmt, chunk_rows), sink, method, model,
+                            scaler, on_progress, report)
+    finally:
+        sink.close()
+
+def score_file(src, dst, method: str = "sd", model=None, scaler=None,
+               chunk_rows: int = STREAM_CHUNK_ROWS, on_progress=None,
+               report: bool = False) -> dict:
+    # Satu file input -> satu file hasil; format dipilih dari ekstensi
+    return stream_score(src, file_format(src), dst, file_format(dst), method, model, scaler,
+                        chunk_rows, on_progress, report)
@@ -0,0 +1,179 @@
+# ============================================================
+# stunting/report.py
+# Laporan agregat per wilayah x kelompok usia x jenis kelamin: jumlah anak,
+# prevalensi stunting, rerata z TB/U & BB/U, dan jumlah per kategori.
+#
+# Dihitung dalam satu kali baca bersama skoring (per chunk, lewat stats di
+# pipeline). State parsial hanya berisi jumlah/total per sel, jadi bisa
+# digabung antar chunk, shard, file, maupun run terpisah (merge) tanpa
+# menyimpan baris, sehingga input boleh jauh lebih besar dari memori.
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .view import AGE_BAND_LABELS, AGE_BANDS, SEX_LABELS, _codes
+from .who import BBU_LABELS, PREDIKSI_LABELS, TBU_LABELS
+
+REGION_COLUMN = "wilayah"      # kolom opsional pada file input
+REPORT_FORMAT = 1
+# Kolom statistik per sel (wilayah, kelompok usia, jenis kelamin)
+_TBU_KEYS = ("tbu_sangat_pendek", "tbu_pendek", "tbu_normal", "tbu_tinggi")
+_BBU_KEYS = ("bbu_gizi_buruk", "bbu_gizi_kurang", "bbu_gizi_baik", "bbu_gizi_lebih")
+STAT_KEYS = ("jumlah_anak", "stunting", "jumlah_z_TBU", "n_z_TBU", "jumlah_z_BBU", "n_z_BBU",
+             *_TBU_KEYS, *_BBU_KEYS)
+_CELLS = len(AGE_BAND_LABELS) * len(SEX_LABELS)
+REPORT_COLUMNS = ["wilayah", "kelompok_usia", "jenis_kelamin", "jumlah_anak", "stunting",
+                  "prevalensi_%", "rerata_z_TBU", "rerata_z_BBU", *_TBU_KEYS, *_BBU_KEYS]
+
+class GroupReport:
+    # regions[i] = nama wilayah (None = file tanpa kolom wilayah);
+    # acc[(i * _CELLS) + usia * 2 + jk, k] = total statistik STAT_KEYS[k]
+    def __init__(self):
+        self.regions = []
+        self._index = {}
+        self.acc = np.zeros((0, len(STAT_KEYS)), dtype=np.float64)
+
+    def _region_ids(self, names) -> np.ndarray:
+        ids = np.empty(len(names), dtype=np.int64)
+        for j, name in enumerate(names):
+            i = self._index.get(name)
+            if i is None:
+                i = self._index[name] = len(self.regions)
+                self.regions.append(name)
+            ids[j] = i
+        if len(self.regions) * _CELLS > len(self.acc):
+            grow = np.zeros((len(self.regions) * _CELLS - len(self.acc), len(STAT_KEYS)))
+            self.acc = np.vstack([self.acc, grow])
+        return ids
+
+    def add(self, chunk: pd.DataFrame, out: pd.DataFrame, rejected: pd.DataFrame):
+        # chunk = baris mentah (setelah normalisasi kolom), out = hasil
+        # score_frame untuk baris valid, rejected = baris ditolak (kolom baris)
+        if not len(out):
+            return
+        if REGION_COLUMN in chunk.columns:
+            keep = np.ones(len(chunk), dtype=bool)
+            keep[rejected["baris"].to_numpy() - 1] = False
+            raw = chunk[REGION_COLUMN].astype("string").str.strip().fillna("")
+            codes, uniques = pd.factorize(raw.to_numpy(dtype=object)[keep])
+            names = [str(v) or None for v in uniques]   # kosong = tanpa wilayah
+            region = self._region_ids(names)[codes]
+        else:
+            region = np.full(len(out), self._region_ids([None])[0])
+
+        band = np.searchsorted(AGE_BANDS, out["usia_bulan"].to_numpy(), side="right") - 1
+        sex = _codes(out["jenis_kelamin"], SEX_LABELS)
+        tbu = _codes(out["TB/U"], TBU_LABELS)
+        bbu = _codes(out["BB/U"], BBU_LABELS)
+        ok = (band >= 0) & (band < len(AGE_BAND_LABELS)) & (sex >= 0)
+        cell = (region * _CELLS + band * len(SEX_LABELS) + sex)[ok]
+        z_tbu = out["z_TBU"].to_numpy(dtype=np.float64)[ok]
+        z_bbu = out["z_BBU"].to_numpy(dtype=np.float64)[ok]
+        fin_t, fin_b = np.isfinite(z_tbu), np.isfinite(z_bbu)
+        weights = [
+            None, (out["Prediksi"] == PREDIKSI_LABELS[1]).to_numpy()[ok],
+            np.where(fin_t, z_tbu, 0.0), fin_t, np.where(fin_b, z_bbu, 0.0), fin_b,
+            *(tbu[ok] == k for k in range(len(TBU_LABELS))),
+            *(bbu[ok] == k for k in range(len(BBU_LABELS))),
+        ]
+        size = len(self.acc)
+        for k, w in enumerate(weights):
+            self.acc[:, k] += np.bincount(cell, weights=w, minlength=size)
+
+    def _add_totals(self, names, acc: np.ndarray):
+        ids = self._region_ids(names)
+        rows = (ids[:, None] * _CELLS + np.arange(_CELLS)).ravel()
+        np.add.at(self.acc, rows, acc)   # beberapa nama bisa jatuh ke wilayah yang sama
+
+    def merge(self, other: "GroupReport") -> "GroupReport":
+        if other.regions:
+            self._add_totals(other.regions, other.acc)
+        return self
+
+    def fill_region(self, name: str) -> "GroupReport":
+        # Baris dari file tanpa kolom wilayah diberi nama (mis. nama file)
+        if None not in self._index:
+            return self
+        regions, acc = self.regions, self.acc
+        self.regions, self._index = [], {}
+        self.acc = np.zeros((0, len(STAT_KEYS)), dtype=np.float64)
+        self._add_totals([name if r is None else r for r in regions], acc)
+        return self
+
+    # ----------------- Tabel ringkasan -----------------
+    def to_frame(self) -> pd.DataFrame:
+        acc = self.acc
+        n = acc[:, 0]
+        keep = np.flatnonzero(n > 0)
+        a = acc[keep]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            prev = np.round(100 * a[:, 1] / a[:, 0], 1)
+            mean_t = np.round(a[:, 2] / a[:, 3], 2)
+            mean_b = np.round(a[:, 4] / a[:, 5], 2)
+        region = np.array(["(tanpa wilayah)" if r is None else r for r in self.regions],
+                          dtype=object)
+        cell = keep % _CELLS
+        out = pd.DataFrame({
+            "wilayah": region[keep // _CELLS],
+            "kelompok_usia": np.asarray(AGE_BAND_LABELS, dtype=object)[cell // len(SEX_LABELS)],
+            "jenis_kelamin": np.asarray(SEX_LABELS, dtype=object)[cell % len(SEX_LABELS)],
+            "jumlah_anak": a[:, 0].astype(np.int64),
+            "stunting": a[:, 1].astype(np.int64),
+            "prevalensi_%": prev,
+            "rerata_z_TBU": mean_t,
+            "rerata_z_BBU": mean_b,
+        })
+        for k, key in enumerate(_TBU_KEYS + _BBU_KEYS, start=6):
+            out[key] = a[:, k].astype(np.int64)
+        # Urut wilayah (abjad), lalu kelompok usia & jenis kelamin
+        order = np.lexsort((cell, out["wilayah"].to_numpy()))
+        return out.iloc[order].reset_index(drop=True)[REPORT_COLUMNS]
+
+    # ----------------- State parsial (JSON) -----------------
+    def to_dict(self) -> dict:
+        return {"format": REPORT_FORMAT, "stat": list(STAT_KEYS),
+                "kelompok_usia": list(AGE_BAND_LABELS), "jenis_kelamin": list(SEX_LABELS),
+                "wilayah": self.regions, "total": self.acc.tolist()}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "GroupReport":
+        if (state.get("format") != REPORT_FORMAT or state.get("stat") != list(STAT_KEYS)
+                or state.get("kelompok_usia") != list(AGE_BAND_LABELS)):
+            raise ValueError("State laporan dibuat dengan versi/kelompok berbeda")
+        report = cls()
+        report._region_ids(state["wilayah"])
+        report.acc[:] = np.asarray(state["total"], dtype=np.float64).reshape(report.acc.shape)
+        return report
+
+def chart_data(table: pd.DataFrame, by: str = "wilayah") -> pd.DataFrame:
+    # Prevalensi (%) per `by` (wilayah / kelompok_usia) x jenis kelamin,
+    # dihitung ulang dari jumlah (bukan rerata persentase); siap untuk bar_chart
+    g = table.groupby([by, "jenis_kelamin"], sort=False)[["jumlah_anak", "stunting"]].sum()
+    prev = (100 * g["stunting"] / g["jumlah_anak"]).round(1).unstack("jenis_kelamin")
+    if by == "kelompok_usia":
+        prev = prev.reindex([b for b in AGE_BAND_LABELS if b in prev.index])
+    return prev.reindex(columns=[s for s in SEX_LABELS if s in prev.columns])
+
+def report_state_path(table_path) -> Path:
+    # ringkasan.csv -> ringkasan.state.json (untuk digabung dengan run lain)
+    path = Path(table_path)
+    return path.with_name(path.stem + ".state.json")
+
+def save_report(report: GroupReport, path) -> Path:
+    # Tabel (CSV/Parquet dari ekstensi) + state JSON di sampingnya
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = report.to_frame()
+    if path.suffix.lower() == ".parquet":
+        table.to_parquet(path, index=False)
+    else:
+        table.to_csv(path, index=False)
+    state = report_state_path(path)
+    state.write_text(json.dumps(report.to_dict()), encoding="utf-8")
+    return state
+
+def load_report(path) -> GroupReport:
+    return GroupReport.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
@@ -0,0 +1,249 @@
+# ============================================================
+# stunting/service.py
+# HTTP API lokal (stdlib, tanpa framework):
+#   python -m stunting serve --port 8000
+#
+#   POST /score   satu anak  {"jenis_kelamin": "Perempuan", "usia_bulan": 24, ...}
+#                 -> digabung dengan request lain menjadi micro-batch
+#                 banyak anak {"records": [{...}, ...]} atau [{...}, ...]
+#                 -> langsung diskor sekali secara vektor
+#                 opsional "method": "sd" | "lms"
+#   GET  /health  status + versi model
+#   GET  /stats   latensi p50/p99 per endpoint + ukuran micro-batch
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from .pipeline import INPUT_COLUMNS, display_frame, method_age, parse_input, score_frame
+from .who import Z_METHODS, saran
+
+RESULT_KEYS = ["TB/U", "BB/U", "Prob_Risiko", "z_TBU", "z_BBU", "Prediksi", "ML_Prob"]
+MAX_BODY_BYTES = 32 * 2**20
+LATENCY_WINDOW = 10_000
+
+# ----------------- Skoring record JSON -----------------
+def _json_value(v):
+    if isinstance(v, (np.floating, float)):
+        return None if np.isnan(v) else float(v)
+    if isinstance(v, np.integer):
+        return int(v)
+    return v
+
+def score_records(records: list, method: str = "sd", model=None, scaler=None) -> list:
+    # Satu hasil per record, urutan sama dengan input. Record tidak valid
+    # mendapat {"error": alasan_tolak} (aturan sama dengan upload kelompok).
+    records = [{str(k).strip().lower(): v for k, v in r.items()} for r in records]
+    df = pd.DataFrame.from_records(records, columns=INPUT_COLUMNS)
+    parsed = parse_input(df)
+    ok = (parsed["alasan_tolak"] == "").to_numpy()
+    inp = parsed.loc[ok, INPUT_COLUMNS].reset_index(drop=True)
+    inp["usia_bulan"] = method_age(inp["usia_bulan"], method)
+    out = display_frame(score_frame(inp, method, model, scaler))
+
+    cols = {k: out[k].to_numpy() for k in RESULT_KEYS}
+    results = [{"error": a} for a in parsed["alasan_tolak"]]
+    for j, i in enumerate(np.flatnonzero(ok)):
+        res = {k: _json_value(cols[k][j]) for k in RESULT_KEYS}
+        res["Saran"] = saran(res["TB/U"], res["BB/U"])
+        results[i] = res
+    return results
+
+# ----------------- Micro-batching request tunggal -----------------
+class MicroBatcher:
+    # Request satu anak dari banyak thread HTTP dimasukkan ke antrean; satu
+    # thread pekerja mengambil hingga max_batch record atau sampai tenggat
+    # max_wait_ms sejak record pertama tiba, lalu menskor semuanya sekaligus.
+    def __init__(self, model=None, scaler=None, max_batch: int = 256, max_wait_ms: float = 5.0):
+        self.model, self.scaler = model, scaler
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self.batch_sizes = deque(maxlen=LATENCY_WINDOW)
+        self._thread = threading.Thread(target=self._run, name="micro-batch", daemon=True)
+        self._thread.start()
+
+    def submit(self, record: dict, method: str = "sd") -> Future:
+        fut = Future()
+        self._queue.put((time.perf_counter(), record, method, fut))
+        return fut
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            batch = [first]
+            deadline = first[0] + self.max_wait
+            while len(batch) < self.max_batch:
+                # Setelah tenggat lewat tetap ambil yang sudah antre (tanpa
+                # menunggu), supaya antrean panjang dikuras per batch besar
+                timeout = deadline - time.perf_counter()
+                try:
+                    if timeout <= 0:
+                        batch.append(self._queue.get_nowait())
+                    else:
+                        batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self.batch_sizes.append(len(batch))
+
+            by_method = {}
+            for item in batch:
+                by_method.setdefault(item[2], []).append(item)
+            for method, items in by_method.items():
+                try:
+                    results = score_records([it[1] for it in items], method, self.model, self.scaler)
+                except Exception as e:
+                    for it in items:
+                        it[3].set_exception(e)
+                    continue
+                for it, res in zip(items, results):
+                    it[3].set_result(res)
+
+# ----------------- Statistik latensi -----------------
+class LatencyStats:
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._window = window
+        self._samples = {}
+        self._counts = {}
+
+    def record(self, endpoint: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(endpoint, deque(maxlen=self._window)).append(seconds * 1000)
+            self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            snap = {k: np.array(v) for k, v in self._samples.items()}
+            counts = dict(self._counts)
+        return {
+            k: {"jumlah": counts[k],
+                "p50_ms": round(float(np.percentile(v, 50)), 3),
+                "p99_ms": round(float(np.percentile(v, 99)), 3),
+                "max_ms": round(float(v.max()), 3)}
+            for k, v in snap.items() if len(v)
+        }
+
+# ----------------- HTTP -----------------
+class ScoringHandler(BaseHTTPRequestHandler):
+    server_version = "StuntingScorer/1.0"
+    protocol_version = "HTTP/1.1"   # keep-alive: klien bisa memakai ulang koneksi
+    disable_nagle_algorithm = True  # header & body terkirim tanpa jeda delayed-ACK
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, payload, close: bool = False):
+        # close=True bila body request tidak dibaca: sisa body di socket akan
+        # terbaca sebagai request berikutnya, jadi koneksi tidak dipakai ulang
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if close:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        t0 = time.perf_counter()
+        if self.path == "/health":
+            self._send(200, {"status": "ok", "model": self.server.model_version,
+                             "ml": self.server.model is not None})
+        elif self.path == "/stats":
+            sizes = np.array(self.server.batcher.batch_sizes)
+            self._send(200, {
+                "latensi": self.server.latency.summary(),
+                "micro_batch": {"jumlah": len(sizes),
+                                "rata_rata": round(float(sizes.mean()), 2) if len(sizes) else None,
+                                "maks": int(sizes.max()) if len(sizes) else None},
+            })
+        else:
+            self._send(404, {"error": f"endpoint tidak dikenal: {self.path}"})
+            return
+        self.server.latency.record("GET " + self.path, time.perf_counter() - t0)
+
+    def do_POST(self):
+        t0 = time.perf_counter()
+        if self.path != "/score":
+            self._send(404, {"error": f"endpoint tidak dikenal: {self.path}"})
+            return
+        header = self.headers.get("Content-Length")
+        if header is None:
+            self._send(411, {"error": "header Content-Length wajib"}, close=True)
+            return
+        try:
+            length = int(header)
+            if length < 0:
+                raise ValueError(f"Content-Length negatif: {length}")
+            if length > MAX_BODY_BYTES:
+                self._send(413, {"error": f"body melebihi {MAX_BODY_BYTES} byte"}, close=True)
+                return
+            payload = json.loads(self.rfile.read(length) or b"null")
+        except ValueError as e:
+            # Content-Length bukan angka / negatif, atau JSON tidak valid
+            self._send(400, {"error": f"request tidak valid: {e}"}, close=True)
+            return
+
+        method = "sd"
+        if isinstance(payload, dict):
+            method = payload.pop("method", "sd")
+        if method not in Z_METHODS:
+            self._send(400, {"error": f"method harus salah satu dari {Z_METHODS}"})
+            return
+
+        srv = self.server
+        if isinstance(payload, dict) and "records" in payload:
+            payload = payload["records"]
+        if isinstance(payload, list):
+            if not all(isinstance(r, dict) for r in payload):
+                self._send(400, {"error": "records harus berupa list objek"})
+                return
+            try:
+                results = score_records(payload, method, srv.model, srv.scaler)
+            except Exception as e:
+                self._fail(e)
+                return
+            self._send(200, {"results": results})
+            srv.latency.record("POST /score (batch)", time.perf_counter() - t0)
+        elif isinstance(payload, dict):
+            try:
+                result = srv.batcher.submit(payload, method).result()
+            except Exception as e:
+                self._fail(e)
+                return
+            self._send(422 if "error" in result else 200, result)
+            srv.latency.record("POST /score", time.perf_counter() - t0)
+        else:
+            self._send(400, {"error": "body harus objek satu anak atau list records"})
+
+    def _fail(self, exc: Exception):
+        # Skoring gagal (bug / model rusak): tetap balas JSON, jangan putus koneksi
+        self.log_error("skoring gagal: %r", exc)
+        self._send(500, {"error": f"skoring gagal: {type(exc).__name__}: {exc}"})
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256   # default 5 terlalu kecil untuk banyak klien bersamaan
+
+def make_server(host: str = "127.0.0.1", port: int = 8000, model=None, scaler=None,
+                model_version=None, max_batch: int = 256, max_wait_ms: float = 5.0,
+                verbose: bool = False) -> ScoringServer:
+    server = ScoringServer((host, port), ScoringHandler)
+    server.model, server.scaler, server.model_version = model, scaler, model_version
+    server.batcher = MicroBatcher(model, scaler, max_batch, max_wait_ms)
+    server.latency = LatencyStats()
+    server.verbose = verbose
+    # Pemanasan: jalur skoring (termasuk XGBoost) sudah siap sebelum request pertama
+    score_records([{"jenis_kelamin": "Laki-laki", "usia_bulan": 12,
+                    "berat_badan_kg": 9.0, "tinggi_badan_cm": 75.0}], "sd", model, scaler)
+    return server
@@ -0,0 +1,470 @@
+# ============================================================
+# stunting/train.py
+# Pipeline training clf_final yang bisa diulang (dari prediksi_stunting.ipynb):
+#
+#   python -m stunting train Stunting_Dataset.csv --jobs 4
+#   python -m stunting train Stunting_Dataset.csv --config latih.json --promote
+#
+# Tahap: bersih -> fitur + split -> praproses (log1p / SMOTE) -> pencarian
+# hyperparameter (CV paralel) -> model final -> artefak berversi di
+# models/<versi>/ (clf_final.joblib, scaler.joblib, .npz, feature_schema.json,
+# manifest.json). Hasil tiap tahap di-cache di .cache/train/ dengan key =
+# hash isi dataset + konfigurasi tahap itu dan tahap sebelumnya, sehingga
+# mengganti hyperparameter tidak mengulang feature engineering. Skor CV per
+# (parameter, fold) juga di-cache.
+
+import hashlib
+import itertools
+import json
+import os
+import platform
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .ml import BASE_DIR, ML_FEATURES, ML_LOG1P, ML_MODEL_SCALED, ML_SCALED, SCHEMA_FILE, \
+    build_ml_features, feature_schema, verify_artifacts
+
+CACHE_DIR = BASE_DIR / ".cache" / "train"
+MODELS_DIR = BASE_DIR / "models"
+PIPELINE_VERSION = 1   # naikkan bila kode suatu tahap berubah (cache lama tidak dipakai)
+
+# Nama kolom dataset Kaggle -> nama kolom aplikasi (sel rename di notebook)
+RAW_COLUMNS = {
+    "Gender": "jenis_kelamin", "Age": "usia_bulan", "Birth Weight": "berat_lahir_kg",
+    "Birth Length": "tinggi_lahir_cm", "Body Weight": "berat_badan_kg",
+    "Body Length": "tinggi_badan_cm", "Breastfeeding": "status_asi",
+    "Stunting": "status_stunting",
+}
+SEX_VALUES = {"male": "Laki-laki", "female": "Perempuan",
+              "laki-laki": "Laki-laki", "perempuan": "Perempuan"}
+LABEL_VALUES = {"yes": 1, "stunting": 1, "1": 1, "no": 0, "tidak stunting": 0, "0": 0}
+
+DEFAULT_CONFIG = {
+    "model": "xgboost",
+    "test_size": 0.3,
+    "random_state": 42,
+    "log1p": list(ML_LOG1P),
+    "smote": False,
+    "model_scaled": ML_MODEL_SCALED,
+    "n_iter": 24,
+    "cv_folds": 5,
+    "base_params": {},      # menimpa base bawaan model
+    "space": None,          # None = ruang pencarian bawaan model
+}
+
+# ----------------- Model & ruang pencarian (sel tuning di notebook) -----------------
+def _make_xgboost(params, n_jobs):
+    from xgboost import XGBClassifier
+
+    return XGBClassifier(**params, n_jobs=n_jobs)
+
+def _make_rf(params, n_jobs):
+    from sklearn.ensemble import RandomForestClassifier
+
+    return RandomForestClassifier(**params, n_jobs=n_jobs)
+
+def _make_lightgbm(params, n_jobs):
+    try:
+        from lightgbm import LGBMClassifier
+    except ImportError as e:
+        raise ValueError("Model lightgbm butuh paket lightgbm (pip install lightgbm)") from e
+    return LGBMClassifier(**params, n_jobs=n_jobs, verbose=-1)
+
+MODELS = {
+    "xgboost": {
+        "make": _make_xgboost,
+        "base": {"objective": "binary:logistic", "eval_metric": "auc", "tree_method": "hist",
+                 "n_estimators": 800, "random_state": 42},
+        "space": {
+            "learning_rate": [0.03, 0.05, 0.07],
+            "max_depth": [3, 4, 5],
+            "min_child_weight": [5, 8, 12],
+            "gamma": [0.0, 0.5, 1.0, 2.0],
+            "subsample": [0.7, 0.85, 1.0],
+            "colsample_bytree": [0.7, 0.85, 1.0],
+            "reg_alpha": [0.0, 1.0, 3.0],
+            "reg_lambda": [1.0, 2.0, 4.0],
+        },
+    },
+    "rf": {
+        "make": _make_rf,
+        "base": {"random_state": 42, "bootstrap": True},
+        "space": {
+            "n_estimators": [300, 500, 700, 900],
+            "max_depth": [8, 10, 12, None],
+            "min_samples_split": [2, 5, 10, 20],
+            "min_samples_leaf": [1, 2, 4, 6],
+            "max_features": ["sqrt", 0.5, "log2"],
+            "class_weight": [None, "balanced_subsample"],
+        },
+    },
+    "lightgbm": {
+        "make": _make_lightgbm,
+        "base": {"objective": "binary", "boosting_type": "gbdt", "random_state": 42},
+        "space": {
+            "n_estimators": [300, 600, 900],
+            "learning_rate": [0.03, 0.05, 0.07],
+            "num_leaves": [31, 63, 127],
+            "max_depth": [-1, 5, 7],
+            "min_child_samples": [20, 40, 80],
+            "subsample": [0.8, 1.0],
+            "colsample_bytree": [0.8, 1.0],
+            "reg_lambda": [0.0, 1.0, 5.0],
+        },
+    },
+}
+
+# ----------------- Cache tahap -----------------
+def _key(*parts) -> str:
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(json.dumps(p, sort_keys=True, default=str).encode() + b"\0")
+    return h.hexdigest()[:16]
+
+def _file_sha256(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+class StageCache:
+    # Satu file per tahap: <nama>-<key>.parquet (DataFrame) atau .npz (array).
+    # Ditulis lewat file sementara + rename agar run yang terputus tidak
+    # meninggalkan cache rusak.
+    def __init__(self, root=CACHE_DIR, log=print):
+        self.root = Path(root)
+        self.log = log
+
+    def _path(self, name, key, ext):
+        return self.root / f"{name}-{key}{ext}"
+
+    def frame(self, name, key, compute):
+        path = self._path(name, key, ".parquet")
+        if path.exists():
+            self.log(f"[{name}] cache {path.name}")
+            return pd.read_parquet(path)
+        self.log(f"[{name}] hitung")
+        df = compute()
+        self._write(path, lambda f: df.to_parquet(f, index=False))
+        return df
+
+    def arrays(self, name, key, compute):
+        path = self._path(name, key, ".npz")
+        if path.exists():
+            self.log(f"[{name}] cache {path.name}")
+            with np.load(path, allow_pickle=False) as npz:
+                return {k: npz[k] for k in npz.files}
+        self.log(f"[{name}] hitung")
+        arrays = compute()
+        self._write(path, lambda f: np.savez(f, **arrays))
+        return arrays
+
+    def json(self, name, key):
+        path = self._path(name, key, ".json")
+        return json.loads(path.read_text()) if path.exists() else None
+
+    def put_json(self, name, key, value):
+        self._write(self._path(name, key, ".json"),
+                    lambda f: f.write(json.dumps(value).encode()))
+
+    def _write(self, path, write):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+
+# ----------------- Tahap 1-3: bersih, fitur + split, praproses -----------------
+def clean_dataset(path) -> pd.DataFrame:
+    # Rename kolom, seragamkan nilai, buang duplikat identik, buang status_asi
+    df = pd.read_csv(path).rename(columns=RAW_COLUMNS)
+    missing = [c for c in ML_FEATURES[:6] + ["status_stunting"] if c not in df.columns]
+    if missing:
+        raise ValueError(f"Kolom dataset tidak lengkap: {missing}")
+    sex = df["jenis_kelamin"].astype(str).str.strip().str.lower()
+    df["jenis_kelamin"] = sex.map(SEX_VALUES).fillna(df["jenis_kelamin"])
+    label = df["status_stunting"].astype(str).str.strip().str.lower()
+    df["status_stunting"] = label.map(LABEL_VALUES)
+    if df["status_stunting"].isna().any():
+        bad = sorted(label[df["status_stunting"].isna()].unique())[:5]
+        raise ValueError(f"Nilai status_stunting tidak dikenal: {bad}")
+    df = df.drop(columns=["status_asi"], errors="ignore")
+    df = df.drop_duplicates(keep="first").reset_index(drop=True)
+    df["status_stunting"] = df["status_stunting"].astype(np.int8)
+    return df
+
+def split_features(df: pd.DataFrame, test_size: float, random_state: int) -> dict:
+    # Fitur dibangun dengan fungsi yang sama dengan inferensi (build_ml_features)
+    from sklearn.model_selection import train_test_split
+
+    X = build_ml_features(df)
+    y = df["status_stunting"].to_numpy(np.int8)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=random_state, stratify=y,
+    )
+    return {"X_train": X_train, "X_test": X_test, "y_train": y_train, "y_test": y_test}
+
+def _log1p(X, cols):
+    X = X.copy()
+    for col in cols:
+        j = ML_FEATURES.index(col)
+        X[:, j] = np.log1p(X[:, j])
+    return X
+
+def _smote(X, y, random_state):
+    try:
+        from imblearn.over_sampling import SMOTE
+    except ImportError as e:
+        raise ValueError("smote=true butuh paket imbalanced-learn") from e
+    return SMOTE(random_state=random_state).fit_resample(X, y)
+
+def preprocess(split: dict, log1p, smote: bool, random_state: int) -> dict:
+    X_fit = _log1p(split["X_train"], log1p)
+    y_fit = split["y_train"]
+    if smote:
+        X_fit, y_fit = _smote(X_fit, y_fit, random_state)
+    return {"X_fit": X_fit, "y_fit": y_fit, "X_test": _log1p(split["X_test"], log1p),
+            "y_test": split["y_test"], "X_train": _log1p(split["X_train"], log1p),
+            "y_train": split["y_train"]}
+
+# ----------------- Tahap 4: pencarian hyperparameter -----------------
+def sample_candidates(space: dict, n_iter: int, random_state: int) -> list:
+    # Sama dengan notebook: produk kartesius ruang, ambil n_iter acak tanpa ulang
+    keys = list(space)
+    grid = list(itertools.product(*(space[k] for k in keys)))
+    rng = np.random.default_rng(random_state)
+    idx = rng.choice(len(grid), size=min(n_iter, len(grid)), replace=False)
+    return [dict(zip(keys, grid[i])) for i in idx]
+
+_SEARCH = {}
+
+def _init_search(X, y, folds, model, base, smote, random_state):
+    # Data & fold dikirim sekali per proses worker
+    _SEARCH.update(X=X, y=y, folds=folds, model=model, base=base, smote=smote,
+                   random_state=random_state)
+
+def _cv_fold(params: dict, fold: int) -> float:
+    from sklearn.metrics import roc_auc_score
+
+    s = _SEARCH
+    tr, va = s["folds"][fold]
+    X_tr, y_tr = s["X"][tr], s["y"][tr]
+    if s["smote"]:
+        # SMOTE hanya pada bagian latih fold agar skor validasi tidak bocor
+        X_tr, y_tr = _smote(X_tr, y_tr, s["random_state"])
+    clf = MODELS[s["model"]]["make"]({**s["base"], **params}, 1)
+    clf.fit(X_tr, y_tr)
+    return float(roc_auc_score(s["y"][va], clf.predict_proba(s["X"][va])[:, 1]))
+
+def search(prep: dict, config: dict, prep_key: str, cache: StageCache, jobs: int = 1,
+           log=print) -> pd.DataFrame:
+    from sklearn.model_selection import StratifiedKFold
+
+    spec = MODELS[config["model"]]
+    base = {**spec["base"], **config["base_params"]}
+    space = config["space"] or spec["space"]
+    candidates = sample_candidates(space, config["n_iter"], config["random_state"])
+    X, y = prep["X_train"], prep["y_train"]
+    if config["model_scaled"]:
+        X = _scale(X, _fit_scaler(prep["X_fit"]))
+    cv = StratifiedKFold(n_splits=config["cv_folds"], shuffle=True,
+                         random_state=config["random_state"])
+    folds = list(cv.split(X, y))
+
+    # Fold yang skornya sudah ada di cache tidak dilatih ulang
+    scores, todo = {}, []
+    for i, params in enumerate(candidates):
+        for f in range(len(folds)):
+            key = _key("cv", PIPELINE_VERSION, prep_key, config["model"], base, params,
+                       config["cv_folds"], config["random_state"], config["smote"],
+                       config["model_scaled"], f)
+            hit = cache.json("cv", key)
+            if hit is None:
+                todo.append((i, f, key))
+            else:
+                scores[i, f] = hit["auc"]
+    log(f"[cv] {len(candidates)} kandidat x {len(folds)} fold: "
+        f"{len(scores)} dari cache, {len(todo)} dilatih ({jobs} proses)")
+
+    initargs = (X, y, folds, config["model"], base, config["smote"], config["random_state"])
+    if jobs <= 1:
+        _init_search(*initargs)
+        for i, f, key in todo:
+            scores[i, f] = _cv_fold(candidates[i], f)
+            cache.put_json("cv", key, {"auc": scores[i, f]})
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_search,
+                                 initargs=initargs) as pool:
+            futures = [(i, f, key, pool.submit(_cv_fold, candidates[i], f)) for i, f, key in todo]
+            for i, f, key, fut in futures:
+                scores[i, f] = fut.result()
+                cache.put_json("cv", key, {"auc": scores[i, f]})
+
+    rows = []
+    for i, params in enumerate(candidates):
+        aucs = [scores[i, f] for f in range(len(folds))]
+        rows.append({"kandidat": i, "auc_mean": float(np.mean(aucs)),
+                     "auc_std": float(np.std(aucs)), "params": params})
+    return pd.DataFrame(rows)
+
+# ----------------- Tahap 5-6: model final & artefak -----------------
+def _fit_scaler(X_fit):
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    scaler.fit(pd.DataFrame(X_fit[:, 1:], columns=ML_SCALED))
+    return scaler
+
+def _scale(X, scaler):
+    X = X.copy()
+    X[:, 1:] = (X[:, 1:] - scaler.mean_) / scaler.scale_
+    return X
+
+def evaluate(clf, X, y) -> dict:
+    from sklearn.metrics import (accuracy_score, f1_score, precision_score, recall_score,
+                                 roc_auc_score)
+
+    p = clf.predict_proba(X)[:, 1]
+    pred = (p >= 0.5).astype(int)
+    return {"auc": roc_auc_score(y, p), "recall": recall_score(y, pred),
+            "precision": precision_score(y, pred, zero_division=0), "f1": f1_score(y, pred),
+            "accuracy": accuracy_score(y, pred), "n": int(len(y))}
+
+def write_schema(out_dir, model_file="clf_final.joblib", scaler_file="scaler.joblib",
+                 version=None, schema=None, **extra) -> Path:
+    # feature_schema.json: fitur yang dipakai saat training + sha256 artefak,
+    # dicek oleh ml.verify_artifacts saat model dimuat
+    out_dir = Path(out_dir)
+    schema = {
+        "versi": version,
+        "schema": schema or feature_schema(),
+        "artefak": {
+            "model": model_file, "model_sha256": _file_sha256(out_dir / model_file),
+            "scaler": scaler_file, "scaler_sha256": _file_sha256(out_dir / scaler_file),
+        },
+        **extra,
+    }
+    path = out_dir / SCHEMA_FILE
+    path.write_text(json.dumps(schema, indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
+
+def _versions() -> dict:
+    import sklearn
+
+    out = {"python": platform.python_version(), "numpy": np.__version__,
+           "pandas": pd.__version__, "scikit-learn": sklearn.__version__}
+    for name in ("xgboost", "lightgbm", "imblearn"):
+        try:
+            out[name] = __import__(name).__version__
+        except ImportError:
+            pass
+    return out
+
+def train(dataset, config=None, jobs: int = 1, out_root=MODELS_DIR, cache_dir=CACHE_DIR,
+          log=print) -> Path:
+    # Return folder artefak versi baru
+    import joblib
+
+    from .bench import _git_commit
+    from .compiled import compile_artifacts
+
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    if config["model"] not in MODELS:
+        raise ValueError(f"Model tidak dikenal: {config['model']}; pilih dari {list(MODELS)}")
+    cache = StageCache(cache_dir, log)
+    timings = {}
+    t0 = time.perf_counter()
+
+    data_sha = _file_sha256(dataset)
+    k_clean = _key("bersih", PIPELINE_VERSION, data_sha)
+    df = cache.frame("bersih", k_clean, lambda: clean_dataset(dataset))
+    k_split = _key("fitur", PIPELINE_VERSION, k_clean, config["test_size"], config["random_state"])
+    split = cache.arrays("fitur", k_split, lambda: split_features(
+        df, config["test_size"], config["random_state"]))
+    k_prep = _key("praproses", PIPELINE_VERSION, k_split, config["log1p"], config["smote"],
+                  config["random_state"])
+    prep = cache.arrays("praproses", k_prep, lambda: preprocess(
+        split, config["log1p"], config["smote"], config["random_state"]))
+    timings["data_s"] = time.perf_counter() - t0
+
+    t1 = time.perf_counter()
+    results = search(prep, config, k_prep, cache, jobs, log)
+    timings["cv_s"] = time.perf_counter() - t1
+    best = results.loc[results["auc_mean"].idxmax()]
+    log(f"[cv] terbaik: AUC {best['auc_mean']:.4f} ± {best['auc_std']:.4f} {best['params']}")
+
+    # Model final dilatih pada seluruh data latih dengan parameter terbaik
+    t2 = time.perf_counter()
+    spec = MODELS[config["model"]]
+    params = {**spec["base"], **config["base_params"], **best["params"]}
+    scaler = _fit_scaler(prep["X_fit"])
+    X_fit, X_test, X_train = prep["X_fit"], prep["X_test"], prep["X_train"]
+    if config["model_scaled"]:
+        X_fit, X_test, X_train = (_scale(X, scaler) for X in (X_fit, X_test, X_train))
+    clf = spec["make"](params, jobs)
+    clf.fit(pd.DataFrame(X_fit, columns=ML_FEATURES), prep["y_fit"])
+    timings["fit_s"] = time.perf_counter() - t2
+    metrics = {"train": evaluate(clf, pd.DataFrame(X_train, columns=ML_FEATURES), prep["y_train"]),
+               "test": evaluate(clf, pd.DataFrame(X_test, columns=ML_FEATURES), prep["y_test"])}
+    log(f"[final] AUC test {metrics['test']['auc']:.4f}, recall test {metrics['test']['recall']:.4f}")
+
+    version = time.strftime("%Y%m%d-%H%M%S") + "-" + _key(k_prep, config, params)[:8]
+    out_dir = Path(out_root) / version
+    out_dir.mkdir(parents=True, exist_ok=True)
+    joblib.dump(clf, out_dir / "clf_final.joblib")
+    joblib.dump(scaler, out_dir / "scaler.joblib")
+    # Skema mencatat praproses run ini; bila beda dengan ML_LOG1P /
+    # ML_MODEL_SCALED di ml.py, aplikasi menolak model ini saat dimuat
+    schema = {**feature_schema(), "log1p": list(config["log1p"]),
+              "model_scaled": config["model_scaled"]}
+    if schema != feature_schema():
+        log("[skema] log1p/model_scaled berbeda dari ml.py; sesuaikan ML_LOG1P/ML_MODEL_SCALED "
+            "sebelum promote")
+    write_schema(out_dir, version=version, schema=schema, dataset_sha256=data_sha)
+    if config["model"] == "xgboost":
+        # .npz tanpa pickle hanya untuk XGBoost (lihat compiled.py)
+        compile_artifacts(out_dir / "clf_final.joblib", out_dir / "scaler.joblib")
+
+    manifest = {
+        "versi": version,
+        "dibuat": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git": _git_commit(),
+        "dataset": {"file": Path(dataset).name, "sha256": data_sha, "baris_bersih": len(df)},
+        "config": config,
+        "cache_key": {"bersih": k_clean, "fitur": k_split, "praproses": k_prep},
+        "params": params,
+        "cv": json.loads(results.to_json(orient="records")),
+        "metrik": metrics,
+        "durasi_s": {k: round(v, 2) for k, v in timings.items()},
+        "versi_paket": _versions(),
+    }
+    (out_dir / "manifest.json").write_text(
+        json.dumps(manifest, indent=2, ensure_ascii=False, default=str), encoding="utf-8")
+    return out_dir
+
+ARTIFACT_FILES = ("clf_final.joblib", "scaler.joblib", "clf_final.npz", "scaler.npz", SCHEMA_FILE)
+
+def promote(version_dir, dst=BASE_DIR) -> list:
+    # Salin artefak versi ke lokasi default aplikasi setelah lolos cek skema;
+    # npz lama yang tidak ikut tersalin dihapus agar artifact_paths tidak
+    # memakai model lama
+    import joblib
+
+    version_dir = Path(version_dir)
+    verify_artifacts(version_dir / "clf_final.joblib", joblib.load(version_dir / "clf_final.joblib"),
+                     joblib.load(version_dir / "scaler.joblib"))
+    copied = []
+    for name in ARTIFACT_FILES:
+        src = version_dir / name
+        if src.exists():
+            shutil.copy2(src, Path(dst) / name)
+            copied.append(Path(dst) / name)
+        elif name.endswith(".npz"):
+            (Path(dst) / name).unlink(missing_ok=True)
+    return copied
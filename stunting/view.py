@@ -0,0 +1,113 @@
+# ============================================================
+# stunting/view.py
+# Tampilan hasil besar tanpa mengirim semua baris ke browser:
+# - page_rows: filter (Prediksi, TB/U, BB/U) + urut + potong satu halaman
+#   di server; urutan per kolom dihitung sekali lalu dipakai ulang.
+# - summarize: hitungan per kategori dan prevalensi per kelompok usia x
+#   jenis kelamin, langsung dari kolom hasil (bincount, bukan groupby baris).
+
+import numpy as np
+import pandas as pd
+
+from .who import BBU_LABELS, PREDIKSI_LABELS, SEX_LABELS, TBU_LABELS
+
+FILTER_COLUMNS = {"Prediksi": PREDIKSI_LABELS, "TB/U": TBU_LABELS, "BB/U": BBU_LABELS}
+PAGE_SIZES = (25, 50, 100, 500)
+AGE_BANDS = (0, 6, 12, 24, 36, 48, 61)
+AGE_BAND_LABELS = ("0-5 bln", "6-11 bln", "12-23 bln", "24-35 bln", "36-47 bln", "48-60 bln")
+
+# ----------------- Filter, urut, halaman -----------------
+def sort_order(out: pd.DataFrame, column=None, ascending: bool = True) -> np.ndarray:
+    # Posisi baris terurut (stabil; NaN selalu di akhir). column=None = urutan asli.
+    if column is None:
+        return np.arange(len(out))
+    values = out[column]
+    if values.dtype == object or isinstance(values.dtype, (pd.StringDtype, pd.CategoricalDtype)):
+        labels = FILTER_COLUMNS.get(column)
+        if labels is not None:
+            # Kategori diurutkan menurut tingkat keparahan, bukan abjad
+            values = _codes(values, labels).astype(np.float64)
+            values[values < 0] = np.nan
+        else:
+            values = pd.factorize(values, sort=True)[0].astype(float)
+            values[values < 0] = np.nan
+    values = np.asarray(values, dtype=np.float64)
+    nan = np.isnan(values)
+    order = np.argsort(values if ascending else -values, kind="stable")
+    return np.concatenate([order[~nan[order]], order[nan[order]]])
+
+def filter_mask(out: pd.DataFrame, filters: dict) -> np.ndarray:
+    # filters: {kolom: [nilai, ...]}; list kosong = tanpa filter kolom itu
+    mask = np.ones(len(out), dtype=bool)
+    for column, values in filters.items():
+        if values:
+            mask &= out[column].isin(values).to_numpy()
+    return mask
+
+def page_rows(out: pd.DataFrame, order: np.ndarray, mask: np.ndarray, page: int,
+              page_size: int):
+    # Return (halaman, jumlah baris lolos filter). Index halaman = nomor baris
+    # asli (1-based) agar mudah dicocokkan dengan file unggahan.
+    rows = order[mask[order]]
+    start = max(page - 1, 0) * page_size
+    idx = rows[start:start + page_size]
+    part = out.iloc[idx]
+    return part.set_axis(pd.Index(idx + 1, name="baris")), len(rows)
+
+def page_count(total: int, page_size: int) -> int:
+    return max(1, -(-total // page_size))
+
+# ----------------- Ringkasan agregat -----------------
+def _codes(values: pd.Series, labels) -> np.ndarray:
+    # Kode kategori (-1 = di luar labels). Kolom kategori (hasil ringkas)
+    # sudah membawa kode; kolom teks di-factorize + peta label unik, jauh
+    # lebih cepat daripada pd.Categorical untuk kolom string besar.
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values)
+    lookup = np.append(pd.Index(labels).get_indexer(uniques), -1)
+    return lookup[codes]
+
+def category_counts(out: pd.DataFrame) -> dict:
+    # {kolom: DataFrame(kategori, jumlah, persen)} untuk Prediksi, TB/U, BB/U
+    n = max(len(out), 1)
+    tables = {}
+    for column, labels in FILTER_COLUMNS.items():
+        codes = _codes(out[column], labels)
+        counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+        tables[column] = pd.DataFrame({
+            "kategori": labels, "jumlah": counts, "persen": np.round(100 * counts / n, 1),
+        })
+    return tables
+
+def prevalence_table(out: pd.DataFrame) -> pd.DataFrame:
+    # Prevalensi stunting (Prediksi) per kelompok usia x jenis kelamin
+    band = np.searchsorted(AGE_BANDS, out["usia_bulan"].to_numpy(), side="right") - 1
+    sex = _codes(out["jenis_kelamin"], SEX_LABELS)
+    stunted = (out["Prediksi"] == PREDIKSI_LABELS[1]).to_numpy()
+    ok = (band >= 0) & (band < len(AGE_BAND_LABELS)) & (sex >= 0)
+    cell = band[ok] * len(SEX_LABELS) + sex[ok]
+    size = len(AGE_BAND_LABELS) * len(SEX_LABELS)
+    total = np.bincount(cell, minlength=size)
+    cases = np.bincount(cell, weights=stunted[ok], minlength=size).astype(np.int64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prev = np.round(100 * cases / total, 1)
+    return pd.DataFrame({
+        "kelompok_usia": np.repeat(AGE_BAND_LABELS, len(SEX_LABELS)),
+        "jenis_kelamin": np.tile(SEX_LABELS, len(AGE_BAND_LABELS)),
+        "jumlah_anak": total,
+        "stunting": cases,
+        "prevalensi_%": np.where(total > 0, prev, np.nan),
+    })
+
+def summarize(out: pd.DataFrame) -> dict:
+    counts = category_counts(out)
+    n_stunting = int(counts["Prediksi"]["jumlah"].iloc[1])
+    return {
+        "baris": len(out),
+        "stunting": n_stunting,
+        "prevalensi_%": round(100 * n_stunting / len(out), 1) if len(out) else None,
+        "kategori": counts,
+        "usia_jk": prevalence_table(out),
+    }
@@ -0,0 +1,600 @@
+# ============================================================
+# stunting/who.py
+# Data referensi WHO + skoring TB/U, BB/U, z-score dan probabilitas.
+# Tidak bergantung pada Streamlit sehingga bisa dipakai batch job / CLI.
+
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# WHO Reference Data (lengkap dari user)
+# =========================================================
+
+
+# --- TB/U Boys (cm) : (-3SD, -2SD, Median, +2SD)
+who_tbu_boys = {
+    0:  (44.2, 46.1, 49.9, 53.7),
+    1:  (48.9, 50.8, 54.7, 58.6),
+    2:  (52.4, 54.4, 58.4, 62.4),
+    3:  (55.3, 57.3, 61.4, 65.5),
+    4:  (57.6, 59.7, 63.9, 68.0),
+    5:  (59.6, 61.7, 65.9, 70.1),
+    6:  (61.2, 63.3, 67.6, 71.9),
+    7:  (62.7, 64.8, 69.2, 73.5),
+    8:  (64.0, 66.2, 70.6, 75.0),
+    9:  (65.2, 67.5, 72.0, 76.5),
+    10: (66.4, 68.7, 73.3, 77.9),
+    11: (67.6, 69.9, 74.5, 79.2),
+    12: (68.6, 71.0, 75.7, 80.5),
+    13: (69.6, 72.1, 76.9, 81.8),
+    14: (70.6, 73.1, 78.0, 83.0),
+    15: (71.6, 74.1, 79.1, 84.2),
+    16: (72.5, 75.0, 80.2, 85.4),
+    17: (73.3, 75.8, 81.2, 86.5),
+    18: (74.2, 76.9, 82.3, 87.7),
+    19: (75.0, 77.7, 83.2, 88.8),
+    20: (75.8, 78.6, 84.2, 89.8),
+    21: (76.5, 79.4, 85.1, 90.9),
+    22: (77.2, 80.2, 86.0, 91.9),
+    23: (77.8, 80.9, 86.8, 92.9),
+    24: (78.7, 81.7, 87.8, 93.9),
+    25: (78.6, 81.7, 88.0, 94.2),
+    26: (79.3, 82.5, 88.8, 95.2),
+    27: (79.9, 83.1, 89.6, 96.1),
+    28: (80.5, 83.8, 90.4, 97.0),
+    29: (81.1, 84.5, 91.2, 97.9),
+    30: (81.7, 85.1, 91.9, 98.7),
+    31: (82.3, 85.7, 92.7, 99.6),
+    32: (82.8, 86.4, 93.4, 100.4),
+    33: (83.4, 86.9, 94.1, 101.2),
+    34: (83.9, 87.5, 94.8, 102.0),
+    35: (84.4, 88.1, 95.4, 102.7),
+    36: (85.0, 88.7, 96.1, 103.5),
+    37: (85.5, 89.2, 96.7, 104.2),
+    38: (86.0, 89.8, 97.4, 105.0),
+    39: (86.5, 90.3, 98.0, 105.7),
+    40: (87.0, 90.9, 98.6, 106.4),
+    41: (87.5, 91.4, 99.2, 107.1),
+    42: (88.0, 91.9, 99.9, 107.8),
+    43: (88.4, 92.4, 100.4, 108.5),
+    44: (88.9, 93.0, 101.0, 109.1),
+    45: (89.3, 93.5, 101.6, 109.8),
+    46: (89.8, 94.1, 102.1, 110.5),
+    47: (90.3, 94.4, 102.8, 111.2),
+    48: (90.7, 94.9, 103.3, 111.8),
+    49: (91.2, 95.4, 103.9, 112.4),
+    50: (91.6, 95.9, 104.4, 113.0),
+    51: (92.1, 96.4, 105.0, 113.6),
+    52: (92.5, 96.9, 105.6, 114.2),
+    53: (93.0, 97.4, 106.1, 114.9),
+    54: (93.4, 97.8, 106.7, 115.5),
+    55: (93.9, 98.3, 107.2, 116.1),
+    56: (94.3, 98.8, 107.8, 116.7),
+    57: (94.7, 99.3, 108.3, 117.4),
+    58: (95.2, 99.7, 108.9, 118.0),
+    59: (95.6, 100.2, 109.4, 118.6),
+    60: (96.1, 100.7, 110.0, 119.2),
+}
+
+# --- BB/U Boys (kg) : (-3SD, -2SD, -1SD, Median, +1SD, +2SD, +3SD)
+who_bbu_boys = {
+    0:(2.1,2.5,2.9,3.3,3.9,4.4,5.0), 1:(2.9,3.4,3.9,4.5,5.1,5.8,6.6),
+    2:(3.8,4.3,4.9,5.6,6.3,7.1,8.0), 3:(4.4,5.0,5.7,6.4,7.2,8.0,9.0),
+    4:(4.9,5.6,6.2,7.0,7.8,8.7,9.7), 5:(5.3,6.0,6.7,7.5,8.4,9.3,10.4),
+    6:(5.7,6.4,7.1,7.9,8.8,9.8,10.9), 7:(5.9,6.7,7.4,8.3,9.2,10.3,11.4),
+    8:(6.2,6.9,7.7,8.6,9.6,10.7,11.9), 9:(6.4,7.1,8.0,8.9,9.9,11.0,12.3),
+    10:(6.6,7.4,8.2,9.2,10.2,11.4,12.7), 11:(6.8,7.6,8.4,9.4,10.5,11.7,13.0),
+    12:(6.9,7.7,8.6,9.6,10.8,12.0,13.3), 13:(7.1,7.9,8.8,9.9,11.0,12.3,13.7),
+    14:(7.2,8.1,9.0,10.1,11.3,12.6,14.0), 15:(7.4,8.3,9.2,10.3,11.5,12.8,14.3),
+    16:(7.5,8.4,9.4,10.5,11.7,13.1,14.6), 17:(7.7,8.6,9.6,10.7,12.0,13.4,14.9),
+    18:(7.8,8.8,9.8,10.9,12.2,13.7,15.3), 19:(8.0,8.9,10.0,11.1,12.5,13.9,15.6),
+    20:(8.1,9.1,10.1,11.3,12.7,14.2,15.9), 21:(8.2,9.2,10.3,11.5,12.9,14.5,16.2),
+    22:(8.4,9.4,10.5,11.8,13.2,14.7,16.5), 23:(8.5,9.5,10.7,12.0,13.4,15.0,16.8),
+    24:(8.6,9.7,10.8,12.2,13.6,15.3,17.1), 25:(8.8,9.8,11.0,12.4,13.9,15.5,17.4),
+    26:(8.9,10.0,11.1,12.5,14.1,15.8,17.8), 27:(9.1,10.1,11.3,12.7,14.4,16.1,18.1),
+    28:(9.2,10.4,11.5,12.9,14.5,16.3,18.4), 29:(9.2,10.4,11.7,13.1,14.8,16.6,18.7),
+    30:(9.4,10.5,11.8,13.3,15.0,16.9,19.0), 31:(9.5,10.7,12.0,13.5,15.2,17.1,19.3),
+    32:(9.6,10.8,12.1,13.7,15.4,17.4,19.6), 33:(9.8,11.0,12.3,13.8,15.6,17.6,19.9),
+    34:(9.8,11.1,12.4,14.0,15.8,17.8,20.2), 35:(9.9,11.2,12.6,14.2,16.0,18.1,20.4),
+    36:(10.0,11.3,12.7,14.3,16.2,18.3,20.7), 37:(10.1,11.4,12.9,14.5,16.4,18.6,21.0),
+    38:(10.2,11.5,13.0,14.7,16.6,18.8,21.3), 39:(10.3,11.6,13.3,14.8,16.8,19.0,21.6),
+    40:(10.4,11.8,13.3,15.0,17.0,19.3,21.9), 41:(10.5,11.9,13.4,15.2,17.2,19.5,22.1),
+    42:(10.6,12.0,13.6,15.3,17.4,19.7,22.4), 43:(10.7,12.2,13.7,15.5,17.6,20.0,22.7),
+    44:(10.8,12.2,13.8,15.7,17.8,20.2,23.0), 45:(10.9,12.4,14.0,15.8,18.0,20.5,23.3),
+    46:(11.0,12.5,14.1,16.0,18.2,20.7,23.6), 47:(11.1,12.6,14.3,16.2,18.4,20.9,23.9),
+    48:(11.2,12.7,14.4,16.3,18.6,21.2,24.2), 49:(11.3,12.8,14.5,16.5,18.8,21.4,24.5),
+    50:(11.4,12.9,14.7,16.7,19.0,21.7,24.8), 51:(11.5,13.1,14.8,16.8,19.2,21.9,25.1),
+    52:(11.6,13.2,15.0,17.0,19.4,22.2,25.4), 53:(11.7,13.3,15.1,17.2,19.6,22.4,25.7),
+    54:(11.8,13.5,15.2,17.3,19.8,22.7,26.0), 55:(11.9,13.5,15.4,17.5,20.0,22.9,26.3),
+    56:(12.0,13.6,15.5,17.7,20.2,23.2,26.6), 57:(12.1,13.7,15.6,17.8,20.4,23.4,26.9),
+    58:(12.2,13.8,15.8,18.0,20.6,23.7,27.2), 59:(12.3,14.0,15.9,18.2,20.8,23.9,27.6),
+    60:(12.4,14.1,16.0,18.3,21.0,24.2,27.9),
+}
+
+# --- TB/U Girls (cm) : (-3SD, -2SD, Median, +2SD)
+who_tbu_girls = {
+    0:(43.6,45.4,49.1,52.9), 1:(47.8,49.8,53.7,57.6),
+    2:(51.0,53.0,57.1,61.1), 3:(53.5,55.6,59.8,64.0),
+    4:(55.6,57.9,62.1,66.4), 5:(57.4,59.6,64.0,68.3),
+    6:(58.9,61.2,65.7,70.2), 7:(60.3,62.7,67.3,71.9),
+    8:(61.7,64.0,68.7,73.5), 9:(62.9,65.3,70.1,75.0),
+    10:(64.1,66.5,71.5,76.4), 11:(65.2,67.7,72.8,77.8),
+    12:(66.3,68.9,74.0,79.2), 13:(67.3,69.9,75.2,80.5),
+    14:(68.3,71.0,76.4,81.7), 15:(69.3,72.0,77.5,83.0),
+    16:(70.2,73.0,78.6,84.2), 17:(71.1,74.0,79.7,85.4),
+    18:(72.0,74.9,80.7,86.5), 19:(72.8,75.8,81.7,87.6),
+    20:(73.7,76.7,82.7,88.7), 21:(74.5,77.5,83.7,89.7),
+    22:(75.2,78.4,84.6,90.8), 23:(76.0,79.2,85.5,91.9),
+    24:(76.7,80.0,86.4,92.9), 25:(76.8,80.0,86.6,93.1),
+    26:(77.5,80.8,87.4,94.1), 27:(78.1,81.5,88.3,95.0),
+    28:(78.8,82.2,89.1,96.0), 29:(79.5,82.9,89.9,96.9),
+    30:(80.1,83.6,90.7,97.7), 31:(80.7,84.3,91.4,98.6),
+    32:(81.3,84.9,92.2,99.4), 33:(81.9,85.6,92.9,100.3),
+    34:(82.5,86.2,93.6,101.1), 35:(83.1,86.8,94.4,101.9),
+    36:(83.6,87.4,95.1,102.7), 37:(84.2,88.0,95.7,103.4),
+    38:(84.7,88.6,96.4,104.2), 39:(85.3,89.2,97.1,105.0),
+    40:(85.8,89.8,97.7,105.7), 41:(86.3,90.4,98.4,106.4),
+    42:(86.8,90.9,99.0,107.1), 43:(87.4,91.5,99.7,107.9),
+    44:(87.9,92.0,100.3,108.6), 45:(88.4,92.5,100.9,109.3),
+    46:(88.9,93.1,101.5,110.0), 47:(89.3,93.6,102.1,110.7),
+    48:(89.8,94.1,102.7,111.3), 49:(90.3,94.6,103.3,112.0),
+    50:(90.7,95.1,103.9,112.7), 51:(91.2,95.6,104.5,113.3),
+    52:(91.7,96.1,105.0,114.0), 53:(92.1,96.6,105.6,114.6),
+    54:(92.6,97.1,106.2,115.2), 55:(93.0,97.6,106.7,115.9),
+    56:(93.4,98.1,107.3,116.5), 57:(93.9,98.5,107.8,117.1),
+    58:(94.3,99.0,108.4,117.7), 59:(94.7,99.5,108.9,118.3),
+    60:(95.2,99.9,109.4,118.9),
+}
+
+# --- BB/U Girls (kg) : (-3SD, -2SD, -1SD, Median, +1SD, +2SD, +3SD)
+who_bbu_girls = {
+    0:(2.0,2.4,2.8,3.2,3.7,4.2,4.8), 1:(2.7,3.1,3.6,4.2,4.8,5.5,6.2),
+    2:(3.2,3.9,4.5,5.1,5.8,6.7,7.5), 3:(4.0,4.5,5.2,5.8,6.6,7.5,8.5),
+    4:(4.4,5.0,5.7,6.4,7.3,8.2,9.3), 5:(4.8,5.4,6.1,6.9,7.8,8.8,10.0),
+    6:(5.1,5.7,6.5,7.3,8.2,9.3,10.6), 7:(5.3,6.0,6.8,7.6,8.6,9.8,11.1),
+    8:(5.6,6.3,7.0,7.9,9.0,10.2,11.6), 9:(5.8,6.5,7.3,8.2,9.3,10.5,12.0),
+    10:(5.9,6.7,7.5,8.5,9.6,10.9,12.4), 11:(6.1,6.9,7.7,8.7,9.9,11.2,12.8),
+    12:(6.3,7.0,7.9,8.9,10.1,11.5,13.1), 13:(6.4,7.2,8.1,9.2,10.4,11.8,13.5),
+    14:(6.6,7.4,8.3,9.4,10.6,12.1,13.8), 15:(6.7,7.6,8.5,9.6,10.9,12.4,14.1),
+    16:(6.9,7.7,8.7,9.8,11.1,12.6,14.5), 17:(7.0,7.9,8.9,10.0,11.4,12.9,14.8),
+    18:(7.2,8.1,9.1,10.2,11.6,13.2,15.1), 19:(7.3,8.2,9.2,10.4,11.8,13.5,15.4),
+    20:(7.5,8.4,9.4,10.6,12.1,13.7,15.7), 21:(7.6,8.6,9.6,10.9,12.3,14.0,16.0),
+    22:(7.8,8.7,9.8,11.1,12.5,14.3,16.4), 23:(7.9,8.9,10.0,11.3,12.8,14.5,16.7),
+    24:(8.1,9.0,10.2,11.5,13.0,14.8,17.0), 25:(8.2,9.2,10.3,11.7,13.3,15.0,17.3),
+    26:(8.4,9.4,10.5,11.9,13.5,15.3,17.7), 27:(8.5,9.5,10.7,12.1,13.7,15.5,18.0),
+    28:(8.6,9.7,10.9,12.3,14.0,15.7,18.3), 29:(8.8,9.8,11.1,12.5,14.2,16.0,18.7),
+    30:(8.9,10.0,11.2,12.7,14.4,16.5,19.0), 31:(9.0,10.1,11.4,12.9,14.7,16.8,19.3),
+    32:(9.3,10.3,11.6,13.1,14.9,17.0,19.6), 33:(9.3,10.4,11.7,13.3,15.1,17.3,19.9),
+    34:(9.4,10.5,11.9,13.5,15.4,17.6,20.3), 35:(9.6,10.7,12.0,13.7,15.6,17.9,20.6),
+    36:(9.6,10.8,12.2,13.9,15.8,18.1,20.9), 37:(9.7,10.9,12.4,14.0,16.0,18.4,21.3),
+    38:(9.8,11.1,12.5,14.2,16.3,18.7,21.6), 39:(9.9,11.2,12.7,14.4,16.5,19.0,22.0),
+    40:(10.1,11.3,12.8,14.6,16.7,19.2,22.3), 41:(10.2,11.5,13.0,14.8,16.9,19.5,22.7),
+    42:(10.3,11.6,13.1,15.0,17.2,19.8,23.0), 43:(10.4,11.7,13.3,15.2,17.4,20.1,23.4),
+    44:(10.5,11.8,13.4,15.3,17.6,20.4,23.7), 45:(10.6,12.0,13.6,15.5,17.8,20.7,24.1),
+    46:(10.7,12.1,13.7,15.7,18.1,20.9,24.5), 47:(10.8,12.2,13.9,15.9,18.3,21.2,24.8),
+    48:(10.9,12.3,14.0,16.1,18.5,21.5,25.2), 49:(11.0,12.4,14.2,16.3,18.8,21.8,25.5),
+    50:(11.1,12.6,14.3,16.4,19.0,22.1,25.9), 51:(11.2,12.7,14.5,16.6,19.2,22.4,26.3),
+    52:(11.3,12.8,14.6,16.8,19.4,22.6,26.6), 53:(11.4,12.9,14.8,17.0,19.7,22.9,27.0),
+    54:(11.5,13.0,14.9,17.2,19.9,23.2,27.4), 55:(11.6,13.3,15.1,17.3,20.1,23.5,27.7),
+    56:(11.7,13.3,15.2,17.5,20.3,23.8,28.1), 57:(11.8,13.4,15.3,17.7,20.5,24.1,28.5),
+    58:(11.9,13.5,15.5,17.9,20.8,24.4,28.9), 59:(12.0,13.6,15.6,18.0,21.0,24.6,29.2),
+    60:(12.1,13.7,15.8,18.2,21.2,24.9,29.5),
+}
+
+
+# --- LMS TB/U Boys, panjang badan (0-24 bln) : (L, M, S)
+lms_tbu_boys_panjang = {
+    0:(1,49.8842,0.03795), 1:(1,54.7244,0.03557), 2:(1,58.4249,0.03424),
+    3:(1,61.4292,0.03328), 4:(1,63.886,0.03257), 5:(1,65.9026,0.03204),
+    6:(1,67.6236,0.03165), 7:(1,69.1645,0.03139), 8:(1,70.5994,0.03124),
+    9:(1,71.9687,0.03117), 10:(1,73.2812,0.03118), 11:(1,74.5388,0.03125),
+    12:(1,75.7488,0.03137), 13:(1,76.9186,0.03154), 14:(1,78.0497,0.03174),
+    15:(1,79.1458,0.03197), 16:(1,80.2113,0.03222), 17:(1,81.2487,0.0325),
+    18:(1,82.2587,0.03279), 19:(1,83.2418,0.0331), 20:(1,84.1996,0.03342),
+    21:(1,85.1348,0.03376), 22:(1,86.0477,0.0341), 23:(1,86.941,0.03445),
+    24:(1,87.8161,0.03479),
+}
+
+# --- LMS TB/U Boys, tinggi badan (24-60 bln) : (L, M, S)
+lms_tbu_boys_tinggi = {
+    24:(1,87.1161,0.03507), 25:(1,87.972,0.03542), 26:(1,88.8065,0.03576),
+    27:(1,89.6197,0.0361), 28:(1,90.412,0.03642), 29:(1,91.1828,0.03674),
+    30:(1,91.9327,0.03704), 31:(1,92.6631,0.03733), 32:(1,93.3753,0.03761),
+    33:(1,94.0711,0.03787), 34:(1,94.7532,0.03812), 35:(1,95.4236,0.03836),
+    36:(1,96.0835,0.03858), 37:(1,96.7337,0.03879), 38:(1,97.3749,0.039),
+    39:(1,98.0073,0.03919), 40:(1,98.631,0.03937), 41:(1,99.2459,0.03954),
+    42:(1,99.8515,0.03971), 43:(1,100.4485,0.03986), 44:(1,101.0374,0.04002),
+    45:(1,101.6186,0.04016), 46:(1,102.1933,0.04031), 47:(1,102.7625,0.04045),
+    48:(1,103.3273,0.04059), 49:(1,103.8886,0.04073), 50:(1,104.4473,0.04086),
+    51:(1,105.0041,0.041), 52:(1,105.5596,0.04113), 53:(1,106.1138,0.04126),
+    54:(1,106.6668,0.04139), 55:(1,107.2188,0.04152), 56:(1,107.7697,0.04165),
+    57:(1,108.3198,0.04177), 58:(1,108.8689,0.0419), 59:(1,109.417,0.04202),
+    60:(1,109.9638,0.04214),
+}
+
+# --- LMS BB/U Boys (kg) : (L, M, S)
+lms_bbu_boys = {
+    0:(0.3487,3.3464,0.14602), 1:(0.2297,4.4709,0.13395), 2:(0.197,5.5675,0.12385),
+    3:(0.1738,6.3762,0.11727), 4:(0.1553,7.0023,0.11316), 5:(0.1395,7.5105,0.1108),
+    6:(0.1257,7.934,0.10958), 7:(0.1134,8.297,0.10902), 8:(0.1021,8.6151,0.10882),
+    9:(0.0917,8.9014,0.10881), 10:(0.082,9.1649,0.10891), 11:(0.073,9.4122,0.10906),
+    12:(0.0644,9.6479,0.10925), 13:(0.0563,9.8749,0.10949), 14:(0.0487,10.0953,0.10976),
+    15:(0.0413,10.3108,0.11007), 16:(0.0343,10.5228,0.11041), 17:(0.0275,10.7319,0.11079),
+    18:(0.0211,10.9385,0.11119), 19:(0.0148,11.143,0.11164), 20:(0.0087,11.3462,0.11211),
+    21:(0.0029,11.5486,0.11261), 22:(-0.0028,11.7504,0.11314), 23:(-0.0083,11.9514,0.11369),
+    24:(-0.0137,12.1515,0.11426), 25:(-0.0189,12.3502,0.11485), 26:(-0.024,12.5466,0.11544),
+    27:(-0.0289,12.7401,0.11604), 28:(-0.0337,12.9303,0.11664), 29:(-0.0385,13.1169,0.11723),
+    30:(-0.0431,13.3,0.11781), 31:(-0.0476,13.4798,0.11839), 32:(-0.052,13.6567,0.11896),
+    33:(-0.0564,13.8309,0.11953), 34:(-0.0606,14.0031,0.12008), 35:(-0.0648,14.1736,0.12062),
+    36:(-0.0689,14.3429,0.12116), 37:(-0.0729,14.5113,0.12168), 38:(-0.0769,14.6791,0.1222),
+    39:(-0.0808,14.8466,0.12271), 40:(-0.0846,15.014,0.12322), 41:(-0.0883,15.1813,0.12373),
+    42:(-0.092,15.3486,0.12425), 43:(-0.0957,15.5158,0.12478), 44:(-0.0993,15.6828,0.12531),
+    45:(-0.1028,15.8497,0.12586), 46:(-0.1063,16.0163,0.12643), 47:(-0.1097,16.1827,0.127),
+    48:(-0.1131,16.3489,0.12759), 49:(-0.1165,16.515,0.12819), 50:(-0.1198,16.6811,0.1288),
+    51:(-0.123,16.8471,0.12943), 52:(-0.1262,17.0132,0.13005), 53:(-0.1294,17.1792,0.13069),
+    54:(-0.1325,17.3452,0.13133), 55:(-0.1356,17.5111,0.13197), 56:(-0.1387,17.6768,0.13261),
+    57:(-0.1417,17.8422,0.13325), 58:(-0.1447,18.0073,0.13389), 59:(-0.1477,18.1722,0.13453),
+    60:(-0.1506,18.3366,0.13517),
+}
+
+# --- LMS TB/U Girls, panjang badan (0-24 bln) : (L, M, S)
+lms_tbu_girls_panjang = {
+    0:(1,49.1477,0.0379), 1:(1,53.6872,0.0364), 2:(1,57.0673,0.03568),
+    3:(1,59.8029,0.0352), 4:(1,62.0899,0.03486), 5:(1,64.0301,0.03463),
+    6:(1,65.7311,0.03448), 7:(1,67.2873,0.03441), 8:(1,68.7498,0.0344),
+    9:(1,70.1435,0.03444), 10:(1,71.4818,0.03452), 11:(1,72.771,0.03464),
+    12:(1,74.015,0.03479), 13:(1,75.2176,0.03496), 14:(1,76.3817,0.03514),
+    15:(1,77.5099,0.03534), 16:(1,78.6055,0.03555), 17:(1,79.671,0.03576),
+    18:(1,80.7079,0.03598), 19:(1,81.7182,0.0362), 20:(1,82.7036,0.03643),
+    21:(1,83.6654,0.03666), 22:(1,84.604,0.03688), 23:(1,85.5202,0.03711),
+    24:(1,86.4153,0.03734),
+}
+
+# --- LMS TB/U Girls, tinggi badan (24-60 bln) : (L, M, S)
+lms_tbu_girls_tinggi = {
+    24:(1,85.7153,0.03764), 25:(1,86.5904,0.03786), 26:(1,87.4462,0.03808),
+    27:(1,88.283,0.0383), 28:(1,89.1004,0.03851), 29:(1,89.8991,0.03872),
+    30:(1,90.6797,0.03893), 31:(1,91.443,0.03913), 32:(1,92.1906,0.03933),
+    33:(1,92.9239,0.03952), 34:(1,93.6444,0.03971), 35:(1,94.3533,0.03989),
+    36:(1,95.0515,0.04006), 37:(1,95.7399,0.04024), 38:(1,96.4187,0.04041),
+    39:(1,97.0885,0.04057), 40:(1,97.7493,0.04073), 41:(1,98.4015,0.04089),
+    42:(1,99.0448,0.04105), 43:(1,99.6795,0.0412), 44:(1,100.3058,0.04135),
+    45:(1,100.9238,0.0415), 46:(1,101.5337,0.04164), 47:(1,102.136,0.04179),
+    48:(1,102.7312,0.04193), 49:(1,103.3197,0.04206), 50:(1,103.9021,0.0422),
+    51:(1,104.4786,0.04233), 52:(1,105.0494,0.04246), 53:(1,105.6148,0.04259),
+    54:(1,106.1748,0.04272), 55:(1,106.7295,0.04285), 56:(1,107.2788,0.04298),
+    57:(1,107.8227,0.0431), 58:(1,108.3613,0.04322), 59:(1,108.8948,0.04334),
+    60:(1,109.4233,0.04347),
+}
+
+# --- LMS BB/U Girls (kg) : (L, M, S)
+lms_bbu_girls = {
+    0:(0.3809,3.2322,0.14171), 1:(0.1714,4.1873,0.13724), 2:(0.0962,5.1282,0.13),
+    3:(0.0402,5.8458,0.12619), 4:(-0.005,6.4237,0.12402), 5:(-0.043,6.8985,0.12274),
+    6:(-0.0756,7.297,0.12204), 7:(-0.1039,7.6422,0.12178), 8:(-0.1288,7.9487,0.12181),
+    9:(-0.1507,8.2254,0.12199), 10:(-0.17,8.48,0.12223), 11:(-0.1872,8.7192,0.12247),
+    12:(-0.2024,8.9481,0.12268), 13:(-0.2158,9.1699,0.12283), 14:(-0.2278,9.387,0.12294),
+    15:(-0.2384,9.6008,0.12299), 16:(-0.2478,9.8124,0.12303), 17:(-0.2562,10.0226,0.12306),
+    18:(-0.2637,10.2315,0.12309), 19:(-0.2703,10.4393,0.12315), 20:(-0.2762,10.6464,0.12323),
+    21:(-0.2815,10.8534,0.12335), 22:(-0.2862,11.0608,0.1235), 23:(-0.2903,11.2688,0.12369),
+    24:(-0.2941,11.4775,0.1239), 25:(-0.2975,11.6864,0.12414), 26:(-0.3005,11.8947,0.12441),
+    27:(-0.3032,12.1015,0.12472), 28:(-0.3057,12.3059,0.12506), 29:(-0.308,12.5073,0.12545),
+    30:(-0.3101,12.7055,0.12587), 31:(-0.312,12.9006,0.12633), 32:(-0.3138,13.093,0.12683),
+    33:(-0.3155,13.2837,0.12737), 34:(-0.3171,13.4731,0.12794), 35:(-0.3186,13.6618,0.12855),
+    36:(-0.3201,13.8503,0.12919), 37:(-0.3216,14.0385,0.12988), 38:(-0.323,14.2265,0.13059),
+    39:(-0.3243,14.414,0.13135), 40:(-0.3257,14.601,0.13213), 41:(-0.327,14.7873,0.13293),
+    42:(-0.3283,14.9727,0.13376), 43:(-0.3296,15.1573,0.1346), 44:(-0.3309,15.341,0.13545),
+    45:(-0.3322,15.524,0.1363), 46:(-0.3335,15.7064,0.13716), 47:(-0.3348,15.8882,0.138),
+    48:(-0.3361,16.0697,0.13884), 49:(-0.3374,16.2511,0.13968), 50:(-0.3387,16.4322,0.14051),
+    51:(-0.34,16.6133,0.14132), 52:(-0.3414,16.7942,0.14213), 53:(-0.3427,16.9748,0.14293),
+    54:(-0.344,17.1551,0.14371), 55:(-0.3453,17.3347,0.14448), 56:(-0.3466,17.5136,0.14525),
+    57:(-0.3479,17.6916,0.146), 58:(-0.3492,17.8686,0.14675), 59:(-0.3505,18.0445,0.14748),
+    60:(-0.3518,18.2193,0.14821),
+}
+
+# ----------------- Tabel WHO dalam bentuk array -----------------
+# Dibangun sekali saat import: indeks [jenis_kelamin, usia_bulan, kolom SD],
+# dengan kode jenis kelamin 0 = Laki-laki, 1 = Perempuan (sama seperti notebook).
+WHO_MAX_AGE = 60
+WHO_TBU = np.ascontiguousarray([
+    [who_tbu_boys[a] for a in range(WHO_MAX_AGE + 1)],
+    [who_tbu_girls[a] for a in range(WHO_MAX_AGE + 1)],
+], dtype=np.float64)   # (2, 61, 4) : -3SD, -2SD, Median, +2SD
+WHO_BBU = np.ascontiguousarray([
+    [who_bbu_boys[a] for a in range(WHO_MAX_AGE + 1)],
+    [who_bbu_girls[a] for a in range(WHO_MAX_AGE + 1)],
+], dtype=np.float64)   # (2, 61, 7) : -3SD, -2SD, -1SD, Median, +1SD, +2SD, +3SD
+WHO_TBU.flags.writeable = False
+WHO_BBU.flags.writeable = False
+
+# Posisi kolom -3SD, -2SD, Median, +2SD di dalam WHO_BBU
+BBU_Z_COLS = [0, 1, 3, 5]
+
+# Kode jenis kelamin = indeks pada tuple ini (baris tabel WHO)
+SEX_LABELS = ("Laki-laki", "Perempuan")
+
+def _sex_code(gender) -> int:
+    return 0 if gender == "Laki-laki" else 1
+
+def _sex_codes(gender) -> np.ndarray:
+    dtype = getattr(gender, "dtype", None)
+    if isinstance(dtype, pd.CategoricalDtype):
+        # Kolom kategori (hasil ringkas): cukup petakan kategorinya, bukan tiap baris
+        lookup = np.append(np.where(np.asarray(dtype.categories, dtype=object) == "Laki-laki", 0, 1), 1)
+        return lookup[pd.Categorical(gender).codes].astype(np.int8)
+    return np.where(np.asarray(gender, dtype=object) == "Laki-laki", 0, 1).astype(np.int8)
+
+# ----------------- Util mengambil batas WHO per usia -----------------
+def _round_age(age_month):
+    # Skalar -> int, array -> array indeks usia (0..60)
+    a = np.clip(np.round(age_month), 0, WHO_MAX_AGE)
+    return int(a) if np.ndim(a) == 0 else a.astype(np.intp)
+
+def who_tbu_thresholds(gender: str, age_month: int):
+    m3, m2, med, p2 = WHO_TBU[_sex_code(gender), _round_age(age_month)].tolist()
+    return m3, m2, med, p2
+
+def who_bbu_row(gender: str, age_month: int):
+    return tuple(WHO_BBU[_sex_code(gender), _round_age(age_month)].tolist())
+
+# ----------------- Kategorisasi WHO -----------------
+def categorize_tbu(gender: str, age_m: int, height_cm: float, method: str = "sd"):
+    if _check_method(method) == "lms":
+        m3, m2, med, p2 = lms_tbu_thresholds(gender, age_m)
+    else:
+        m3, m2, med, p2 = who_tbu_thresholds(gender, age_m)
+    if height_cm < m3:
+        cat = "Sangat Pendek (Severe Stunting)"
+    elif height_cm < m2:
+        cat = "Pendek (Stunting)"
+    elif height_cm <= p2:
+        cat = "Normal"
+    else:
+        cat = "Tinggi"
+    return cat, (round(m3,1), round(m2,1), round(med,1), round(p2,1))
+
+def categorize_bbu(gender: str, age_m: int, weight_kg: float, method: str = "sd"):
+    if _check_method(method) == "lms":
+        m3, m2, med, p2 = lms_bbu_thresholds(gender, age_m)
+    else:
+        m3, m2, m1, med, p1, p2, p3 = who_bbu_row(gender, age_m)
+    if weight_kg < m3:
+        cat = "Gizi Buruk"
+    elif weight_kg < m2:
+        cat = "Gizi Kurang"
+    elif weight_kg <= p2:
+        cat = "Gizi Baik"
+    else:
+        cat = "Gizi Lebih"
+    return cat, (round(m3,1), round(m2,1), round(med,1), round(p2,1))
+
+# ----------------- Z-score & Probabilitas WHO-like -----------------
+# Versi skalar (acuan) berbasis dict {SD: nilai}
+def _z_from_points(value: float, bands: dict):
+    sds = sorted(bands.keys())
+    xs = [bands[s] for s in sds]
+    if value <= xs[0]:
+        s1, s2, x1, x2 = sds[0], sds[1], xs[0], xs[1]
+    elif value >= xs[-1]:
+        s1, s2, x1, x2 = sds[-2], sds[-1], xs[-2], xs[-1]
+    else:
+        for i in range(len(xs)-1):
+            if xs[i] <= value <= xs[i+1]:
+                s1, s2, x1, x2 = sds[i], sds[i+1], xs[i], xs[i+1]
+                break
+    if x2 == x1:
+        return float(s1)
+    frac = (value - x1) / (x2 - x1)
+    return s1 + frac * (s2 - s1)
+
+# Titik SD yang dipakai untuk interpolasi z (TB/U dan BB/U)
+Z_SDS = np.array([-3.0, -2.0, 0.0, 2.0])
+
+def _z_from_bands(values, xs, sds: np.ndarray = Z_SDS) -> np.ndarray:
+    # Versi array dari _z_from_points: interpolasi linear sepotong-sepotong antar
+    # titik SD. xs = (..., k) nilai pada titik SD (naik), boleh satu set untuk
+    # semua nilai atau satu baris per nilai. Segmen = jumlah titik interior yang
+    # < nilai, jadi di bawah -3SD / di atas +2SD otomatis memakai segmen ujung
+    # (ekstrapolasi), sama dengan versi skalar.
+    values = np.asarray(values, dtype=float)
+    xs = np.broadcast_to(np.asarray(xs, dtype=float), values.shape + (len(sds),))
+    i = np.sum(xs[..., 1:-1] < values[..., None], axis=-1)[..., None]
+    x1 = np.take_along_axis(xs, i, axis=-1)[..., 0]
+    x2 = np.take_along_axis(xs, i + 1, axis=-1)[..., 0]
+    s1, s2 = sds[i[..., 0]], sds[i[..., 0] + 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = s1 + (values - x1) / (x2 - x1) * (s2 - s1)
+    return np.where(x2 == x1, s1, z)
+
+def _sigmoid_prob(z, k: float = 2.0, threshold: float = -2.0):
+    with np.errstate(over="ignore"):
+        p = 1.0 / (1.0 + np.exp(k * (np.asarray(z, dtype=float) - threshold)))
+    return float(p) if np.ndim(p) == 0 else p
+
+def _combine_prob(z_tbu, z_bbu):
+    p_tbu = _sigmoid_prob(z_tbu, k=2.0, threshold=-2.0)
+    p_bbu = _sigmoid_prob(z_bbu, k=1.5, threshold=-2.0)
+    return np.clip(0.8 * p_tbu + 0.2 * p_bbu, 0.0, 1.0)
+
+def who_probability(gender: str, age_m: int, height_cm: float, weight_kg: float,
+                    method: str = "sd"):
+    if _check_method(method) == "lms":
+        s = _sex_code(gender)
+        z_tbu = float(lms_z_tbu(s, age_m, height_cm))
+        z_bbu = float(lms_z_bbu(s, age_m, weight_kg))
+    else:
+        s, a = _sex_code(gender), _round_age(age_m)
+        z_tbu = float(_z_from_bands(height_cm, WHO_TBU[s, a]))
+        z_bbu = float(_z_from_bands(weight_kg, WHO_BBU[s, a, BBU_Z_COLS]))
+    p_final = float(_combine_prob(z_tbu, z_bbu))
+    return p_final, z_tbu, z_bbu
+
+# ----------------- Mode LMS WHO (z-score eksak) -----------------
+# "sd"  : interpolasi antar titik SD tabel, usia dibulatkan ke bulan (default)
+# "lms" : rumus Box-Cox WHO dengan koefisien L, M, S yang diinterpolasi per hari
+Z_METHODS = ("sd", "lms")
+LMS_SWITCH_AGE = 24   # < 24 bln: panjang badan (telentang), >= 24 bln: tinggi badan
+
+def _check_method(method: str) -> str:
+    if method not in Z_METHODS:
+        raise ValueError(f"method harus salah satu dari {Z_METHODS}, bukan {method!r}")
+    return method
+
+# Array (2, n_baris, 3) berisi (L, M, S). TB/U: baris 0..24 = panjang badan
+# bulan 0..24, baris 25..61 = tinggi badan bulan 24..60.
+LMS_TBU = np.ascontiguousarray([
+    [lms_tbu_boys_panjang[a] for a in range(LMS_SWITCH_AGE + 1)]
+    + [lms_tbu_boys_tinggi[a] for a in range(LMS_SWITCH_AGE, WHO_MAX_AGE + 1)],
+    [lms_tbu_girls_panjang[a] for a in range(LMS_SWITCH_AGE + 1)]
+    + [lms_tbu_girls_tinggi[a] for a in range(LMS_SWITCH_AGE, WHO_MAX_AGE + 1)],
+], dtype=np.float64)
+LMS_BBU = np.ascontiguousarray([
+    [lms_bbu_boys[a] for a in range(WHO_MAX_AGE + 1)],
+    [lms_bbu_girls[a] for a in range(WHO_MAX_AGE + 1)],
+], dtype=np.float64)
+LMS_TBU.flags.writeable = False
+LMS_BBU.flags.writeable = False
+
+# Koefisien dipak per komponen (L, M, S) dalam array datar [jenis_kelamin * n_baris + baris]
+# supaya interpolasi cukup memakai np.take 1-D.
+def _pack_lms(table: np.ndarray):
+    flat = table.reshape(-1, 3).T.copy()
+    step = np.diff(table, axis=1, append=table[:, -1:]).reshape(-1, 3).T.copy()
+    return flat, step, table.shape[1]
+
+_LMS_PACKED = {"tbu": _pack_lms(LMS_TBU), "bbu": _pack_lms(LMS_BBU)}
+
+def _lms_interp(indicator: str, sex, age_m):
+    # Koefisien L, M, S pada usia pecahan (bulan; hari / 30.4375) dengan
+    # interpolasi linear antar bulan, bukan pembulatan seperti _round_age.
+    flat, step, n_rows = _LMS_PACKED[indicator]
+    pos = np.clip(np.asarray(age_m, dtype=float), 0, WHO_MAX_AGE)
+    if indicator == "tbu":
+        # Baris tinggi badan dimulai satu baris setelah panjang badan bulan 24
+        pos = pos + (pos >= LMS_SWITCH_AGE)
+    lo = np.minimum(np.floor(pos), n_rows - 2)
+    f = pos - lo
+    idx = np.asarray(sex, dtype=np.intp) * n_rows + lo.astype(np.intp)
+    L = np.take(flat[0], idx) + f * np.take(step[0], idx)
+    M = np.take(flat[1], idx) + f * np.take(step[1], idx)
+    S = np.take(flat[2], idx) + f * np.take(step[2], idx)
+    return L, M, S
+
+def _lms_z(y, L, M, S, restrict: bool = False):
+    # z = ((y/M)^L - 1) / (L*S). restrict=True memakai aturan WHO untuk z di luar
+    # +-3 (jarak antar SD di ujung dibuat linear), dipakai untuk indikator berat.
+    y = np.asarray(y, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (np.power(y / M, L) - 1.0) / (L * S)
+        if restrict:
+            # Hanya baris dengan |z| > 3 yang dihitung ulang
+            shape = np.shape(z)
+            y, L, M, S = (np.broadcast_to(v, shape).ravel() for v in (y, L, M, S))
+            z = z.ravel()
+            for sign in (1.0, -1.0):
+                m = np.flatnonzero(sign * z > 3.0)
+                if len(m):
+                    sd3 = _lms_value(L[m], M[m], S[m], 3.0 * sign)
+                    sd2 = _lms_value(L[m], M[m], S[m], 2.0 * sign)
+                    z[m] = 3.0 * sign + (y[m] - sd3) / np.abs(sd3 - sd2)
+            z = z.reshape(shape)
+    return z
+
+def _lms_value(L, M, S, z):
+    # Kebalikan Box-Cox: nilai ukur pada z tertentu
+    return M * np.power(1.0 + L * S * z, 1.0 / L)
+
+def lms_z_tbu(sex, age_m, height_cm):
+    L, M, S = _lms_interp("tbu", sex, age_m)
+    return _lms_z(height_cm, L, M, S)
+
+def lms_z_bbu(sex, age_m, weight_kg):
+    L, M, S = _lms_interp("bbu", sex, age_m)
+    return _lms_z(weight_kg, L, M, S, restrict=True)
+
+def lms_tbu_thresholds(gender: str, age_m: float):
+    L, M, S = _lms_interp("tbu", _sex_code(gender), age_m)
+    return tuple(float(_lms_value(L, M, S, z)) for z in Z_SDS)
+
+def lms_bbu_thresholds(gender: str, age_m: float):
+    L, M, S = _lms_interp("bbu", _sex_code(gender), age_m)
+    return tuple(float(_lms_value(L, M, S, z)) for z in Z_SDS)
+
+# ----------------- Engine batch (per kolom) -----------------
+# Label kategori berurutan; kode kategori = indeks pada tuple ini.
+TBU_LABELS = ("Sangat Pendek (Severe Stunting)", "Pendek (Stunting)", "Normal", "Tinggi")
+BBU_LABELS = ("Gizi Buruk", "Gizi Kurang", "Gizi Baik", "Gizi Lebih")
+PREDIKSI_LABELS = ("Tidak Stunting", "Stunting")
+
+def _categorize(values: np.ndarray, m3: np.ndarray, m2: np.ndarray, p2: np.ndarray) -> np.ndarray:
+    # Urutan cabang sama dengan categorize_tbu / categorize_bbu
+    return np.select([values < m3, values < m2, values <= p2], [0, 1, 2], 3).astype(np.int8)
+
+def score_batch(gender, age_m, height_cm, weight_kg, method: str = "sd") -> pd.DataFrame:
+    # Skoring WHO untuk banyak anak sekaligus. Input berupa kolom (list / array /
+    # Series) yang sudah valid; hasil identik dengan categorize_tbu,
+    # categorize_bbu dan who_probability per baris (dengan method yang sama).
+    height = np.asarray(height_cm, dtype=float)
+    weight = np.asarray(weight_kg, dtype=float)
+    sex = _sex_codes(gender)
+
+    if _check_method(method) == "lms":
+        age = np.asarray(age_m, dtype=float)
+        z_tbu = lms_z_tbu(sex, age, height)
+        z_bbu = lms_z_bbu(sex, age, weight)
+        # Batas kategori = nilai ukur pada -3/-2/+2 SD, jadi cukup bandingkan z
+        tbu_code = _categorize(z_tbu, -3.0, -2.0, 2.0)
+        bbu_code = _categorize(z_bbu, -3.0, -2.0, 2.0)
+    else:
+        age = _round_age(np.asarray(age_m, dtype=float))
+        # Satu fancy-index untuk semua baris: (n, 4) dan (n, 7)
+        tbu = WHO_TBU[sex, age]
+        bbu = WHO_BBU[sex, age]
+        tbu_code = _categorize(height, tbu[:, 0], tbu[:, 1], tbu[:, 3])
+        bbu_code = _categorize(weight, bbu[:, 0], bbu[:, 1], bbu[:, 5])
+        z_tbu = _z_from_bands(height, tbu)
+        z_bbu = _z_from_bands(weight, bbu[:, BBU_Z_COLS])
+    prob = _combine_prob(z_tbu, z_bbu)
+
+    # Kode 0/1 TB/U = "Sangat Pendek" / "Pendek" -> Stunting
+    stunting = (tbu_code <= 1).astype(np.int8)
+    # Kolom label = kategori di atas kode int8 (1 byte/baris); teks label baru
+    # dibuat saat ditampilkan / diekspor
+    return pd.DataFrame({
+        "TB/U": pd.Categorical.from_codes(tbu_code, TBU_LABELS),
+        "BB/U": pd.Categorical.from_codes(bbu_code, BBU_LABELS),
+        "Prob_Risiko": prob,
+        "z_TBU": z_tbu,
+        "z_BBU": z_bbu,
+        "Prediksi": pd.Categorical.from_codes(stunting, PREDIKSI_LABELS),
+    })
+
+
+# -------------------- Saran --------------------
+def saran(tbu: str, bbu: str) -> str:
+    if "Pendek" in tbu:
+        title = "Rekomendasi Terkait Pertumbuhan Anak:"
+        lines = [
+            "- Konsultasikan dengan tenaga kesehatan, seperti dokter atau bidan.",
+            "- Pantau tinggi badan secara berkala.",
+            "- Utamakan protein hewani (ikan, telur, ayam) serta zat besi dan zink.",
+            "- Perhatikan imunisasi dan riwayat infeksi."
+            
+        ]
+    elif bbu in ["Gizi Buruk", "Gizi Kurang"]:
+        title = "Rekomendasi Terkait Status Gizi:"
+        lines = [
+            "- Konsultasi dengan ahli gizi bila kenaikan tidak sesuai.",
+            "- Evaluasi kembali asupan energi dan protein anak.",
+            "- MP-ASI padat gizi 3x/hari dan selingan 1–2x.",
+            "- Pantau berat badan tiap 2–4 minggu."
+            
+        ]
+    else:
+        title = "Rekomendasi untuk Menjaga Pertumbuhan yang Baik:"
+        lines = [
+            "- Pertahankan pola makan seimbang (karbohidrat, protein, sayur, buah).",
+            "- Pastikan istirahat cukup dan aktivitas fisik rutin.",
+            "- Lakukan pemantauan tinggi dan berat badan secara berkala."
+        ]
+    return f"**{title}**\n" + "\n".join(lines)
@@ -0,0 +1,75 @@
+# Evaluator NumPy (.npz) harus memberi probabilitas yang sama dengan XGBoost.
+
+import numpy as np
+import pytest
+
+xgboost = pytest.importorskip("xgboost")
+joblib = pytest.importorskip("joblib")
+
+from stunting.bench import synthetic_cohort
+from stunting.compiled import (
+    CompiledScaler, CompiledTrees, compile_artifacts, export_scaler, export_xgboost, load_compiled,
+)
+from stunting.ml import MODEL_PATH, SCALER_PATH, build_ml_features, ml_score
+from stunting.pipeline import prepare_input
+
+TOLERANCE = 1e-5   # sama dengan default `python -m stunting export --tolerance`
+
+def _features(n: int = 5000, seed: int = 0):
+    inp, _ = prepare_input(synthetic_cohort(n, seed=seed))
+    return inp, build_ml_features(inp)
+
+def _assert_same(original, compiled, X):
+    np.testing.assert_allclose(compiled.predict_proba(X), original.predict_proba(X),
+                               rtol=0, atol=TOLERANCE)
+
+@pytest.fixture(scope="module")
+def clf_final():
+    if not MODEL_PATH.exists():
+        pytest.skip(f"{MODEL_PATH.name} tidak ada")
+    return joblib.load(MODEL_PATH)
+
+def test_clf_final(clf_final):
+    compiled = CompiledTrees(*export_xgboost(clf_final))
+    _, X = _features()
+    _assert_same(clf_final, compiled, X)
+    # Tepat di threshold split (perbandingan float32) dan nilai missing
+    edge = X[:1000].astype(np.float32)
+    for f, uniq in enumerate(compiled.thresholds):
+        if len(uniq):
+            edge[:, f] = np.resize(uniq, len(edge))
+    edge[::7, 6:] = np.nan
+    _assert_same(clf_final, compiled, edge)
+
+def test_ml_score(clf_final):
+    inp, _ = _features(2000, seed=1)
+    compiled = CompiledTrees(*export_xgboost(clf_final))
+    np.testing.assert_allclose(ml_score(inp, compiled), ml_score(inp, clf_final),
+                               rtol=0, atol=TOLERANCE)
+
+def test_roundtrip_npz(tmp_path, clf_final):
+    written = compile_artifacts(MODEL_PATH, SCALER_PATH, tmp_path)
+    assert [p.name for p in written][0] == "clf_final.npz"
+    _, X = _features(1000, seed=2)
+    _assert_same(clf_final, load_compiled(written[0]), X)
+    if SCALER_PATH.exists():
+        scaler = joblib.load(SCALER_PATH)
+        np.testing.assert_allclose(load_compiled(written[1]).transform(X[:, 1:]),
+                                   scaler.transform(X[:, 1:]))
+
+@pytest.mark.parametrize("depth", [1, 3, 4])
+def test_random_model(depth):
+    # Model kecil dengan missing di data latih (arah default kiri & kanan)
+    rng = np.random.default_rng(depth)
+    X = rng.normal(size=(2000, 5)).astype(np.float32)
+    X[rng.random(X.shape) < 0.1] = np.nan
+    y = (np.nan_to_num(X[:, 0]) + np.nan_to_num(X[:, 1]) ** 2 > 0.5).astype(int)
+    model = xgboost.XGBClassifier(n_estimators=40, max_depth=depth, n_jobs=1).fit(X, y)
+    _assert_same(model, CompiledTrees(*export_xgboost(model)), X)
+
+def test_scaler():
+    from sklearn.preprocessing import StandardScaler
+
+    X = np.random.default_rng(0).normal(3.0, 2.0, size=(100, 4))
+    scaler = StandardScaler().fit(X)
+    np.testing.assert_allclose(CompiledScaler(*export_scaler(scaler)).transform(X), scaler.transform(X))
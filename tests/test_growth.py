@@ -0,0 +1,60 @@
+# Usia kunjungan dari satu perkiraan tanggal lahir per anak (bukan usia bulan
+# bulat yang dilaporkan), dan perkiraan itu tetap antar batch.
+
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stunting.growth import DAYS_PER_MONTH, GrowthStore, prepare_visits
+from stunting.who import score_batch
+
+def _visits(rows):
+    cols = ["id_anak", "tanggal_kunjungan", "usia_bulan", "tinggi_badan_cm", "berat_badan_kg"]
+    df = pd.DataFrame(rows, columns=cols).astype(str)
+    return df.assign(jenis_kelamin="Perempuan", berat_lahir_kg="3.1", tinggi_lahir_cm="49")
+
+@pytest.fixture
+def store(tmp_path):
+    s = GrowthStore(tmp_path / "riwayat.sqlite")
+    yield s
+    s.close()
+
+def _update(store, rows):
+    visits, rejected = prepare_visits(_visits(rows))
+    assert rejected.empty
+    out, rejected = store.update(visits)
+    assert rejected.empty
+    return out
+
+def test_age_from_birth_estimate(store):
+    # Usia bulat 12 (5 Jan) dan 13 (20 Feb): lahir antara 21 Des 2022 dan 5 Jan 2023
+    out = _update(store, [("A", "2024-01-05", 12, 74.0, 9.0), ("A", "2024-02-20", 13, 75.5, 9.3)])
+    lahir = pd.Timestamp("2024-01-05") - pd.to_timedelta(out["usia_hari"].iloc[0], unit="D")
+    assert pd.Timestamp("2022-12-21") <= lahir <= pd.Timestamp("2023-01-05")
+    assert out["usia_hari"].diff().iloc[1] == 46
+    age = out["usia_hari"].to_numpy() / DAYS_PER_MONTH
+    assert 12 < age[0] < 13 and 13 < age[1] < 14
+    ref = score_batch(["Perempuan"] * 2, age, [74.0, 75.5], [9.0, 9.3], method="lms")
+    np.testing.assert_allclose(out["z_TBU"], ref["z_TBU"].round(2))
+
+def test_birth_estimate_kept(store):
+    first = _update(store, [("B", "2024-01-05", 24, 84.0, 11.5)])
+    lahir = pd.Timestamp("2024-01-05") - pd.to_timedelta(first["usia_hari"].iloc[0], unit="D")
+    # Usia yang dilaporkan kunjungan berikut tidak mengubah perkiraan lahir
+    second = _update(store, [("B", "2024-03-04", 27, 86.0, 12.0)])
+    assert second["usia_hari"].iloc[0] == (pd.Timestamp("2024-03-04") - lahir).days
+    assert store.children()["perkiraan_lahir"].iloc[0] == lahir
+    assert second["interval_bulan"].iloc[0] == round(59 / DAYS_PER_MONTH, 2)
+
+def test_fractional_age_exact(store):
+    out = _update(store, [("C", "2024-01-05", 6.5, 66.0, 7.5)])
+    assert out["usia_hari"].iloc[0] == round(6.5 * DAYS_PER_MONTH)
+
+def test_birth_day_required(store):
+    # Setiap anak tersimpan selalu punya perkiraan tanggal lahir
+    _update(store, [("D", "2024-01-05", 3, 60.0, 6.0)])
+    with pytest.raises(sqlite3.IntegrityError):
+        with store._db:
+            store._db.execute("UPDATE anak SET lahir = NULL WHERE id_anak = 'D'")
@@ -0,0 +1,134 @@
+# Hasil ringkas score_frame (kategori / uint8 / float32) harus menampilkan dan
+# mengekspor nilai yang sama dengan hasil lebar (teks label, float64).
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stunting.bench import synthetic_cohort
+from stunting.ml import ModelRegistry, artifact_paths, ml_score
+from stunting.pipeline import (
+    INPUT_COLUMNS, RESULT_DECIMALS, _ArrowSink, display_frame, encode_result, iter_csv_chunks,
+    prepare_input, read_table, score_frame,
+)
+from stunting.who import score_batch
+
+@pytest.fixture(scope="module")
+def model():
+    paths = artifact_paths()
+    if not paths[0].exists():
+        pytest.skip("artefak model tidak ada")
+    return ModelRegistry().load(*paths)
+
+def _wide(inp: pd.DataFrame, method: str, model, scaler) -> pd.DataFrame:
+    # Tata letak lama: label teks (object) dan skor float64 yang dibulatkan
+    res = score_batch(inp["jenis_kelamin"], inp["usia_bulan"], inp["tinggi_badan_cm"],
+                      inp["berat_badan_kg"], method=method)
+    res = res.assign(**{c: res[c].astype(object) for c in ("TB/U", "BB/U", "Prediksi")})
+    out = pd.concat([inp, res], axis=1)
+    out["ML_Prob"] = ml_score(inp, model, scaler)
+    for col, decimals in RESULT_DECIMALS.items():
+        out[col] = out[col].round(decimals)
+    return out
+
+@pytest.fixture(scope="module", params=["sd", "lms"])
+def scored(request, model):
+    inp, _ = prepare_input(synthetic_cohort(20_000, seed=3))
+    return score_frame(inp, request.param, *model), _wide(inp, request.param, *model)
+
+def test_compact_dtypes(scored):
+    out, _ = scored
+    for col in ("jenis_kelamin", "TB/U", "BB/U", "Prediksi"):
+        assert isinstance(out[col].dtype, pd.CategoricalDtype)
+    for col in RESULT_DECIMALS:
+        assert out[col].dtype == np.float32
+    assert out.memory_usage(deep=True).sum() < scored[1].memory_usage(deep=True).sum() / 2
+
+def test_display_values(scored):
+    out, wide = scored
+    shown = display_frame(out)
+    assert list(shown.columns) == INPUT_COLUMNS + list(wide.columns[len(INPUT_COLUMNS):])
+    for col in RESULT_DECIMALS:
+        assert shown[col].dtype == np.float64
+        np.testing.assert_array_equal(shown[col].to_numpy(), wide[col].to_numpy())
+    for col in ("jenis_kelamin", "TB/U", "BB/U", "Prediksi"):
+        assert shown[col].astype(str).tolist() == wide[col].astype(str).tolist()
+    np.testing.assert_array_equal(shown["usia_bulan"].to_numpy(dtype=float),
+                                  wide["usia_bulan"].to_numpy(dtype=float))
+
+def test_csv_identical(scored):
+    out, wide = scored
+    assert encode_result(out, "csv") == wide.to_csv(index=False).encode("utf-8")
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_arrow_formats(scored, fmt):
+    out, wide = scored
+    data = encode_result(out, fmt)
+    back = pd.read_parquet(io.BytesIO(data)) if fmt == "parquet" else pd.read_feather(io.BytesIO(data))
+    shown = display_frame(back)
+    for col in RESULT_DECIMALS:
+        np.testing.assert_array_equal(shown[col].to_numpy(), wide[col].to_numpy())
+    for col in ("TB/U", "BB/U", "Prediksi"):
+        assert back[col].astype(str).tolist() == wide[col].tolist()
+
+def test_fractional_age(model):
+    # sd: usia dipotong ke bulan penuh; lms: usia pecahan dipakai untuk z-score,
+    # sedangkan fitur ML tetap usia bulan penuh
+    df = pd.DataFrame({
+        "jenis_kelamin": ["Laki-laki", "Perempuan", "L"], "usia_bulan": ["12,9", "0.4", "59.5"],
+        "berat_lahir_kg": ["3.1", "", "2.9"], "tinggi_lahir_cm": ["49", "", "48"],
+        "berat_badan_kg": ["9.1", "3.4", "17"], "tinggi_badan_cm": ["74.5", "50", "108"],
+    })
+    sd, _ = prepare_input(df, "sd")
+    lms, _ = prepare_input(df, "lms")
+    assert sd["usia_bulan"].tolist() == [12, 0, 59]
+    assert lms["usia_bulan"].tolist() == [12.9, 0.4, 59.5]
+    out_sd, out_lms = score_frame(sd, "sd", *model), score_frame(lms, "lms", *model)
+    ref = score_batch(lms["jenis_kelamin"], lms["usia_bulan"], lms["tinggi_badan_cm"],
+                      lms["berat_badan_kg"], method="lms")
+    np.testing.assert_array_equal(out_lms["z_TBU"], ref["z_TBU"].round(2).astype(np.float32))
+    assert out_lms["usia_bulan"].tolist() == [12.9, 0.4, 59.5]
+    np.testing.assert_array_equal(out_lms["ML_Prob"], out_sd["ML_Prob"])
+    assert out_sd["usia_bulan"].dtype == np.uint8
+
+def test_read_table_csv_projection(tmp_path):
+    # Baca penuh (halaman kelompok) memakai reader yang sama dengan streaming
+    df = synthetic_cohort(3000, seed=4).assign(Wilayah="Desa A", catatan="x")
+    src = tmp_path / "data.csv"
+    df.rename(columns=str.upper).to_csv(src, index=False)
+    full = read_table(src, "csv")
+    assert list(full.columns) == INPUT_COLUMNS + ["wilayah"]
+    assert all(pd.api.types.is_string_dtype(t) for t in full.dtypes)
+    pd.testing.assert_frame_equal(full, pd.concat(iter_csv_chunks(src, 1000), ignore_index=True))
+
+def test_arrow_sink_abstract():
+    with pytest.raises(TypeError):
+        _ArrowSink(io.BytesIO())
+
+@pytest.mark.parametrize("method", ["sd", "lms"])
+def test_rejects_negative_and_infinite(method):
+    # Usia negatif (termasuk -0.5 yang terpotong ke -0) dan nilai tak hingga
+    # tidak boleh lolos ke skoring (z tak hingga -> "Tidak Stunting" palsu)
+    rows = [
+        ("-0.5", "9", "75", "", "", "usia_bulan di luar 0-60"),
+        ("-1", "9", "75", "", "", "usia_bulan di luar 0-60"),
+        ("61", "9", "75", "", "", "usia_bulan di luar 0-60"),
+        ("inf", "9", "75", "", "", "usia_bulan tidak terhingga"),
+        ("12", "inf", "75", "", "", "berat_badan_kg tidak terhingga"),
+        ("12", "9", "1e999", "", "", "tinggi_badan_cm tidak terhingga"),
+        ("12", "9", "75", "inf", "", "berat_lahir_kg tidak terhingga"),
+        ("12", "9", "75", "", "-inf", "tinggi_lahir_cm tidak terhingga"),
+        ("60.5", "17", "108", "", "", ""),
+        ("0", "3.3", "50", "3.2", "49", ""),
+    ]
+    usia, bb, tb, bbl, tbl, alasan = map(list, zip(*rows))
+    df = pd.DataFrame({"jenis_kelamin": "Perempuan", "usia_bulan": usia, "berat_lahir_kg": bbl,
+                       "tinggi_lahir_cm": tbl, "berat_badan_kg": bb, "tinggi_badan_cm": tb})
+    inp, rejected = prepare_input(df, method)
+    assert rejected["baris"].tolist() == [i + 1 for i, a in enumerate(alasan) if a]
+    assert rejected["alasan_tolak"].tolist() == [a for a in alasan if a]
+    assert len(inp) == 2
+    out = score_frame(inp, method)
+    assert np.isfinite(out[["z_TBU", "z_BBU", "Prob_Risiko"]].to_numpy()).all()
@@ -0,0 +1,97 @@
+# HTTP API lokal (python -m stunting serve): micro-batch, batch, dan error.
+
+import http.client
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import stunting.service as service
+from stunting.service import MAX_BODY_BYTES, make_server, score_records
+
+CHILD = {"jenis_kelamin": "Perempuan", "usia_bulan": 24, "berat_badan_kg": 9.5,
+         "tinggi_badan_cm": 82}
+
+@pytest.fixture(scope="module")
+def server():
+    srv = make_server(port=0, max_wait_ms=20.0)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+def _request(server, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection(*server.server_address[:2], timeout=10)
+    try:
+        conn.putrequest(method, path)
+        for k, v in (headers or {}).items():
+            conn.putheader(k, v)
+        if body is not None and "Content-Length" not in (headers or {}):
+            conn.putheader("Content-Length", str(len(body)))
+        conn.endheaders()
+        if body:
+            conn.send(body)
+        resp = conn.getresponse()
+        return resp.status, json.loads(resp.read())
+    finally:
+        conn.close()
+
+def _post(server, payload):
+    return _request(server, "POST", "/score", json.dumps(payload).encode())
+
+def test_single_micro_batched(server):
+    # Request satu anak yang datang bersamaan digabung dalam satu batch
+    records = [dict(CHILD, usia_bulan=a) for a in range(12, 44)]
+    with ThreadPoolExecutor(len(records)) as pool:
+        responses = list(pool.map(lambda r: _post(server, r), records))
+    assert all(status == 200 for status, _ in responses)
+    assert [body for _, body in responses] == score_records(records)
+    _, stats = _request(server, "GET", "/stats")
+    assert stats["micro_batch"]["maks"] > 1
+    assert stats["latensi"]["POST /score"]["jumlah"] >= len(records)
+
+def test_single_invalid_record(server):
+    status, body = _post(server, dict(CHILD, usia_bulan=-1))
+    assert status == 422 and "usia_bulan" in body["error"]
+
+@pytest.mark.parametrize("method", ["sd", "lms"])
+def test_batch(server, method):
+    records = [CHILD, dict(CHILD, jenis_kelamin="x"), dict(CHILD, usia_bulan=6.5)]
+    status, body = _post(server, {"method": method, "records": records})
+    assert status == 200
+    assert body["results"] == score_records(records, method)
+    assert "error" in body["results"][1]
+
+@pytest.mark.parametrize("body, headers", [
+    (b"{bukan json", None),
+    (b"", {"Content-Length": "abc"}),
+    (b"", {"Content-Length": "-1"}),
+    (json.dumps({"method": "cdc", **CHILD}).encode(), None),
+    (b"[1, 2]", None),
+    (b"42", None),
+])
+def test_bad_request(server, body, headers):
+    status, payload = _request(server, "POST", "/score", body, headers)
+    assert status == 400 and payload["error"]
+
+def test_length_required(server):
+    status, _ = _request(server, "POST", "/score")
+    assert status == 411
+
+def test_body_too_large(server):
+    status, _ = _request(server, "POST", "/score", b"",
+                         {"Content-Length": str(MAX_BODY_BYTES + 1)})
+    assert status == 413
+
+def test_scoring_error(server, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("model rusak")
+
+    monkeypatch.setattr(service, "score_records", broken)
+    for payload in (CHILD, [CHILD]):
+        status, body = _post(server, payload)
+        assert status == 500 and "model rusak" in body["error"]
+    monkeypatch.undo()
+    assert _post(server, CHILD)[0] == 200
@@ -0,0 +1,148 @@
+# Kesetaraan engine batch (score_batch / _z_from_bands) dengan fungsi skalar
+# acuan (categorize_*, who_probability, _z_from_points), metode sd & lms.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stunting.who import (
+    BBU_Z_COLS, LMS_BBU, LMS_TBU, SEX_LABELS, WHO_BBU, WHO_MAX_AGE, WHO_TBU, Z_SDS,
+    _lms_interp, _lms_value, _lms_z, _z_from_bands, _z_from_points,
+    categorize_bbu, categorize_tbu, lms_z_bbu, lms_z_tbu, score_batch, who_probability,
+    who_bbu_row, who_tbu_thresholds,
+)
+
+# Domain input halaman individu / template kelompok
+HEIGHT_RANGE, WEIGHT_RANGE = (40.0, 130.0), (1.0, 30.0)
+
+def _cohort(n: int = 3000, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    gender = rng.choice(SEX_LABELS, n)
+    # Usia bulat 0..60 plus usia pecahan (termasuk x.5 yang dibulatkan ke genap)
+    age = rng.integers(0, WHO_MAX_AGE + 1, n).astype(float)
+    half = rng.random(n) < 0.5
+    age[half] = np.round(rng.uniform(0, WHO_MAX_AGE, half.sum()), 2)
+    age[:20] = np.arange(20) * 3 + 0.5
+    height = np.round(rng.uniform(*HEIGHT_RANGE, n), 1)
+    weight = np.round(rng.uniform(*WEIGHT_RANGE, n), 2)
+    return gender, age, height, weight
+
+def _scalar(gender, age, height, weight, method):
+    tbu = [categorize_tbu(g, a, h, method)[0] for g, a, h in zip(gender, age, height)]
+    bbu = [categorize_bbu(g, a, w, method)[0] for g, a, w in zip(gender, age, weight)]
+    prob = np.array([who_probability(g, a, h, w, method)
+                     for g, a, h, w in zip(gender, age, height, weight)])
+    return tbu, bbu, prob
+
+# ----------------- _z_from_bands vs _z_from_points -----------------
+@pytest.mark.parametrize("sex", [0, 1])
+def test_z_from_bands_matches_points(sex):
+    rng = np.random.default_rng(sex)
+    for age in range(WHO_MAX_AGE + 1):
+        for table, cols, lo_hi in ((WHO_TBU[sex, age], slice(None), HEIGHT_RANGE),
+                                   (WHO_BBU[sex, age], BBU_Z_COLS, WEIGHT_RANGE)):
+            xs = np.asarray(table)[cols]
+            bands = dict(zip(Z_SDS.tolist(), xs.tolist()))
+            # Acak di seluruh rentang + tepat di titik SD (batas segmen)
+            values = np.concatenate([rng.uniform(*lo_hi, 50), xs, xs + 1e-9])
+            expected = [_z_from_points(v, bands) for v in values]
+            np.testing.assert_allclose(_z_from_bands(values, xs), expected, rtol=0, atol=1e-12)
+
+def test_z_from_bands_flat_segment():
+    # Dua titik SD sama -> z = SD bawah, tanpa pembagian nol
+    xs = np.array([10.0, 10.0, 12.0, 14.0])
+    bands = dict(zip(Z_SDS.tolist(), xs.tolist()))
+    for v in (9.0, 10.0, 11.0, 15.0):
+        assert float(_z_from_bands(v, xs)) == pytest.approx(_z_from_points(v, bands))
+
+# ----------------- score_batch vs fungsi skalar -----------------
+@pytest.mark.parametrize("method", ["sd", "lms"])
+def test_score_batch_matches_scalar(method):
+    gender, age, height, weight = _cohort(seed=1)
+    out = score_batch(gender, age, height, weight, method=method)
+    tbu, bbu, prob = _scalar(gender, age, height, weight, method)
+    assert out["TB/U"].astype(str).tolist() == tbu
+    assert out["BB/U"].astype(str).tolist() == bbu
+    np.testing.assert_allclose(out["Prob_Risiko"], prob[:, 0], rtol=0, atol=1e-12)
+    np.testing.assert_allclose(out["z_TBU"], prob[:, 1], rtol=0, atol=1e-12)
+    np.testing.assert_allclose(out["z_BBU"], prob[:, 2], rtol=0, atol=1e-12)
+    stunting = np.isin(tbu, ["Sangat Pendek (Severe Stunting)", "Pendek (Stunting)"])
+    assert (out["Prediksi"].astype(str) == np.where(stunting, "Stunting", "Tidak Stunting")).all()
+
+@pytest.mark.parametrize("gender", SEX_LABELS)
+def test_score_batch_sd_thresholds(gender):
+    # Tepat di batas -3/-2/+2 SD tiap usia: cabang < dan <= harus sama
+    rows = []
+    for age in range(WHO_MAX_AGE + 1):
+        m3, m2, _, p2 = who_tbu_thresholds(gender, age)
+        b = who_bbu_row(gender, age)
+        for h, w in zip((m3, m2, p2), (b[0], b[1], b[5])):
+            rows.append((age, h, w))
+    age, height, weight = map(np.array, zip(*rows))
+    sex = [gender] * len(rows)
+    out = score_batch(sex, age, height, weight)
+    tbu, bbu, _ = _scalar(sex, age, height, weight, "sd")
+    assert out["TB/U"].astype(str).tolist() == tbu
+    assert out["BB/U"].astype(str).tolist() == bbu
+
+def test_score_batch_sd_rounds_age():
+    # Metode sd memakai baris tabel bulan terdekat
+    out = score_batch(["Perempuan"] * 3, [11.6, 12.0, 12.4], [75.0] * 3, [9.0] * 3)
+    assert out["z_TBU"].nunique() == 1 and out["z_BBU"].nunique() == 1
+
+def test_score_batch_categorical_gender():
+    gender, age, height, weight = _cohort(500, seed=2)
+    plain = score_batch(gender, age, height, weight)
+    cat = score_batch(pd.Categorical(gender, categories=SEX_LABELS), age, height, weight)
+    pd.testing.assert_frame_equal(plain, cat)
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        score_batch(["Laki-laki"], [12], [75.0], [9.0], method="cdc")
+
+# ----------------- LMS -----------------
+def test_lms_tables_match_who():
+    # Koefisien WHO Child Growth Standards (L, M, S)
+    np.testing.assert_allclose(LMS_TBU[0, 0], [1.0, 49.8842, 0.03795])     # panjang, L 0 bln
+    np.testing.assert_allclose(LMS_TBU[1, 0], [1.0, 49.1477, 0.0379])      # panjang, P 0 bln
+    np.testing.assert_allclose(LMS_TBU[0, 24], [1.0, 87.8161, 0.03479])    # panjang, L 24 bln
+    np.testing.assert_allclose(LMS_TBU[0, 25], [1.0, 87.1161, 0.03507])    # tinggi, L 24 bln
+    np.testing.assert_allclose(LMS_BBU[0, 0], [0.3487, 3.3464, 0.14602])
+    np.testing.assert_allclose(LMS_BBU[1, 60], [-0.3518, 18.2193, 0.14821])
+
+@pytest.mark.parametrize("sex", [0, 1])
+def test_lms_interp(sex):
+    # Usia bulat = baris tabel; usia pecahan = interpolasi linear antar bulan
+    for age in range(WHO_MAX_AGE + 1):
+        L, M, S = _lms_interp("bbu", sex, float(age))
+        np.testing.assert_allclose([L, M, S], LMS_BBU[sex, age])
+        row = age + (age >= 24)
+        np.testing.assert_allclose(np.ravel(_lms_interp("tbu", sex, float(age))), LMS_TBU[sex, row])
+    for age in (0.25, 11.5, 23.9, 24.5, 59.75):
+        lo, f = int(age), age - int(age)
+        row = lo + (age >= 24)
+        expected = LMS_TBU[sex, row] + f * (LMS_TBU[sex, row + 1] - LMS_TBU[sex, row])
+        np.testing.assert_allclose(np.ravel(_lms_interp("tbu", sex, age)), expected)
+
+@pytest.mark.parametrize("sex", [0, 1])
+def test_lms_z_roundtrip(sex):
+    # Nilai ukur pada z tertentu (kebalikan Box-Cox) kembali ke z yang sama;
+    # di luar +-3 SD berat memakai aturan WHO (jarak SD ujung linear)
+    age = np.linspace(0, WHO_MAX_AGE, 241)
+    for z in (-2.5, -2.0, 0.0, 1.0, 2.9):
+        h = _lms_value(*_lms_interp("tbu", sex, age), z)
+        w = _lms_value(*_lms_interp("bbu", sex, age), z)
+        np.testing.assert_allclose(lms_z_tbu(sex, age, h), z, atol=1e-9)
+        np.testing.assert_allclose(lms_z_bbu(sex, age, w), z, atol=1e-9)
+    L, M, S = _lms_interp("bbu", sex, age)
+    sd3, sd2 = _lms_value(L, M, S, -3.0), _lms_value(L, M, S, -2.0)
+    w = sd3 - 0.5 * (sd2 - sd3)
+    np.testing.assert_allclose(lms_z_bbu(sex, age, w), -3.5, atol=1e-9)
+    assert np.all(_lms_z(w, L, M, S) < -3.5)   # tanpa aturan WHO, ekor bawah melebar
+
+def test_lms_uses_fractional_age():
+    # Metode lms membedakan usia dalam bulan yang sama; metode sd tidak
+    args = (["Laki-laki"] * 2, [12.0, 12.9], [75.0] * 2, [9.5] * 2)
+    lms = score_batch(*args, method="lms")
+    assert lms["z_TBU"].iloc[1] < lms["z_TBU"].iloc[0]
+    assert lms["z_BBU"].iloc[1] < lms["z_BBU"].iloc[0]